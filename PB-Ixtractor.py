@@ -1,29 +1,32 @@
+from __future__ import annotations
+
 import argparse
-import pandas as pd
+import contextvars
+import csv
+import functools
 import os
 import sys
 import re
-import xlsxwriter
 import time
-import psutil
 
 import json
+import hashlib
+import sqlite3
 from zipfile import ZipFile
-import shutil
 
 import subprocess
 from pathlib import Path
-import networkx as nx
-from matplotlib import pyplot as plt
-import matplotlib
 import threading
-import inspect
-
-matplotlib.use("agg")
+from abc import ABC, abstractmethod
+from contextlib import ExitStack, contextmanager, nullcontext
+from typing import TYPE_CHECKING
 
+# Heavy modules are imported by the code paths that use them to keep startup fast
+if TYPE_CHECKING:
+    import pandas as pd
 
 LOG_DATA = True
-REPORT_LOG = ""
+REPORT_LOG = None
 SAVE_NAME = ""
 _PBIX_ = [None, None]
 _BIM_ = [None, None]
@@ -39,80 +42,670 @@ default_colors = [
     ["VarNames", (0, 15, 255, 255)],
 ]
 
-cwd = os.getcwd()
-
-# Reads user defined Visual Types from external file
-try:
-    file_path = f"{cwd}\\Input\\VisualTypes.csv"
-    visual_type_list = pd.read_csv(file_path)
-    visual_type_list = visual_type_list["PBI Visual Name"].values.tolist()
-except OSError:
-    print(f"Could not open/read file: {file_path}")
-    sys.exit()
-
-# Reads user defined Data Types from external file
-try:
-    file_path = f"{cwd}\\Input\\DataTypes.csv"
-    data_type_list = pd.read_csv(file_path)
-    data_type_list = data_type_list[["PBI Name", "Output Name"]].values.tolist()
-except OSError:
-    print(f"Could not open/read file: {file_path}")
-    sys.exit()
-
-# Reads user defined PBI Functions from external file
-try:
-    file_path = f"{cwd}\\Input\\FunctionNames.csv"
-    known_functions = pd.read_csv(file_path)
-    known_functions = known_functions["PBI Function Name"].values.tolist()
-except OSError:
-    print(f"Could not open/read file: {file_path}")
-    sys.exit()
-
-
-def log_data(message: str, error: str, severity: int = 0):
-    e = str(severity)
-
-    if severity == -1:
-        e += " Debug: "
-    elif severity == 0:
-        e += " Info: "
-    elif severity == 1:
-        e += " Warning: "
-    elif severity == 2:
-        e += " Error: "
-    else:
-        e += " Critical: "
-
-    line_len = 122
-    error = str(error)
-    error_clean = ""
-    error_lines = error.split("\n")
-    for line in error_lines:
-        msg_len = len(line)
-        stansas = int(msg_len / line_len) + 1
-        for i in range(stansas):
-            error_clean += line[(line_len) * i : (line_len) * (i + 1)] + "\n"
-
-    error_clean = error_clean[:-1]
-
-    e += (
-        message
-        + f". Error on line {inspect.currentframe().f_back.f_lineno}.\n"
-        + str(error_clean)
+
+class InputConfig:
+    """
+    User defined Visual Types, Data Types and PBI Functions from the Input folder,
+    precomputed for fast lookups
+    """
+
+    def __init__(
+        self,
+        visual_types: list[str],
+        data_types: list[tuple[str, str]],
+        known_functions: list[str],
+        performance_thresholds: list[tuple[str, str]] = (),
+    ):
+        self.visual_types = frozenset(visual_types)
+        # Ordered (PBI Name, Output Name) pairs, the first matching role wins
+        self.data_types = tuple(data_types)
+        self.known_functions = frozenset(known_functions)
+        # Metric -> limit, see lint_performance
+        self.performance_thresholds = dict(PERFORMANCE_THRESHOLDS)
+        for metric, limit in performance_thresholds:
+            self.performance_thresholds[metric] = float(limit)
+
+
+# Visual types of the classic and the new slicer -> label in the workbook
+SLICER_VISUAL_TYPES = {"slicer": "Slicer", "advancedSlicerVisual": "Slicer (new)"}
+
+# Default limits of lint_performance, overridden by Input/PerformanceThresholds.csv
+PERFORMANCE_THRESHOLDS = {
+    "Query Visuals": 12,
+    "Data Fields": 60,
+    "Slicers": 6,
+    "Fields per Visual": 12,
+    "Measures per Visual": 8,
+    "Matrix Grouping Fields": 4,
+}
+
+_config_cache = {}
+
+
+def _read_input_csv(file_path: str, columns: list[str]) -> list:
+    with open(file_path, "r", encoding="utf-8-sig", newline="") as csv_file:
+        rows = []
+        for row in csv.DictReader(csv_file):
+            values = [row.get(column) for column in columns]
+            if all(values):
+                rows.append(values[0] if len(columns) == 1 else tuple(values))
+        return rows
+
+
+def load_config(input_folder: str = None) -> InputConfig:
+    """
+    Reads the user defined Input/*.csv files on first use. The parsed result is cached
+    and only re-read when one of the files has been modified (e.g. from the UI)
+
+    input_folder: defaults to Input in the current working directory
+    """
+    if input_folder is None:
+        input_folder = os.path.join(os.getcwd(), "Input")
+
+    file_paths = [
+        os.path.join(input_folder, "VisualTypes.csv"),
+        os.path.join(input_folder, "DataTypes.csv"),
+        os.path.join(input_folder, "FunctionNames.csv"),
+    ]
+
+    mtimes = []
+    for file_path in file_paths:
+        try:
+            mtimes.append(os.stat(file_path).st_mtime_ns)
+        except OSError:
+            raise FileNotFoundError(f"Could not open/read file: {file_path}")
+
+    # Optional, the defaults are used without it
+    thresholds_path = os.path.join(input_folder, "PerformanceThresholds.csv")
+    try:
+        mtimes.append(os.stat(thresholds_path).st_mtime_ns)
+    except OSError:
+        mtimes.append(None)
+
+    cached = _config_cache.get(input_folder)
+    if cached is not None and cached[0] == mtimes:
+        return cached[1]
+
+    config = InputConfig(
+        visual_types=_read_input_csv(file_paths[0], ["PBI Visual Name"]),
+        data_types=_read_input_csv(file_paths[1], ["PBI Name", "Output Name"]),
+        known_functions=_read_input_csv(file_paths[2], ["PBI Function Name"]),
+        performance_thresholds=[]
+        if mtimes[-1] is None
+        else _read_input_csv(thresholds_path, ["Metric", "Limit"]),
     )
-    return e + "\n\n"
+    _config_cache[input_folder] = (mtimes, config)
+    return config
+
+
+class Profiler:
+    """
+    Records a timing span per pipeline phase. The spans are written as a Chrome trace
+    that can be opened in chrome://tracing or https://ui.perfetto.dev
+
+    cprofile_phase: optional phase name to also collect cProfile stats for
+    """
+
+    file_prefix = "profile"
+
+    def __init__(self, cprofile_phase: str = None):
+        self.events = []
+        self.cprofile_phase = cprofile_phase
+        self.cprofile = None
+        self.cprofile_active = False
+        self.pid = os.getpid()
+        self.start_ns = time.perf_counter_ns()
+
+    @contextmanager
+    def span(self, name: str, args: dict):
+        profile_phase = name == self.cprofile_phase and not self.cprofile_active
+        if profile_phase:
+            if self.cprofile is None:
+                import cProfile
+
+                self.cprofile = cProfile.Profile()
+            self.cprofile_active = True
+            self.cprofile.enable()
+
+        start_ns = time.perf_counter_ns()
+        try:
+            yield
+        finally:
+            end_ns = time.perf_counter_ns()
+            if profile_phase:
+                self.cprofile.disable()
+                self.cprofile_active = False
+            self.events.append(
+                {
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start_ns - self.start_ns) / 1000,
+                    "dur": (end_ns - start_ns) / 1000,
+                    "pid": self.pid,
+                    "tid": threading.get_ident(),
+                    "args": args,
+                }
+            )
+
+    def summary(self) -> list[tuple[str, float, int]]:
+        """
+        returns [(phase name, total ms, count), ...] sorted by total time
+        """
+        totals = {}
+        for event in self.events:
+            total, count = totals.get(event["name"], (0.0, 0))
+            totals[event["name"]] = (total + event["dur"] / 1000, count + 1)
+        return sorted(
+            ((name, total, count) for name, (total, count) in totals.items()),
+            key=lambda item: item[1],
+            reverse=True,
+        )
+
+    def write(self, folder: str, file_name: str):
+        """
+        Writes <file_name>.json (trace), <file_name>_summary.txt and, if collected,
+        <file_name>.prof + <file_name>_cprofile.txt to folder
+        """
+        import pstats
+
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        base_path = os.path.join(folder, file_name)
+        with open(base_path + ".json", "w") as trace_file:
+            json.dump(
+                {"traceEvents": self.events, "displayTimeUnit": "ms"},
+                trace_file,
+            )
+
+        with open(base_path + "_summary.txt", "w") as summary_file:
+            summary_file.write(f"{'Phase':<60}{'Total ms':>12}{'Count':>8}\n")
+            for name, total, count in self.summary():
+                summary_file.write(f"{name[:59]:<60}{total:>12.1f}{count:>8}\n")
+
+        if self.cprofile is not None:
+            self.cprofile.dump_stats(base_path + ".prof")
+            with open(base_path + "_cprofile.txt", "w") as stats_file:
+                stats = pstats.Stats(self.cprofile, stream=stats_file)
+                stats.sort_stats("cumulative").print_stats(50)
+
+
+def process_memory() -> tuple[int, int] | None:
+    """
+    returns (current, peak) resident set size of this process in bytes, or None if
+    it cannot be read on this platform
+    """
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+            _fields_ = [
+                ("cb", wintypes.DWORD),
+                ("PageFaultCount", wintypes.DWORD),
+                ("PeakWorkingSetSize", ctypes.c_size_t),
+                ("WorkingSetSize", ctypes.c_size_t),
+                ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                ("PagefileUsage", ctypes.c_size_t),
+                ("PeakPagefileUsage", ctypes.c_size_t),
+            ]
+
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        get_process = ctypes.windll.kernel32.GetCurrentProcess
+        if not ctypes.windll.psapi.GetProcessMemoryInfo(
+            get_process(), ctypes.byref(counters), counters.cb
+        ):
+            return None
+        return counters.WorkingSetSize, counters.PeakWorkingSetSize
+
+    try:
+        import resource
+
+        # ru_maxrss is in kilobytes on Linux, bytes on macOS
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        if sys.platform != "darwin":
+            peak *= 1024
+    except ImportError:
+        return None
+
+    try:
+        with open("/proc/self/statm", "r") as statm:
+            current = int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError):
+        current = peak
+    return current, peak
+
+
+class MemoryProfiler:
+    """
+    Records Python heap usage (tracemalloc) and process RSS at every phase boundary.
+    Phases nested at most snapshot_depth deep also take a tracemalloc snapshot when
+    they end, listing the allocation sites that grew since the previous snapshot
+    """
+
+    file_prefix = "memory"
+
+    def __init__(self, snapshot_depth: int = 1, top_sites: int = 10):
+        import tracemalloc
+
+        # Import the heavy modules before tracing starts. Module memory is the same for
+        # every report and would make each snapshot slow to take and compare
+        import matplotlib
+        import networkx  # noqa: F401
+        import pandas  # noqa: F401
+        import xlsxwriter  # noqa: F401
+
+        matplotlib.use("agg")
+        from matplotlib import pyplot  # noqa: F401
+
+        self.tracemalloc = tracemalloc
+        self.snapshot_depth = snapshot_depth
+        self.top_sites = top_sites
+        self.records = []
+        self.stack = []
+        # Leave out the memory used by tracemalloc itself and lazy imports
+        self.snapshot_filters = (
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+        )
+        tracemalloc.start()
+        self.last_snapshot = self._take_snapshot()
+
+    def _take_snapshot(self):
+        return self.tracemalloc.take_snapshot().filter_traces(self.snapshot_filters)
+
+    def _fold_peak(self):
+        """
+        Moves the current tracemalloc peak into all open phases and resets it
+        """
+        peak = self.tracemalloc.get_traced_memory()[1]
+        for frame in self.stack:
+            frame["peak"] = max(frame["peak"], peak)
+        self.tracemalloc.reset_peak()
+
+    @contextmanager
+    def span(self, name: str, args: dict):
+        self._fold_peak()
+        frame = {
+            "start": self.tracemalloc.get_traced_memory()[0],
+            "peak": 0,
+        }
+        self.stack.append(frame)
+        try:
+            yield
+        finally:
+            self._fold_peak()
+            self.stack.pop()
+            current = self.tracemalloc.get_traced_memory()[0]
+            rss = process_memory()
+            record = {
+                "name": name,
+                "depth": len(self.stack),
+                "args": args,
+                "start": frame["start"],
+                "end": current,
+                "peak": frame["peak"],
+                "rss": rss[0] if rss else None,
+                "peak_rss": rss[1] if rss else None,
+                "top_sites": [],
+            }
+            if len(self.stack) <= self.snapshot_depth:
+                snapshot = self._take_snapshot()
+                differences = snapshot.compare_to(self.last_snapshot, "lineno")
+                self.last_snapshot = snapshot
+                record["top_sites"] = [
+                    (str(stat.traceback), stat.size_diff, stat.count_diff)
+                    for stat in differences[: self.top_sites]
+                    if stat.size_diff > 0
+                ]
+            self.records.append(record)
+
+    def stop(self):
+        self.tracemalloc.stop()
+
+    def write(self, folder: str, file_name: str):
+        """
+        Writes <file_name>.txt (readable report) and <file_name>.json to folder
+        """
+        self.stop()
+        if not os.path.exists(folder):
+            os.makedirs(folder)
+
+        def mb(value: int | None) -> str:
+            return "-" if value is None else f"{value / 1024 / 1024:.1f}"
+
+        base_path = os.path.join(folder, file_name)
+        with open(base_path + ".json", "w") as json_file:
+            json.dump(self.records, json_file, indent=1)
+
+        # Per phase name totals, per visual phases are repeated many times
+        phases = {}
+        for record in self.records:
+            entry = phases.setdefault(
+                record["name"], {"count": 0, "peak": 0, "growth": 0, "rss": None}
+            )
+            entry["count"] += 1
+            entry["peak"] = max(entry["peak"], record["peak"])
+            entry["growth"] += record["end"] - record["start"]
+            if record["peak_rss"] is not None:
+                entry["rss"] = max(entry["rss"] or 0, record["peak_rss"])
+
+        with open(base_path + ".txt", "w") as text_file:
+            text_file.write(
+                f"{'Phase':<50}{'Count':>7}{'Peak MB':>10}{'Growth MB':>11}{'Peak RSS MB':>13}\n"
+            )
+            for name, entry in sorted(
+                phases.items(), key=lambda item: item[1]["peak"], reverse=True
+            ):
+                text_file.write(
+                    f"{name[:49]:<50}{entry['count']:>7}{mb(entry['peak']):>10}"
+                    f"{mb(entry['growth']):>11}{mb(entry['rss']):>13}\n"
+                )
+
+            for record in self.records:
+                if not record["top_sites"]:
+                    continue
+                text_file.write(
+                    f"\nAllocations grown by the end of '{record['name']}' "
+                    f"(peak {mb(record['peak'])} MB):\n"
+                )
+                for site, size, count in record["top_sites"]:
+                    text_file.write(
+                        f"  {size / 1024:>10.1f} KiB {count:>8} blocks  {site}\n"
+                    )
+
+
+# Hooks of the run in the current thread (context), so runs in other threads never
+# see each other's phases. Threads started by a run get them through copy_context
+_phase_hooks = contextvars.ContextVar("phase_hooks", default=())
+_NO_PHASE = nullcontext()
+
+
+@contextmanager
+def use_phase_hooks(hooks: list):
+    """
+    Sends the phases of the current thread to hooks until the block ends
+    """
+    token = _phase_hooks.set(tuple(hooks))
+    try:
+        yield
+    finally:
+        _phase_hooks.reset(token)
+
+
+def with_phase_hooks(method):
+    """
+    Runs a Documenter method with the phase hooks of its instance
+    """
+
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with use_phase_hooks(self.hooks):
+            return method(self, *args, **kwargs)
+
+    return wrapper
+
+
+def phase(name: str, **args):
+    """
+    Instruments a pipeline phase when profiling or memory tracking is enabled,
+    otherwise a shared no-op
+    """
+    hooks = _phase_hooks.get()
+    if not hooks:
+        return _NO_PHASE
+    if len(hooks) == 1:
+        return hooks[0].span(name, args)
+    return _all_hooks_span(hooks, name, args)
+
+
+@contextmanager
+def _all_hooks_span(hooks: tuple, name: str, args: dict):
+    with ExitStack() as stack:
+        for hook in hooks:
+            stack.enter_context(hook.span(name, args))
+        yield
+
+
+def report_progress(stage: str, done: int, total: int):
+    """
+    Tells the phase hooks how far a counted stage is, e.g. ("pages extracted", 3, 10).
+    Only hooks with a progress() method are called
+    """
+    for hook in _phase_hooks.get():
+        progress = getattr(hook, "progress", None)
+        if progress is not None:
+            progress(stage, done, total)
+
+
+class RunCancelled(Exception):
+    """
+    Raised inside the pipeline once its ProgressTracker is cancelled
+    """
+
+
+class ConsoleProgress:
+    """
+    Phase hook that prints the progress counters on one console line, for long
+    command line runs
+    """
+
+    @contextmanager
+    def span(self, name: str, args: dict):
+        yield
+
+    def progress(self, stage: str, done: int, total: int):
+        print(f"\r{stage} {done}/{total}", end="", flush=True)
+
+
+# Rough share of the run time per counted stage, the rest is the graph and saving
+# the workbook
+PROGRESS_WEIGHTS = {
+    "pages extracted": 0.1,
+    "model objects read": 0.2,
+    "definitions highlighted": 0.2,
+    "sheets written": 0.4,
+}
+
+
+class ProgressTracker:
+    """
+    Phase hook that combines the progress counters of the pipeline into an overall
+    fraction and ETA. cancel() stops the run at the next phase or counter update.
+    Meant to be read from another thread, e.g. the UI
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.counters = {}
+        self.current = "Starting"
+        self.cancelled = threading.Event()
+        self.finished = threading.Event()
+
+    def cancel(self):
+        self.cancelled.set()
+
+    def finish(self):
+        self.finished.set()
+
+    def check_cancelled(self):
+        if self.cancelled.is_set():
+            raise RunCancelled("Run cancelled")
+
+    @contextmanager
+    def span(self, name: str, args: dict):
+        self.check_cancelled()
+        if not name.startswith(("page: ", "visual: ")):
+            self.current = name
+        yield
+
+    def progress(self, stage: str, done: int, total: int):
+        self.check_cancelled()
+        self.counters[stage] = (done, total)
+        self.current = f"{stage} {done}/{total}"
+
+    def status(self) -> dict:
+        """
+        returns {"text", "fraction" (0-1), "elapsed" and "eta" in seconds or None}
+        """
+        fraction = 0.0
+        for stage, (done, total) in list(self.counters.items()):
+            if total > 0:
+                fraction += PROGRESS_WEIGHTS.get(stage, 0) * done / total
+        elapsed = time.perf_counter() - self.start
+        eta = None
+        if fraction > 0.05:
+            eta = elapsed * (1 - fraction) / fraction
+        return {
+            "text": self.current,
+            "fraction": min(fraction, 1.0),
+            "elapsed": elapsed,
+            "eta": eta,
+        }
+
+
+LOG_LEVELS = {-1: "Debug", 0: "Info", 1: "Warning", 2: "Error", 3: "Critical"}
+
+
+class ReportLog:
+    """
+    Collects the log records of one run. Records are kept as dicts and, if file_path
+    is given, appended to it as JSON lines as soon as they are logged, so a crashed run
+    still leaves its log behind. The file is only created once the first record arrives
+
+    Payloads (often whole visual dicts) are only turned into text when a record is
+    written or shown, and are cut to max_payload characters
+    """
+
+    def __init__(
+        self,
+        file_path: str | None = None,
+        enabled: bool = True,
+        min_severity: int = -1,
+        max_payload: int = 2000,
+    ):
+        self.file_path = file_path
+        self.enabled = enabled
+        self.min_severity = min_severity
+        self.max_payload = max_payload
+        self.records = []
+        self.file = None
+
+    def __bool__(self) -> bool:
+        # Debug records only carry statistics, they alone do not make a run "Log"
+        return any(record["severity"] >= 0 for record in self.records)
+
+    def log(self, message: str, payload=None, severity: int = 0, stacklevel: int = 1):
+        """
+        Adds a record. stacklevel selects the frame whose line number is stored,
+        1 being the caller of log
+        """
+        if not self.enabled or severity < self.min_severity:
+            return
+
+        record = {
+            "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            "severity": severity,
+            "level": LOG_LEVELS.get(severity, "Critical"),
+            "message": message,
+            "line": sys._getframe(stacklevel).f_lineno,
+            "payload": payload,
+        }
+        self.records.append(record)
+        self._write(record)
+
+    def _write(self, record: dict):
+        if self.file_path is not None:
+            if self.file is None:
+                folder = os.path.dirname(self.file_path)
+                if folder and not os.path.exists(folder):
+                    os.makedirs(folder)
+                # Line buffered, every record reaches the disk right away
+                self.file = open(self.file_path, "a", encoding="utf-8", buffering=1)
+            self.file.write(
+                json.dumps({**record, "payload": self.payload_text(record)}) + "\n"
+            )
+
+    def add_records(self, records: list[dict]):
+        """
+        Adds records kept from an earlier run, e.g. of a reused stage
+        """
+        if not self.enabled:
+            return
+        for record in records:
+            self.records.append(record)
+            self._write(record)
+
+    def payload_text(self, record: dict) -> str:
+        payload = record["payload"]
+        if payload is None:
+            return ""
+        if isinstance(payload, str):
+            text = payload
+        else:
+            # reprlib stops descending once the limits are reached, large dicts are
+            # never converted as a whole
+            import reprlib
+
+            short_repr = reprlib.Repr()
+            short_repr.maxlevel = 6
+            short_repr.maxdict = short_repr.maxlist = 20
+            short_repr.maxstring = short_repr.maxother = 200
+            text = short_repr.repr(payload)
+        if len(text) > self.max_payload:
+            text = (
+                text[: self.max_payload]
+                + f"... ({len(text) - self.max_payload} more characters)"
+            )
+        return text
+
+    def format_record(self, record: dict, line_len: int = 122) -> str:
+        """
+        returns record as readable text, the payload wrapped at line_len
+        """
+        payload_lines = []
+        for line in self.payload_text(record).split("\n"):
+            payload_lines.extend(
+                line[i : i + line_len] for i in range(0, max(len(line), 1), line_len)
+            )
+        return (
+            f"{record['level']}: {record['message']}. Error on line {record['line']}.\n"
+            + "\n".join(payload_lines)
+        )
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+            self.file = None
 
 
 class ReportExtractor:
-    def __init__(self, path, name):
+    def __init__(
+        self,
+        path,
+        name,
+        log: ReportLog | None = None,
+        config: InputConfig | None = None,
+    ):
         self.path = path
         self.name = name
         self.result = []
         self.filters = []
-        self.log = ""
+        self.log = ReportLog() if log is None else log
+        self.config = config
+        self.visual_metrics = []
+        # structure hash -> (result rows, filter rows, log records), see extract_visual_memo
+        self.visual_memo = {}
+        self.memo_hits = 0
+        self.memo_misses = 0
 
-    def _log_data(self, message: str, error: str, severity: int = 0):
-        self.log += log_data(message, error, severity)
+    def _log_data(self, message: str, error, severity: int = 0):
+        self.log.log(message, error, severity, stacklevel=2)
 
     def find_value_by_key(self, data: dict, target_key: str) -> dict | None:
         """
@@ -291,520 +884,643 @@ class ReportExtractor:
             elif "isInverted" in val[0]:
                 is_inverted = self.clean_input(val[1])
             else:
-                self._log_data("No Found message value", all_values, 0, 1)
+                self._log_data("No Found message value", all_values, 0)
 
         if val_list[-2:] == ", ":
             val_list = val_list[:-2]
 
         return val_list, is_inverted
 
-    def extract(self):
-        pathFolder = f"{self.path}/temp_{self.name[:-5]}"
-        try:
-            shutil.rmtree(pathFolder)
-        except FileNotFoundError:
-            print(f"folder {pathFolder} not present")
-        f = ZipFile(f"{self.path}/{self.name}", "r")
-        f.extractall(pathFolder)
-        report_layout = json.loads(
-            open(f"{pathFolder}/Report/Layout", "r", encoding="utf-16 le").read()
-        )
-
-        f.close()
-
-        report_layout["config"] = json.loads(report_layout["config"])
-        for section in report_layout["sections"]:
-            for visual_container in section["visualContainers"]:
-                for key in ["config", "filters", "query", "dataTransforms"]:
-                    if key in visual_container.keys():
-                        visual_container[key] = json.loads(visual_container[key])
+    def read_layout(self) -> dict:
+        """
+        Reads Report/Layout of the .pbix. Nested JSON strings (report config, visual
+        containers) are left encoded, see decode_visual_container
+        """
+        # Only the layout is needed, read it straight from the archive so several
+        # extractions of the same file never share a temp folder
+        with phase("unzip"), ZipFile(os.path.join(self.path, self.name), "r") as f:
+            layout_bytes = f.read("Report/Layout")
+        with phase("layout decode"):
+            return json.loads(layout_bytes.decode("utf-16 le"))
+
+    @staticmethod
+    def decode_visual_container(visual_container: dict) -> dict:
+        for key in ["config", "filters", "query", "dataTransforms"]:
+            if key in visual_container.keys():
+                visual_container[key] = json.loads(visual_container[key])
+        return visual_container
 
-        for s in report_layout["sections"]:
+    def extract(self):
+        config = self.config if self.config is not None else load_config()
+        report_layout = self.read_layout()
+        with phase("layout decode"):
+            report_layout["config"] = json.loads(report_layout["config"])
+            for section in report_layout["sections"]:
+                for visual_container in section["visualContainers"]:
+                    self.decode_visual_container(visual_container)
+
+        sections = report_layout["sections"]
+        for page_index, s in enumerate(sections):
+            report_progress("pages extracted", page_index, len(sections))
             page_name = s["displayName"]
 
             if page_name == "Template":
                 continue
 
-            for ex_data in s["visualContainers"]:
-                if ex_data.get("config", "") != "":
-                    t = ex_data["config"]
+            with phase(f"page: {page_name}"):
+                for ex_data in s["visualContainers"]:
+                    visual_type = None
+                    if ex_data.get("config", "") != "":
+                        visual_type = self.find_value_by_key(
+                            ex_data["config"], "visualType"
+                        )
 
-                    item_name = t["name"]
-                    visual_type = self.find_value_by_key(t, "visualType")
+                    with phase(f"visual: {visual_type}", page=page_name):
+                        self.add_visual_metrics(page_name, ex_data, visual_type)
+                        if visual_type in config.visual_types:
+                            self.extract_visual_memo(
+                                page_name, ex_data, visual_type, config, sections
+                            )
+                        elif self.extract_visual(
+                            page_name, ex_data, visual_type, config, sections
+                        ):
+                            self.extract_visual_filters(page_name, ex_data)
 
-                    if visual_type in ("shape", "image", "textbox"):
-                        continue
+                self.extract_page_filters(page_name, s)
 
-                    elif visual_type in visual_type_list:
-                        data_types = self.find_value_by_key(t, "projections")
-
-                        data_list = []
-                        for d_list in data_type_list:
-                            temp_list = []
-                            for row in data_types.get(d_list[0], []):
-                                temp_list.append(row["queryRef"])
-
-                            data_list.append(temp_list)
-
-                        # Add Correct Display Names if applicable
-                        vis_names = self.find_all_values(t, "Name")
-                        vis_disp_names = self.find_all_values(t, "NativeReferenceName")
-                        vis_name_disp_name = []
-                        for vn in vis_names:
-                            for vdn in vis_disp_names:
-                                if vn[0] == vdn[0]:
-                                    vis_name_disp_name.append([vn[1], vdn[1]])
-                                    break
-
-                        data = self.find_value_by_key(t, "Select")
-
-                        for rowi, row in enumerate(data):
-                            if row.get("HierarchyLevel", "") != "":
-                                temp = self.find_value_by_key(row, "Name")
-                                temp2 = temp.split(".")
-
-                                # Find issues
-                                if len(temp2) <= 2 or isinstance(temp2, str):
-                                    self._log_data("Hierarchy is to short", row, 1)
-                                    continue
-
-                                table_name = temp2[0]
-                                val_name = temp2[2]
-                            elif (
-                                row.get("Measure", "") != ""
-                                or row.get("Column", "") != ""
-                            ):
-                                temp = row["Name"]
-                                temp2 = temp.split(".", 1)
-                                if temp2[0][0:4] == "Sum(":
-                                    temp2[0] = temp2[0][4:]
-                                table_name = temp2[0]
-                                val_name = temp2[1]
-                                val_name2 = self.find_value_by_key(row, "Property")
-                                if val_name2 is not None and val_name != val_name2:
-                                    val_name = val_name2
-                            elif row.get("Aggregation", "") != "":
-                                temp = row["Name"]
-                                s1 = temp.find("(") + 1
-                                s2 = temp.rfind(")")
-                                temp2 = temp[s1:s2].split(".")
-
-                                table_name = temp2[0]
-                                val_name = temp2[1]
-                            else:
-                                self._log_data("Unspecified row type", row, 0)
-
-                            # Determine Data Type + Display Name
-                            data_type = None
-                            disp_name = None
-                            for di, dlist in enumerate(data_list):
-                                if temp in dlist:
-                                    data_type = data_type_list[di][1]
-
-                                    for vname in vis_name_disp_name:
-                                        if temp == vname[0]:
-                                            disp_name = vname[1]
-                                            break
-
-                                    break
-                            if not data_type:
-                                data_type = "UNKNOWN Data Type"
-                                self._log_data("Unknown data type", data_type, 1)
-
-                            if not disp_name or disp_name == val_name:
-                                disp_name = None
-
-                            if data[rowi].get("HierarchyLevel", "") != "":
-                                data_type = "Hierarchy"
-                                temp = self.find_value_by_key(data[rowi], "Name").split(
-                                    "."
-                                )
-                                temp2 = self.find_value_by_key(data[rowi], "Level")
-                                disp_name = temp[1] + ": " + temp2
-
-                            self.add_item(
-                                page=page_name,
-                                visual_type=visual_type,
-                                item_name=item_name,
-                                table_name=table_name,
-                                val_name=val_name,
-                                disp_name=disp_name,
-                                data_type=data_type,
-                            )
+        report_progress("pages extracted", len(sections), len(sections))
+        if self.memo_hits or self.memo_misses:
+            self._log_data(
+                f"Visual memo: {self.memo_hits} hits, {self.memo_misses} misses",
+                None,
+                -1,
+            )
 
-                    elif visual_type is None:
-                        self.add_item(
-                            page=page_name,
-                            visual_type="Group",
-                            item_name="",
-                            table_name="",
-                            val_name="",
-                            disp_name=self.find_value_by_key(t, "displayName"),
-                            data_type="Group",
-                        )
+    def visual_memo_key(self, ex_data: dict, visual_type: str) -> bytes:
+        """
+        Hash over everything of a visual container that ends up in the documentation,
+        i.e. its config and filters without the visual name and position
+        """
+        structure = {
+            key: value
+            for key, value in ex_data["config"].items()
+            if key not in ("name", "layouts")
+        }
+        canonical = json.dumps(
+            [visual_type, structure, ex_data.get("filters", [])],
+            separators=(",", ":"),
+            sort_keys=True,
+        )
+        return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
 
-                    elif visual_type == "actionButton":
-                        temp = self.find_value_by_key(t, "type")
-
-                        values = self.find_all_values(t, "Value")
-                        disp_name = ""
-                        item_name = ""
-                        button_type = ""
-                        visual_type = "Button"
-                        table_name = ""
-                        data_type = "Button"
-                        for row in values:
-                            if "title" in row[0]:
-                                disp_name = row[1].replace("'", "")
-                            elif "bookmark" in row[0]:
-                                item_name = row[1].replace("'", "")
-                                val_name = item_name
-                            elif "type" in row[0]:
-                                button_type = row[1].replace("'", "")
-
-                        if button_type == "Bookmark":
-                            temp2 = self.find_value_by_key(t, "bookmark")
-                            item_name = self.find_value_by_key(ex_data, "Value")
-                            item_name = item_name.replace("'", "")
-                            data_type = "Bookmark"
-
-                        elif button_type == "PageNavigation":
-                            temp2 = self.find_value_by_key(t, "navigationSection")
-
-                            ## Find issues
-                            if not temp2:
-                                self._log_data("Page Navigation error", ex_data, 1)
-                                continue
-                            item_name = self.find_value_by_key(temp2, "Value")
-                            item_name = item_name.replace("'", "")
-
-                            data_type = "Page"
-                            disp_name = "Page Navigation"
-                            for x in report_layout["sections"]:
-                                if item_name == x.get("name", ""):
-                                    val_name = x["displayName"]
-                        elif button_type == "custom":
-                            item_name = "Filter"
-                            data_type = "Icon"
-                            disp_name = "Filter Icon"  ## TODO currently not used as visual, is more of a "Button"
-                            continue
-                        else:
-                            self._log_data(
-                                f"Unknown visual type {button_type} on {page_name}",
-                                ex_data,
-                                1,
-                            )
-                            continue
+    def extract_visual_memo(
+        self,
+        page_name: str,
+        ex_data: dict,
+        visual_type: str,
+        config: InputConfig,
+        sections: list,
+    ):
+        """
+        extract_visual + extract_visual_filters, reusing the rows of an earlier visual
+        with the same structure. Only page and visual name are replaced, log records
+        of the first extraction are repeated
+        """
+        key = self.visual_memo_key(ex_data, visual_type)
+        item_name = ex_data["config"]["name"]
+        memo = self.visual_memo.get(key)
+        if memo is not None:
+            self.memo_hits += 1
+            items, filters, records = memo
+            for row in items:
+                self.result.append([page_name, row[1], item_name, *row[3:]])
+            for row in filters:
+                self.filters.append([page_name, item_name, *row[2:]])
+            self.log.add_records(
+                [
+                    {**record, "time": time.strftime("%Y-%m-%d %H:%M:%S")}
+                    for record in records
+                ]
+            )
+            return
+
+        self.memo_misses += 1
+        first_item, first_filter = len(self.result), len(self.filters)
+        first_record = len(self.log.records)
+        if self.extract_visual(page_name, ex_data, visual_type, config, sections):
+            self.extract_visual_filters(page_name, ex_data)
+        self.visual_memo[key] = (
+            self.result[first_item:],
+            self.filters[first_filter:],
+            self.log.records[first_record:],
+        )
 
-                        # visual_type = button_type
+    def add_visual_metrics(self, page_name: str, ex_data: dict, visual_type):
+        """
+        Stores what makes a visual expensive to render, see VISUAL_METRIC_COLUMNS
+        """
+        if ex_data.get("config", "") == "":
+            return
+        single_visual = ex_data["config"].get("singleVisual", {})
+        select = single_visual.get("prototypeQuery", {}).get("Select", [])
+        projections = single_visual.get("projections", {})
+        self.visual_metrics.append(
+            [
+                page_name,
+                ex_data["config"].get("name", ""),
+                visual_type,
+                single_visual.get("display", {}).get("mode") == "hidden",
+                len(select),
+                sum("Measure" in row for row in select),
+                len(projections.get("Rows", [])) + len(projections.get("Columns", [])),
+            ]
+        )
 
-                        self.add_item(
-                            page=page_name,
-                            visual_type=visual_type,
-                            item_name=item_name,
-                            table_name=table_name,
-                            val_name=val_name,
-                            disp_name=disp_name,
-                            data_type=data_type,
-                        )
+    def extract_visual(
+        self,
+        page_name: str,
+        ex_data: dict,
+        visual_type: str | None,
+        config: InputConfig,
+        sections: list,
+    ) -> bool:
+        """
+        Stores all fields used in a single visual container
 
-                    else:
-                        self._log_data(
-                            f"New Visual type not yet supported! {visual_type}",
-                            ex_data,
-                            1,
-                        )
+        returns False if the container should be skipped, including its filters
+        """
+        if ex_data.get("config", "") != "":
+            t = ex_data["config"]
+
+            item_name = t["name"]
+
+            if visual_type in ("shape", "image", "textbox"):
+                return False
+
+            elif visual_type in config.visual_types:
+                data_types = self.find_value_by_key(t, "projections")
+
+                # queryRef -> Output Name, first matching role wins
+                query_ref_types = {}
+                for pbi_name, output_name in config.data_types:
+                    for row in data_types.get(pbi_name, []):
+                        query_ref_types.setdefault(row["queryRef"], output_name)
+
+                # Add Correct Display Names if applicable
+                vis_names = self.find_all_values(t, "Name")
+                vis_disp_names = self.find_all_values(t, "NativeReferenceName")
+                vis_name_disp_name = []
+                for vn in vis_names:
+                    for vdn in vis_disp_names:
+                        if vn[0] == vdn[0]:
+                            vis_name_disp_name.append([vn[1], vdn[1]])
+                            break
+
+                data = self.find_value_by_key(t, "Select")
+
+                temp = None
+                table_name = ""
+                val_name = ""
+                for rowi, row in enumerate(data):
+                    if row.get("HierarchyLevel", "") != "":
+                        temp = self.find_value_by_key(row, "Name")
+                        temp2 = temp.split(".")
+
+                        # Find issues
+                        if len(temp2) <= 2 or isinstance(temp2, str):
+                            self._log_data("Hierarchy is to short", row, 1)
+                            continue
 
-                # Add filters
-                if ex_data.get("filters", []) != []:
-                    t = ex_data["filters"]
+                        table_name = temp2[0]
+                        val_name = temp2[2]
+                    elif row.get("Measure", "") != "" or row.get("Column", "") != "":
+                        temp = row["Name"]
+                        temp2 = temp.split(".", 1)
+                        if temp2[0][0:4] == "Sum(":
+                            temp2[0] = temp2[0][4:]
+                        table_name = temp2[0]
+                        val_name = temp2[1]
+                        val_name2 = self.find_value_by_key(row, "Property")
+                        if val_name2 is not None and val_name != val_name2:
+                            val_name = val_name2
+                    elif row.get("Aggregation", "") != "":
+                        temp = row["Name"]
+                        s1 = temp.find("(") + 1
+                        s2 = temp.rfind(")")
+                        temp2 = temp[s1:s2].split(".")
+
+                        table_name = temp2[0]
+                        val_name = temp2[1]
+                    else:
+                        self._log_data("Unspecified row type", row, 0)
+
+                    # Determine Data Type + Display Name
+                    data_type = query_ref_types.get(temp)
+                    disp_name = None
+                    if data_type:
+                        for vname in vis_name_disp_name:
+                            if temp == vname[0]:
+                                disp_name = vname[1]
+                                break
+                    if not data_type:
+                        data_type = "UNKNOWN Data Type"
+                        self._log_data("Unknown data type", data_type, 1)
+
+                    if not disp_name or disp_name == val_name:
+                        disp_name = None
+
+                    if data[rowi].get("HierarchyLevel", "") != "":
+                        data_type = "Hierarchy"
+                        temp = self.find_value_by_key(data[rowi], "Name").split(".")
+                        temp2 = self.find_value_by_key(data[rowi], "Level")
+                        disp_name = temp[1] + ": " + temp2
+
+                    self.add_item(
+                        page=page_name,
+                        visual_type=visual_type,
+                        item_name=item_name,
+                        table_name=table_name,
+                        val_name=val_name,
+                        disp_name=disp_name,
+                        data_type=data_type,
+                    )
 
-                    local_config = ex_data["config"]
-                    item_name = self.find_value_by_key(local_config, "name")
+            elif visual_type is None:
+                self.add_item(
+                    page=page_name,
+                    visual_type="Group",
+                    item_name="",
+                    table_name="",
+                    val_name="",
+                    disp_name=self.find_value_by_key(t, "displayName"),
+                    data_type="Group",
+                )
 
-                    filter_type = "Visual"
+            elif visual_type == "actionButton":
+                temp = self.find_value_by_key(t, "type")
+
+                values = self.find_all_values(t, "Value")
+                disp_name = ""
+                item_name = ""
+                button_type = ""
+                visual_type = "Button"
+                table_name = ""
+                val_name = ""
+                data_type = "Button"
+                for row in values:
+                    if "title" in row[0]:
+                        disp_name = row[1].replace("'", "")
+                    elif "bookmark" in row[0]:
+                        item_name = row[1].replace("'", "")
+                        val_name = item_name
+                    elif "type" in row[0]:
+                        button_type = row[1].replace("'", "")
+
+                if button_type == "Bookmark":
+                    temp2 = self.find_value_by_key(t, "bookmark")
+                    item_name = self.find_value_by_key(ex_data, "Value")
+                    item_name = item_name.replace("'", "")
+                    data_type = "Bookmark"
+
+                elif button_type == "PageNavigation":
+                    temp2 = self.find_value_by_key(t, "navigationSection")
+
+                    ## Find issues
+                    if not temp2:
+                        self._log_data("Page Navigation error", ex_data, 1)
+                        return False
+                    item_name = self.find_value_by_key(temp2, "Value")
+                    item_name = item_name.replace("'", "")
+
+                    data_type = "Page"
+                    disp_name = "Page Navigation"
+                    for x in sections:
+                        if item_name == x.get("name", ""):
+                            val_name = x["displayName"]
+                elif button_type == "custom":
+                    item_name = "Filter"
+                    data_type = "Icon"
+                    disp_name = "Filter Icon"  ## TODO currently not used as visual, is more of a "Button"
+                    return False
+                else:
+                    self._log_data(
+                        f"Unknown visual type {button_type} on {page_name}",
+                        ex_data,
+                        1,
+                    )
+                    return False
+
+                # visual_type = button_type
+
+                self.add_item(
+                    page=page_name,
+                    visual_type=visual_type,
+                    item_name=item_name,
+                    table_name=table_name,
+                    val_name=val_name,
+                    disp_name=disp_name,
+                    data_type=data_type,
+                )
 
-                    for row in t:
-                        if row.get("filter", "{}") == "{}":
-                            continue
+            else:
+                self._log_data(
+                    f"New Visual type not yet supported! {visual_type}",
+                    ex_data,
+                    1,
+                )
 
-                        all_values = self.find_all_values(row)
-                        comp_values = self.find_comparison_kind_occurrences(row)
+        return True
 
-                        table_name = self.find_value_by_key(row, "Entity")
-                        val_name = self.find_value_by_key(row, "Property")
-                        if val_name is None and self.find_value_by_key(
-                            row, "HierarchyLevel"
-                        ):
-                            val_name = self.find_value_by_key(
-                                row, "HierarchyLevel"
-                            ).get("Level", "UNKNOWN!")
-                            self._log_data("Unknown hierachy level!", row, 1)
-
-                        val_list = ""
-                        if row.get("type", "") == "RelativeDate":
-                            unit = self.find_all_values(row, "TimeUnit")
-
-                            # Is in this
-                            if len(unit) == 1:
-                                val_list = "is"
-                                time_span = unit[0][1]
-                                if time_span == 0:
-                                    val_list += " today"
-                                elif time_span == 1:
-                                    val_list += " in this week"
-                                elif time_span == 2:
-                                    val_list += " in this month"
-                                elif time_span == 3:
-                                    val_list += " in this year"
-
-                                filter_value = ""
+    def extract_visual_filters(self, page_name: str, ex_data: dict):
+        """
+        Stores all visual level filters of a single visual container
+        """
+        if ex_data.get("filters", []) != []:
+            t = ex_data["filters"]
 
-                            else:
-                                if len(unit) == 4:
-                                    include_today = True
-                                elif len(unit) == 6:
-                                    include_today = False
-                                else:
-                                    self._log_data(
-                                        'Unknown "Include Today" setting. Setting value to included',
-                                        row,
-                                        2,
-                                    )
-                                    include_today = True
-
-                                f_val = ""
-                                if unit[2][1] != 0:
-                                    f_val += "calendar "
-                                if unit[1][1] == 0:
-                                    f_val += "days"
-                                elif unit[1][1] == 1:
-                                    f_val += "week"
-                                elif unit[1][1] == 2:
-                                    f_val += "month"
-                                elif unit[1][1] == 3:
-                                    f_val += "year"
-
-                                lb = self.find_all_values(row, "Amount")
-
-                                if lb[0][1] > 0:
-                                    val_list = "is in the next "
-                                else:
-                                    val_list = "is in the last "
-
-                                filter_value = ""
-                                val_list += str(abs(lb[0][1])) + " " + f_val
-                                if include_today:
-                                    val_list += " including today"
-
-                        elif row.get("type", "") == "TopN":
-                            temp_t_name = []
-                            for ttemp in self.find_all_values(row, "Entity"):
-                                if "From[0]" in ttemp[0]:
-                                    temp_t_name.append(ttemp)
-
-                            count = self.find_value_by_key(row, "Top")
-                            temp = self.find_value_by_key(row, "OrderBy")
-
-                            val_list = (
-                                temp_t_name[-1][1]
-                                + "["
-                                + self.find_value_by_key(temp, "Property")
-                                + "]"
-                            )
+            local_config = ex_data["config"]
+            item_name = self.find_value_by_key(local_config, "name")
 
-                            if temp[0].get("Direction", 0) == 2:
-                                order = "Top"
-                            else:
-                                order = "Bottom"
+            filter_type = "Visual"
 
-                            filter_value = "by " + order + " " + str(count)
+            for row in t:
+                if row.get("filter", "{}") == "{}":
+                    continue
 
-                        elif comp_values:
-                            val_list = ""
-                            filter_value = ""
-                            if "And" in all_values[0][0]:
-                                f_add = "and"
-                            elif "Or" in all_values[0][0]:
-                                f_add = "or"
-                            else:
-                                f_add = ""
-
-                            for ival, c_val in enumerate(comp_values):
-                                val_local, _ = self.gen_val_string([all_values[ival]])
-
-                                if c_val == 0:
-                                    if "Not" in all_values[ival][0]:
-                                        if all_values[ival][1] == "null":
-                                            f_value = "is not blank"
-                                            val_local = ""
-                                        else:
-                                            f_value = "is not"
-                                    else:
-                                        if all_values[ival][1] == "null":
-                                            f_value = "is blank"
-                                            val_local = ""
-                                        else:
-                                            f_value = "is"
-
-                                elif c_val == 1:
-                                    f_value = "is greater than"
-                                elif c_val == 2:
-                                    f_value = "is greater than or equal to"
-                                elif c_val == 3:
-                                    f_value = "is less than"
-                                elif c_val == 4:
-                                    f_value = "is less than or equal to"
-                                else:
-                                    f_value = f"Not implemented... :') {c_val}"
+                all_values = self.find_all_values(row)
+                comp_values = self.find_comparison_kind_occurrences(row)
 
-                                val_list += f_value + " " + val_local + " "
-                                if ival == 0:
-                                    val_list += f_add + " "
+                table_name = self.find_value_by_key(row, "Entity")
+                val_name = self.find_value_by_key(row, "Property")
+                if val_name is None and self.find_value_by_key(row, "HierarchyLevel"):
+                    val_name = self.find_value_by_key(row, "HierarchyLevel").get(
+                        "Level", "UNKNOWN!"
+                    )
+                    self._log_data("Unknown hierachy level!", row, 1)
+
+                val_list = ""
+                if row.get("type", "") == "RelativeDate":
+                    unit = self.find_all_values(row, "TimeUnit")
+
+                    # Is in this
+                    if len(unit) == 1:
+                        val_list = "is"
+                        time_span = unit[0][1]
+                        if time_span == 0:
+                            val_list += " today"
+                        elif time_span == 1:
+                            val_list += " in this week"
+                        elif time_span == 2:
+                            val_list += " in this month"
+                        elif time_span == 3:
+                            val_list += " in this year"
 
-                            val_list = " ".join(val_list.split())
+                        filter_value = ""
 
+                    else:
+                        if len(unit) == 4:
+                            include_today = True
+                        elif len(unit) == 6:
+                            include_today = False
                         else:
-                            val_list, is_inverted = self.gen_val_string(all_values)
+                            self._log_data(
+                                'Unknown "Include Today" setting. Setting value to included',
+                                row,
+                                2,
+                            )
+                            include_today = True
+
+                        f_val = ""
+                        if unit[2][1] != 0:
+                            f_val += "calendar "
+                        if unit[1][1] == 0:
+                            f_val += "days"
+                        elif unit[1][1] == 1:
+                            f_val += "week"
+                        elif unit[1][1] == 2:
+                            f_val += "month"
+                        elif unit[1][1] == 3:
+                            f_val += "year"
+
+                        lb = self.find_all_values(row, "Amount")
+
+                        if lb[0][1] > 0:
+                            val_list = "is in the next "
+                        else:
+                            val_list = "is in the last "
 
-                            if is_inverted:
-                                if val_list.find(",") != -1:
-                                    filter_value = "not in"
-                                else:
-                                    filter_value = "<>"
-                            else:
-                                if val_list.find(",") != -1:
-                                    filter_value = "in"
-                                else:
-                                    filter_value = "="
-
-                        self.add_filter(
-                            page=page_name,
-                            item_name=item_name,
-                            filter_type=filter_type,
-                            table_name=table_name,
-                            val_name=val_name,
-                            ver=filter_value,
-                            value=val_list,
-                        )
+                        filter_value = ""
+                        val_list += str(abs(lb[0][1])) + " " + f_val
+                        if include_today:
+                            val_list += " including today"
+
+                elif row.get("type", "") == "TopN":
+                    temp_t_name = []
+                    for ttemp in self.find_all_values(row, "Entity"):
+                        if "From[0]" in ttemp[0]:
+                            temp_t_name.append(ttemp)
+
+                    count = self.find_value_by_key(row, "Top")
+                    temp = self.find_value_by_key(row, "OrderBy")
+
+                    val_list = (
+                        temp_t_name[-1][1]
+                        + "["
+                        + self.find_value_by_key(temp, "Property")
+                        + "]"
+                    )
 
-            # Add page filters
-            filter_data = json.loads(s["filters"])
-            for ex_data in filter_data:
-                filter_type = "This Page"
-                table_name = self.find_value_by_key(ex_data, "Entity")
-                val_name = self.find_value_by_key(ex_data, "Property")
-                if ex_data.get("displayName", "") != "":
-                    item_name = ex_data["displayName"]
-                else:
-                    item_name = val_name
+                    if temp[0].get("Direction", 0) == 2:
+                        order = "Top"
+                    else:
+                        order = "Bottom"
 
-                filter_variant = self.find_value_by_key(ex_data, "type")
+                    filter_value = "by " + order + " " + str(count)
 
-                if filter_variant == "Categorical":
-                    data_list = self.find_value_by_key(ex_data, "Values")
+                elif comp_values:
+                    val_list = ""
+                    filter_value = ""
+                    if "And" in all_values[0][0]:
+                        f_add = "and"
+                    elif "Or" in all_values[0][0]:
+                        f_add = "or"
+                    else:
+                        f_add = ""
 
-                    if data_list:
-                        is_inverted = False
-                        temp = self.find_value_by_key(
-                            ex_data, "isInvertedSelectionMode"
-                        )
-                        if temp:
-                            is_inverted = bool(temp["expr"]["Literal"]["Value"])
+                    for ival, c_val in enumerate(comp_values):
+                        val_local, _ = self.gen_val_string([all_values[ival]])
 
-                        if len(data_list) == 1:
-                            if is_inverted:
-                                filter_ver = "<>"
-                            else:
-                                filter_ver = "="
-                        else:
-                            if is_inverted:
-                                filter_ver = "not in"
+                        if c_val == 0:
+                            if "Not" in all_values[ival][0]:
+                                if all_values[ival][1] == "null":
+                                    f_value = "is not blank"
+                                    val_local = ""
+                                else:
+                                    f_value = "is not"
                             else:
-                                filter_ver = "in"
-
-                        filter_value = ""
-                        for il1, l1 in enumerate(data_list):
-                            filter_value += self.find_value_by_key(l1, "Value")
-                            if il1 < len(data_list) - 1:
-                                filter_value += ", "
-
-                        filter_value = filter_value.replace("'", "")
-
-                        self.add_filter(
-                            page=page_name,
-                            item_name=item_name,
-                            filter_type=filter_type,
-                            table_name=table_name,
-                            val_name=val_name,
-                            ver=filter_ver,
-                            value=filter_value,
-                        )
-                    else:
-                        self._log_data(f"Unused filter on page {page_name}", ex_data, 0)
-                elif filter_variant == "Advanced":
-                    local_row = self.find_value_by_key(ex_data, "Where")
-
-                    for r in local_row:
-                        filter_ver = "is"
-                        temp = self.find_value_by_key(r, "Not")
-                        if temp:
-                            filter_ver = "is not"
-
-                        filter_value = self.find_value_by_key(r, "Right")["Literal"][
-                            "Value"
-                        ]
-                        filter_value = filter_value.replace("'", "")
-
-                        self.add_filter(
-                            page=page_name,
-                            item_name=item_name,
-                            filter_type=filter_type,
-                            table_name=table_name,
-                            val_name=val_name,
-                            ver=filter_ver,
-                            value=filter_value,
-                        )
-                elif filter_variant == "RelativeDate":
-                    LB = self.find_value_by_key(ex_data, "LowerBound")
-                    UB = self.find_value_by_key(ex_data, "UpperBound")
-                    if LB:
-                        temp = LB["DateSpan"]["Expression"]["DateAdd"]
-                        time_am = temp["Amount"]
-                        time_span = temp["TimeUnit"]
-
-                        filter_ver = "in the last"
-                        filter_value = str(abs(time_am))
-
-                        if time_span == 3:
-                            filter_value += " years"
+                                if all_values[ival][1] == "null":
+                                    f_value = "is blank"
+                                    val_local = ""
+                                else:
+                                    f_value = "is"
+
+                        elif c_val == 1:
+                            f_value = "is greater than"
+                        elif c_val == 2:
+                            f_value = "is greater than or equal to"
+                        elif c_val == 3:
+                            f_value = "is less than"
+                        elif c_val == 4:
+                            f_value = "is less than or equal to"
                         else:
-                            filter_value += " unknown unit"
-                            self._log_data("Unknown filter type.", ex_data, 2)
-
-                        if UB:
-                            filter_value += " including today"
-
-                        self.add_filter(
-                            page=page_name,
-                            item_name=item_name,
-                            filter_type=filter_type,
-                            table_name=table_name,
-                            val_name=val_name,
-                            ver=filter_ver,
-                            value=filter_value,
-                        )
+                            f_value = f"Not implemented... :') {c_val}"
 
-                    else:
-                        self._log_data(
-                            "Filter is relative date. No lower bound is set, skipping row!",
-                            ex_data,
-                            2,
-                        )
-                else:
-                    self._log_data("Unknown filter variant", ex_data, 1)
+                        val_list += f_value + " " + val_local + " "
+                        if ival == 0:
+                            val_list += f_add + " "
 
-        shutil.rmtree(pathFolder)
+                    val_list = " ".join(val_list.split())
+
+                else:
+                    val_list, is_inverted = self.gen_val_string(all_values)
+
+                    if is_inverted:
+                        if val_list.find(",") != -1:
+                            filter_value = "not in"
+                        else:
+                            filter_value = "<>"
+                    else:
+                        if val_list.find(",") != -1:
+                            filter_value = "in"
+                        else:
+                            filter_value = "="
+
+                self.add_filter(
+                    page=page_name,
+                    item_name=item_name,
+                    filter_type=filter_type,
+                    table_name=table_name,
+                    val_name=val_name,
+                    ver=filter_value,
+                    value=val_list,
+                )
+
+    def extract_page_filters(self, page_name: str, section: dict):
+        """
+        Stores all page level filters of a report page
+        """
+        filter_data = json.loads(section["filters"])
+        for ex_data in filter_data:
+            filter_type = "This Page"
+            table_name = self.find_value_by_key(ex_data, "Entity")
+            val_name = self.find_value_by_key(ex_data, "Property")
+            if ex_data.get("displayName", "") != "":
+                item_name = ex_data["displayName"]
+            else:
+                item_name = val_name
+
+            filter_variant = self.find_value_by_key(ex_data, "type")
+
+            if filter_variant == "Categorical":
+                data_list = self.find_value_by_key(ex_data, "Values")
+
+                if data_list:
+                    is_inverted = False
+                    temp = self.find_value_by_key(ex_data, "isInvertedSelectionMode")
+                    if temp:
+                        is_inverted = bool(temp["expr"]["Literal"]["Value"])
+
+                    if len(data_list) == 1:
+                        if is_inverted:
+                            filter_ver = "<>"
+                        else:
+                            filter_ver = "="
+                    else:
+                        if is_inverted:
+                            filter_ver = "not in"
+                        else:
+                            filter_ver = "in"
+
+                    filter_value = ""
+                    for il1, l1 in enumerate(data_list):
+                        filter_value += self.find_value_by_key(l1, "Value")
+                        if il1 < len(data_list) - 1:
+                            filter_value += ", "
+
+                    filter_value = filter_value.replace("'", "")
+
+                    self.add_filter(
+                        page=page_name,
+                        item_name=item_name,
+                        filter_type=filter_type,
+                        table_name=table_name,
+                        val_name=val_name,
+                        ver=filter_ver,
+                        value=filter_value,
+                    )
+                else:
+                    self._log_data(f"Unused filter on page {page_name}", ex_data, 0)
+            elif filter_variant == "Advanced":
+                local_row = self.find_value_by_key(ex_data, "Where")
+
+                for r in local_row:
+                    filter_ver = "is"
+                    temp = self.find_value_by_key(r, "Not")
+                    if temp:
+                        filter_ver = "is not"
+
+                    filter_value = self.find_value_by_key(r, "Right")["Literal"][
+                        "Value"
+                    ]
+                    filter_value = filter_value.replace("'", "")
+
+                    self.add_filter(
+                        page=page_name,
+                        item_name=item_name,
+                        filter_type=filter_type,
+                        table_name=table_name,
+                        val_name=val_name,
+                        ver=filter_ver,
+                        value=filter_value,
+                    )
+            elif filter_variant == "RelativeDate":
+                LB = self.find_value_by_key(ex_data, "LowerBound")
+                UB = self.find_value_by_key(ex_data, "UpperBound")
+                if LB:
+                    temp = LB["DateSpan"]["Expression"]["DateAdd"]
+                    time_am = temp["Amount"]
+                    time_span = temp["TimeUnit"]
+
+                    filter_ver = "in the last"
+                    filter_value = str(abs(time_am))
+
+                    if time_span == 3:
+                        filter_value += " years"
+                    else:
+                        filter_value += " unknown unit"
+                        self._log_data("Unknown filter type.", ex_data, 2)
+
+                    if UB:
+                        filter_value += " including today"
+
+                    self.add_filter(
+                        page=page_name,
+                        item_name=item_name,
+                        filter_type=filter_type,
+                        table_name=table_name,
+                        val_name=val_name,
+                        ver=filter_ver,
+                        value=filter_value,
+                    )
+
+                else:
+                    self._log_data(
+                        "Filter is relative date. No lower bound is set, skipping row!",
+                        ex_data,
+                        2,
+                    )
+            else:
+                self._log_data("Unknown filter variant", ex_data, 1)
 
 
 def rgba_tuple_to_hex(color):
@@ -837,65 +1553,167 @@ def run_ui():
         time.sleep(8)
         dpg.hide_item(tag)
 
-    def progress_bar(tag: str):
-        threading.Thread(target=lambda: increment_loader(tag)).start()
-
-    def increment_loader(tag: str):
-        dpg.configure_item(tag, color=colors["W"])
-        i = 0
-        while not stop_event.is_set():
-            time.sleep(0.2)
-            dpg.show_item(tag)
-            dpg.set_value(tag, "." * i)
-            i = (i + 1) % 16
+    def start_progress(tracker: ProgressTracker, cancellable: bool):
+        dpg.set_value("runProgress", 0.0)
+        dpg.configure_item("runProgress", overlay="Starting", show=True)
+        if cancellable:
+            dpg.configure_item("cancelRun", show=True, enabled=True, user_data=tracker)
+        threading.Thread(target=lambda: show_progress(tracker), daemon=True).start()
 
     def run_extractor():
-        global stop_event
         if _PBIX_ != [None, None] and _BIM_ != [None, None]:
-            clear_textbox(container)
-            stop_event = threading.Event()
-            progress_bar("runTextExtra")
-            run_code = run_cmd()
-            stop_event.set()
-            time.sleep(0.5)
-            if run_code == "Log":
-                show_and_hide(
-                    "runTextExtra",
-                    f"Documention generated with warnings. See /{SAVE_NAME}/logs or Logs tab below for more information",
-                    "Y",
-                )
-                update_log()
-            elif run_code != "Success":
-                show_and_hide("runTextExtra", run_code, "R")
+            clear_log()
+            tracker = ProgressTracker()
+            disable_buttons()
+            dpg.hide_item("runTextExtra")
+            threading.Thread(
+                target=lambda: extractor_worker(tracker), daemon=True
+            ).start()
+            start_progress(tracker, cancellable=True)
+
+    def cancel_run(sender, app_data, user_data):
+        user_data.cancel()
+        dpg.configure_item("cancelRun", enabled=False)
+
+    def show_progress(tracker: ProgressTracker):
+        while not tracker.finished.wait(0.2):
+            status = tracker.status()
+            if status["eta"] is None:
+                eta = "estimating time left"
             else:
-                show_and_hide(
-                    "runTextExtra",
-                    f"Documentation generated without any issues. See: /{SAVE_NAME}/{SAVE_NAME}.xlsx",
-                    "G",
-                )
-
-    def update_log():
-        global REPORT_LOG
-
-        error_msg = REPORT_LOG.split("\n\n")
-        for msg in error_msg:
-            if msg == "":
-                continue
+                eta = f"about {status['eta']:.0f} s left"
+            dpg.set_value("runProgress", status["fraction"])
+            dpg.configure_item(
+                "runProgress", overlay=f"{status['text'].capitalize()} - {eta}"
+            )
+        dpg.hide_item("runProgress")
+        dpg.hide_item("cancelRun")
 
-            error_level = msg[0]
+    def extractor_worker(tracker: ProgressTracker):
+        try:
+            run_code = run_cmd(
+                progress=tracker, save_name=SAVE_NAME, colors=default_colors
+            )
+        except RunCancelled:
+            run_code = "Run cancelled"
+        # Any error is shown in the UI, the windowed app has no visible stderr
+        except Exception as e:
+            run_code = f"Documentation failed: {type(e).__name__}: {e}"
+        finally:
+            tracker.finish()
+            enable_buttons()
+
+        if run_code == "Log":
+            show_and_hide(
+                "runTextExtra",
+                f"Documention generated with warnings. See /{SAVE_NAME}/logs or Logs tab below for more information",
+                "Y",
+            )
+            update_log()
+        elif run_code != "Success":
+            show_and_hide("runTextExtra", run_code, "R")
+            update_log()
+        else:
+            show_and_hide(
+                "runTextExtra",
+                f"Documentation generated without any issues. See: /{SAVE_NAME}/{SAVE_NAME}.xlsx",
+                "G",
+            )
 
-            if error_level == "-":
-                c = colors["W"]
-            if error_level == "0":
-                c = colors["W"]
-            elif error_level == "1":
-                c = colors["Y"]
-            elif error_level == "2":
-                c = colors["O"]
-            else:
-                c = colors["R"]
+    # The log viewer only has LOG_ROWS row items, scrolling and filtering change
+    # which records they show instead of creating an item per record
+    LOG_ROWS = 15
+    log_filters = {
+        "All": -1,
+        "Info and above": 0,
+        "Warnings and above": 1,
+        "Errors and above": 2,
+    }
+    log_view = {"records": [], "lines": [], "visible": [], "offset": 0}
+
+    def severity_color(severity: int) -> str:
+        if severity <= 0:
+            return "W"
+        elif severity == 1:
+            return "Y"
+        elif severity == 2:
+            return "O"
+        return "R"
+
+    def log_line(index: int) -> str:
+        """
+        returns the record as a single line, formatted on first use
+        """
+        line = log_view["lines"][index]
+        if line is None:
+            record = log_view["records"][index]
+            payload = REPORT_LOG.payload_text(record).split("\n", 1)[0]
+            line = f"{record['level']}: {record['message']}. Line {record['line']}. {payload[:150]}"
+            log_view["lines"][index] = line
+        return line
 
-            add_colored_text_at_top(container, msg[2:], c)
+    def update_log():
+        log_view["records"] = [] if REPORT_LOG is None else REPORT_LOG.records
+        log_view["lines"] = [None] * len(log_view["records"])
+        filter_log()
+
+    def clear_log():
+        log_view["records"] = []
+        log_view["lines"] = []
+        filter_log()
+
+    def filter_log(*args):
+        min_severity = log_filters[dpg.get_value("logSeverity")]
+        search = dpg.get_value("logSearch").lower()
+        records = log_view["records"]
+
+        # Newest record first
+        visible = []
+        for index in range(len(records) - 1, -1, -1):
+            if records[index]["severity"] < min_severity:
+                continue
+            if search and search not in log_line(index).lower():
+                continue
+            visible.append(index)
+
+        log_view["visible"] = visible
+        log_view["offset"] = 0
+        dpg.configure_item("logScroll", max_value=max(len(visible) - LOG_ROWS, 0))
+        dpg.set_value("logCount", f"{len(visible)} of {len(records)} records")
+        scroll_log(0)
+
+    def render_log():
+        visible = log_view["visible"]
+        for row in range(LOG_ROWS):
+            position = log_view["offset"] + row
+            tag = f"logRow{row}"
+            if position >= len(visible):
+                dpg.hide_item(tag)
+                continue
+            index = visible[position]
+            severity = log_view["records"][index]["severity"]
+            dpg.configure_item(tag, label=log_line(index), user_data=index, show=True)
+            dpg.bind_item_theme(tag, log_themes[severity_color(severity)])
+
+    def scroll_log(offset: int):
+        max_offset = max(len(log_view["visible"]) - LOG_ROWS, 0)
+        log_view["offset"] = min(max(offset, 0), max_offset)
+        dpg.set_value("logScroll", max_offset - log_view["offset"])
+        render_log()
+
+    def scroll_log_wheel(sender, app_data):
+        if dpg.is_item_hovered("logRows"):
+            scroll_log(log_view["offset"] - int(app_data) * 3)
+
+    def scroll_log_slider(sender, app_data):
+        # The slider is vertical, its top is the maximum value
+        max_offset = max(len(log_view["visible"]) - LOG_ROWS, 0)
+        scroll_log(max_offset - app_data)
+
+    def show_log_record(sender, app_data, user_data):
+        dpg.set_value(sender, False)
+        record = log_view["records"][user_data]
+        dpg.set_value("logDetail", REPORT_LOG.format_record(record))
 
     def disable_buttons():
         for tag in ["runPBIX", "genTSV"]:
@@ -906,21 +1724,38 @@ def run_ui():
             dpg.configure_item(tag, enabled=True)
 
     def generate_tsv():
-        global stop_event
         if _PBIX_ != [None, None] and _BIM_ != [None, None]:
-            stop_event = threading.Event()
-            progress_bar("tsvTextExtra")
-            tsv_result = gen_tsv(force=True)
-            stop_event.set()
-            time.sleep(0.5)
-            if tsv_result == "NoTabEd":
-                show_and_hide(
-                    "tsvTextExtra",
-                    "Could Not Find Tabular Editor 2 on PC. Please add location in Input/TabularEditorLocations.txt",
-                    "R",
+            tracker = ProgressTracker()
+            disable_buttons()
+            dpg.hide_item("tsvTextExtra")
+            threading.Thread(target=lambda: tsv_worker(tracker), daemon=True).start()
+            # Tabular Editor runs as one external step, it cannot be cancelled
+            start_progress(tracker, cancellable=False)
+
+    def tsv_worker(tracker: ProgressTracker):
+        try:
+            with use_phase_hooks([tracker]), phase("tsv generation"):
+                tsv_result = gen_tsv(
+                    os.path.join(_BIM_[1], f"{_BIM_[0]}.bim"),
+                    os.path.join(os.getcwd(), SAVE_NAME),
+                    force=True,
                 )
-            else:
-                show_and_hide("tsvTextExtra", "TSV File generated successfully!", "G")
+        # Any error is shown in the UI, the windowed app has no visible stderr
+        except Exception as e:
+            tsv_result = f"TSV generation failed: {type(e).__name__}: {e}"
+        finally:
+            tracker.finish()
+            enable_buttons()
+        if tsv_result == "NoTabEd":
+            show_and_hide(
+                "tsvTextExtra",
+                "Could Not Find Tabular Editor 2 on PC. Please add location in Input/TabularEditorLocations.txt",
+                "R",
+            )
+        elif tsv_result is not None:
+            show_and_hide("tsvTextExtra", tsv_result, "R")
+        else:
+            show_and_hide("tsvTextExtra", "TSV File generated successfully!", "G")
 
     ### UI Functions ###
     def load_file(input):
@@ -966,6 +1801,8 @@ def run_ui():
                     ]
                     enable_buttons()
 
+                import pandas as pd
+
                 rep_ex = ReportExtractor(_PBIX_[1], _PBIX_[0] + ".pbix")
                 rep_ex.extract()
                 report_info = pd.DataFrame(
@@ -1044,18 +1881,6 @@ def run_ui():
         global LOG_DATA
         LOG_DATA = dpg.get_value(sender)
 
-    def add_colored_text_at_top(container, text, color):
-        new_text = dpg.add_text(text, parent=container, color=color)
-        children = dpg.get_item_children(container)[1]
-        if len(children) > 1:
-            dpg.move_item(new_text, parent=container, before=children[0])
-
-    def clear_textbox(container):
-        children = dpg.get_item_children(container, 1)
-        for child in children:
-            if dpg.get_item_type(child) == "mvAppItemType::mvText":
-                dpg.delete_item(child)
-
     def add_input(version):
         cwd = os.getcwd() + "\\Input\\"
 
@@ -1133,6 +1958,15 @@ def run_ui():
             dpg.add_theme_color(dpg.mvThemeCol_ButtonActive, [75, 75, 77])
     dpg.bind_theme(disabled_theme)
 
+    log_themes = {}
+    for key, color in colors.items():
+        with dpg.theme() as log_themes[key]:
+            with dpg.theme_component(dpg.mvAll):
+                dpg.add_theme_color(dpg.mvThemeCol_Text, color)
+
+    with dpg.handler_registry():
+        dpg.add_mouse_wheel_handler(callback=scroll_log_wheel)
+
     with dpg.texture_registry(show=False):
         width, height, channels, data = dpg.load_image("logo_large.png")
         dpg.add_static_texture(
@@ -1225,6 +2059,11 @@ def run_ui():
                 show=False,
                 tag="runTextExtra",
             )
+            with dpg.group(horizontal=True):
+                dpg.add_progress_bar(tag="runProgress", width=600, show=False)
+                dpg.add_button(
+                    label="Cancel", tag="cancelRun", show=False, callback=cancel_run
+                )
             dpg.add_spacer(height=20)
 
         with dpg.collapsing_header(
@@ -1264,9 +2103,40 @@ def run_ui():
                 )
 
         with dpg.collapsing_header(label="Logs", default_open=False, tag="Logs"):
+            with dpg.group(horizontal=True):
+                dpg.add_combo(
+                    list(log_filters),
+                    default_value="All",
+                    tag="logSeverity",
+                    width=160,
+                    callback=filter_log,
+                )
+                dpg.add_input_text(
+                    hint="Search", tag="logSearch", width=300, callback=filter_log
+                )
+                dpg.add_text("0 of 0 records", tag="logCount")
+
             with dpg.group(horizontal=True, tag="log_data"):
-                with dpg.child_window(width=880, height=300):
-                    container = dpg.add_child_window(width=960, height=280)
+                with dpg.child_window(
+                    width=840, height=300, tag="logRows", no_scrollbar=True
+                ):
+                    for row in range(LOG_ROWS):
+                        dpg.add_selectable(
+                            label="",
+                            tag=f"logRow{row}",
+                            show=False,
+                            callback=show_log_record,
+                        )
+                dpg.add_slider_int(
+                    tag="logScroll",
+                    vertical=True,
+                    height=300,
+                    width=20,
+                    min_value=0,
+                    max_value=0,
+                    format="",
+                    callback=scroll_log_slider,
+                )
 
                 with dpg.child_window(width=80, height=300):
                     texts = ["Debug", "Info", "Warning", "Error", "Critical"]
@@ -1280,6 +2150,10 @@ def run_ui():
                             )
                         dpg.add_text(texts[i])
 
+            dpg.add_input_text(
+                tag="logDetail", multiline=True, readonly=True, width=940, height=120
+            )
+
         with dpg.collapsing_header(
             label="User Input", default_open=False, tag="User Input"
         ):
@@ -1360,16 +2234,31 @@ def run_ui():
     dpg.destroy_context()
 
 
-def gen_tsv(force: bool = False):
-    cwd = os.getcwd() + f"\\{SAVE_NAME}"
+def gen_tsv(
+    bim_path: str,
+    output_folder: str,
+    force: bool = False,
+    input_folder: str | None = None,
+):
+    """
+    Runs Tabular Editor on the .bim file to write output_folder/documentation.tsv
+
+    input_folder: folder holding TabularEditorLocations.txt, defaults to ./Input
+
+    returns "NoTabEd" if Tabular Editor could not be found
+    """
+    cwd = output_folder
 
     if not os.path.exists(cwd):
         os.makedirs(cwd)
 
+    if input_folder is None:
+        input_folder = os.path.join(os.getcwd(), "Input")
+
     def find_tabular_editor_path() -> str:
         target_exe = Path("TabularEditor.exe")
 
-        input_dir = os.getcwd() + "\\Input\\TabularEditorLocations.txt"
+        input_dir = os.path.join(input_folder, "TabularEditorLocations.txt")
 
         # Default directories to search
         if not os.path.exists(input_dir):
@@ -1390,9 +2279,7 @@ def gen_tsv(force: bool = False):
         for directory in common_directories:
             target_path = directory / "Tabular Editor" / target_exe
             if target_path.exists():
-                result = str(target_path)
-                result = '"' + result + '"'
-                return result
+                return str(target_path)
 
         # Return None if the executable file is not found
         return None
@@ -1401,11 +2288,12 @@ def gen_tsv(force: bool = False):
     if tab_edit_path is None:
         return "NoTabEd"
 
-    if force and os.path.exists(f"{cwd}\\TabularScript.cs"):
-        os.remove(f"{cwd}\\TabularScript.cs")
+    script_path = os.path.join(cwd, "TabularScript.cs")
+    if force and os.path.exists(script_path):
+        os.remove(script_path)
 
     ## If file not present, create it!
-    if not os.path.isfile(f"{cwd}\\TabularScript.cs"):
+    if not os.path.isfile(script_path):
         cwd_parsed = cwd.replace("\\", "//")
 
         c_code = f"""
@@ -1430,18 +2318,16 @@ def gen_tsv(force: bool = False):
     // Save the TSV to a file:
     SaveFile("{cwd_parsed}//documentation.tsv", tsv);
     """
-        with open(f"{cwd}\\TabularScript.cs", "w", encoding="utf-8") as file:
+        with open(script_path, "w", encoding="utf-8") as file:
             file.write(c_code)
 
-    tsv_path = Path(f"{cwd}\\documentation.tsv")
+    tsv_path = os.path.join(cwd, "documentation.tsv")
 
     if os.path.exists(tsv_path):
         os.remove(tsv_path)
 
-    command = (
-        f'& {tab_edit_path} "{_BIM_[1]}/{_BIM_[0]}.bim" -S "{cwd}\\TabularScript.cs"'
-    )
-    process = subprocess.Popen(["powershell", "-Command", command])
+    # Arguments are passed as a list, paths are never parsed by a shell
+    process = subprocess.Popen([tab_edit_path, bim_path, "-S", script_path])
     process.wait()
 
     ## Wait for file gen -
@@ -1457,867 +2343,4709 @@ def gen_tsv(force: bool = False):
                 )
             time.sleep(0.1)
 
-    wait_for_file(file_path=f"{cwd}\\documentation.tsv", timeout=5)
-
+    wait_for_file(file_path=tsv_path, timeout=5)
 
-def write_to_excel(worksheet, row: int, col: int, text: list[str]):
-    # if len(text) <= 2:
-    #     worksheet.write(row, col, *text)
-    # else:
-    #     if 'Group: ' in text:
-    #         1
-    #     worksheet.write_rich_string(row, col, *text)
-    # If text is a list of strings
-
-    if isinstance(text, list):
-        if len(text) <= 2:
-            # Join the elements into a single string and write to the cell
-            worksheet.write(
-                row, col, " ".join(map(str, text))
-            )  # Joining items with a space
-        else:
-            # Write a rich formatted string for lists longer than 2 elements
-            # The first and last elements should be plain strings, and the rest are formats/strings
-            worksheet.write_rich_string(row, col, *text)
-    else:
-        # If text is not a list, write the single value
-        worksheet.write(row, col, text)
 
-
-def is_excel_open_with_file(file_path: str) -> bool:
+def compact_rich_string(fragments: list) -> list[tuple]:
     """
-    Check if Excel is open with a specific file.
+    Merges consecutive rich string fragments that share the same format into single runs
 
-    Parameters:
-        file_path (str): The path of the Excel file to check.
+    fragments: list of [format, string, string, format, string, ...] as built by the highlighter.
+        A format applies to the string directly after it, strings without a leading format are plain
 
-    Returns:
-        bool: True if Excel is open with the specified file, False otherwise.
+    returns [(format or None, text), ...] with empty strings and dangling formats removed
     """
-    for process in psutil.process_iter():
-        try:
-            if process.name().lower() == "excel.exe":
-                for file in process.open_files():
-                    if file.path.lower() == file_path.lower():
-                        return True
-        except (psutil.NoSuchProcess, psutil.AccessDenied, psutil.ZombieProcess):
-            pass
-    return False
+    from xlsxwriter.format import Format
+
+    runs = []
+    current_format = None
+    for fragment in fragments:
+        if isinstance(fragment, Format):
+            current_format = fragment
+            continue
 
+        fragment = str(fragment)
+        if fragment != "":
+            if runs and runs[-1][0] is current_format:
+                runs[-1][1].append(fragment)
+            else:
+                runs.append((current_format, [fragment]))
+        current_format = None
 
-def run_cmd():
-    global SAVE_NAME, _BIM_, _PBIX_, LOG_DATA, REPORT_LOG
+    return [(run_format, "".join(parts)) for run_format, parts in runs]
 
-    cwd = os.getcwd()
-    cwd_save = cwd + f"\\{SAVE_NAME}"
 
-    file_path = f"{cwd_save}\\{SAVE_NAME}.xlsx"
-    if is_excel_open_with_file(file_path):
-        return f"Please Close File: {SAVE_NAME}.xlsx before proceeding!"
+def write_to_excel(worksheet, row: int, col: int, text: list[str]):
+    """
+    Writes text to a cell. Lists of formats and strings are compacted and written as
+    a rich string, or as a plain string if no formatting is left after compaction.
+    Rich strings keep the column format as cell format (text wrap, alignment)
+    """
+    if not isinstance(text, list):
+        worksheet.write(row, col, text)
+        return
+
+    runs = compact_rich_string(text)
+    if not runs:
+        return
+
+    if len(runs) == 1:
+        run_format, string = runs[0]
+        if run_format is None:
+            worksheet.write_string(row, col, string)
+        elif len(string) > 1:
+            # A rich string needs two runs, a run format passed to write_string would
+            # replace the column format instead
+            worksheet.write_rich_string(
+                row, col, run_format, string[:1], run_format, string[1:]
+            )
+        else:
+            worksheet.write_string(row, col, string, run_format)
+        return
 
-    button_type_list = ["Bookmark", "PageNavigation", "Button"]
+    rich_args = []
+    for run_format, string in runs:
+        if run_format is not None:
+            rich_args.append(run_format)
+        rich_args.append(string)
+    worksheet.write_rich_string(row, col, *rich_args)
 
-    tsv_path = Path(f"{cwd_save}\\documentation.tsv")
-    if not os.path.isfile(tsv_path):
-        if gen_tsv() == "NoTabEd":
-            return "NoTabEd"
 
-    rep_ex = ReportExtractor(
-        _PBIX_[1],
-        f"{_PBIX_[0]}.pbix",
-    )
+def is_file_locked(file_path: str) -> bool:
+    """
+    Check if a file is locked by another program (e.g. opened in Excel) without
+    enumerating processes.
 
-    rep_ex.extract()
-
-    report_info = pd.DataFrame(
-        rep_ex.result,
-        columns=[
-            "Page",
-            "Visual Type",
-            "Visual ID",
-            "Table",
-            "Name",
-            "Display Name",
-            "Type",
-        ],
-    )
+    Parameters:
+        file_path (str): The path of the file to check.
 
-    report_filters = []
-    [
-        report_filters.append(sublist)
-        for sublist in rep_ex.filters
-        if sublist not in report_filters
-    ]
-    report_filters_string = [
-        [
-            sublist[0],
-            sublist[1],
-            sublist[2],
-            f"{sublist[3]}[{sublist[4]}]",
-            " ".join(sublist[5:]),
-        ]
-        for sublist in report_filters
-    ]
+    Returns:
+        bool: True if the file exists and cannot be opened for writing, False otherwise.
+    """
+    if not os.path.exists(file_path):
+        return False
 
-    REPORT_LOG = rep_ex.log
+    # Excel keeps an owner file '~$<name>' next to every workbook it has open
+    folder, name = os.path.split(file_path)
+    if os.path.exists(os.path.join(folder, "~$" + name)):
+        return True
 
-    def find_nth_occurence(substring: str, string: str, n: int) -> int:
-        """
-        returns starting index of n:th substring in string
-        """
-        count = 0
-        index = -1
+    try:
+        with open(file_path, "r+b"):
+            pass
+    except PermissionError:
+        return True
+    except OSError:
+        return False
+    return False
 
-        while count < n:
-            index = string.find(substring, index + 1)
 
-            if index == -1:
-                break
+def replace_file(temp_path: str, file_path: str):
+    """
+    Atomically swaps a fully written temp file in place of file_path. The temp file
+    is removed if the target is locked, leaving the previous file untouched
+    """
+    try:
+        os.replace(temp_path, file_path)
+    except PermissionError:
+        os.remove(temp_path)
+        raise
+
+
+REPORT_INFO_COLUMNS = [
+    "Page",
+    "Visual Type",
+    "Visual ID",
+    "Table",
+    "Name",
+    "Display Name",
+    "Type",
+]
 
-            count += 1
+VISUAL_METRIC_COLUMNS = [
+    "Page",
+    "Visual ID",
+    "Visual Type",
+    "Hidden",
+    "Fields",
+    "Measures",
+    "Grouping Fields",
+]
 
-        return index
+PAGE_METRIC_COLUMNS = [
+    "Page",
+    "Visuals",
+    "Query Visuals",
+    "Data Fields",
+    "Max Fields per Visual",
+    "Slicers",
+    "High Fanout Matrices",
+    "Measure Heavy Visuals",
+]
 
-    def find_vars(string: str) -> tuple[str]:
-        """Returns all formatted variable names"""
-        var_names = []
-        tokens = string.split()
+PERFORMANCE_FINDING_COLUMNS = ["Page", "Visual ID", "Metric", "Value", "Limit"]
 
-        if tokens.count("VAR") != 0:
-            indexes = [index for index, value in enumerate(tokens) if value == "VAR"]
+REPORT_FILTER_COLUMNS = [
+    "Page",
+    "Visual ID",
+    "Filter Type",
+    "Table",
+    "Name",
+    "Operator",
+    "Value",
+]
 
-            for index in indexes:
-                var_names.append(tokens[index + 1])
+MODEL_OBJECT_COLUMNS = [
+    "Type",
+    "Name",
+    "DataType",
+    "Description",
+    "Definition",
+    "Table",
+    "Dependants",
+    "Format",
+    "Folder",
+    "Comment",
+]
 
-        return var_names
+RELATIONSHIP_COLUMNS = ["Type", "Child", "Direction", "Parent"]
 
-    def find_functions(string: str) -> tuple[str]:
-        """
-        Checks through input string and returns list of all known functions
-        """
-        used_functions = []
 
-        for func in known_functions:
-            if string.find(func) != -1:
-                used_functions.append(func)
+def find_nth_occurence(substring: str, string: str, n: int) -> int:
+    """
+    returns starting index of n:th substring in string
+    """
+    count = 0
+    index = -1
 
-        return used_functions
+    while count < n:
+        index = string.find(substring, index + 1)
 
-    def find_measures(string: str) -> tuple[str]:
-        pattern = r"\[.*?\]"
-        all_measures = re.findall(pattern, string)
-        unique_measures = list(set(all_measures))
-        return unique_measures
+        if index == -1:
+            break
 
-    def find_columns(string: str) -> tuple[str]:
-        pattern = re.compile(r"(\w+)\[(.*?)\]")
-        all_columns = re.findall(pattern, string)
-        unique_columns = list(set(all_columns))
-        return unique_columns
+        count += 1
 
-    def get_data_type(string: str) -> tuple[str, str, str]:
-        data = "Table"
-        start_pos = find_nth_occurence(".", string, 2) + 1
-        end_pos = find_nth_occurence(".", string, 3)
-        if end_pos == -1:
-            table = string[start_pos:]
-        else:
-            table = string[start_pos:end_pos]
-
-        column = ""
-        if any(substring in string for substring in [".C.", ".H.", ".M."]):
-            start_pos = find_nth_occurence(".", string, 4) + 1
-            end_pos = find_nth_occurence(".", string, 5)
-            if end_pos == -1 or end_pos < len(string):
-                column = string[start_pos:]
-            else:
-                column = string[start_pos:end_pos]
+    return index
 
-            if column[0] == "[":
-                column = column[1:]
-            if column[-1] == "]":
-                column = column[:-1]
 
-            if ".C." in string:
-                data = "Column"
-            elif ".H." in string:
-                data = "Hierarchy"
-            elif ".M." in string:
-                data = "Measure"
+def find_vars(string: str) -> tuple[str]:
+    """Returns all formatted variable names"""
+    var_names = []
+    tokens = string.split()
 
-        return (data, table, column)
+    if tokens.count("VAR") != 0:
+        indexes = [index for index, value in enumerate(tokens) if value == "VAR"]
 
-    # Create the DataFrame
-    data = {
-        "Type": [],
-        "Name": [],
-        "DataType": [],
-        "Description": [],
-        "Definition": [],
-        "Table": [],
-        "Dependants": [],
-        "Format": [],
-        "Folder": [],
-        "Comment": [],
-    }
+        for index in indexes:
+            var_names.append(tokens[index + 1])
 
-    df = pd.DataFrame(data)
+    return var_names
 
-    # Define indexes of special columns
-    definition_index = list(data.keys()).index("Definition")
-    parent_index = list(data.keys()).index("Dependants")
 
-    # Define lists for future calculations
-    unused_columns = []
-    all_tables = []
-    all_relationships = []
-    all_hierarchies = []
-    all_visuals = []
-
-    # Determine which items are used in which visual and on which page
-    for visual_id, cols in report_info.groupby("Visual ID"):
-        temp_visuals = [cols.iloc()[0]["Page"], 0]
-        for _, row in cols.iterrows():
-            temp_visuals.append((row["Table"], row["Name"]))
-        all_visuals.append(temp_visuals)
-
-    unique_pages = list(set(item[0] for item in all_visuals))
-    unique_pages_index = [0 for i in range(len(unique_pages))]
-
-    for ind, visual in enumerate(all_visuals):
-        page_index = unique_pages.index(visual[0])
-        all_visuals[ind][1] = unique_pages_index[page_index]
-        unique_pages_index[page_index] += 1
-
-    dataset = pd.read_csv(
-        f"{cwd_save}\\documentation.tsv",
-        sep="\t",
-        header=0,
-    )
-    excel_file = cwd_save + "\\" + SAVE_NAME + ".xlsx"
+def find_functions(string: str, known_functions: frozenset) -> tuple[str]:
+    """
+    Checks through input string and returns list of all known functions
+    """
+    return list(known_functions.intersection(re.findall(r"\w+", string)))
 
-    # Extract all Table names
-    tab_rel_pattern = (
-        r"^Relationship\.[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
-    )
-    for i in range(len(dataset)):
-        data_type = get_data_type(dataset.iloc[i]["Object"])
-        if data_type[0] == "Table":
-            rel_pattern = re.match(tab_rel_pattern, data_type[1])
-            if rel_pattern is not None and rel_pattern not in all_relationships:
-                all_relationships.append(dataset.iloc[i]["Name"])
-
-            elif data_type[1] not in all_tables and "Relationship." not in data_type[1]:
-                all_tables.append(data_type[1])
-
-    # Remove excess " ' " surrounding table names
-    escape_pattern = r"'(?:\s*)(" + "|".join(map(re.escape, all_tables)) + r")(?:\s*)'"
-    for i, row in enumerate(dataset.iloc()):
-        exp = row["Expression"]
-        if pd.isna(exp):
-            continue
 
-        exp = exp.replace("\\t", "    ")
+def find_measures(string: str) -> tuple[str]:
+    pattern = r"\[.*?\]"
+    all_measures = re.findall(pattern, string)
+    unique_measures = list(set(all_measures))
+    return unique_measures
 
-        match = re.search(escape_pattern, exp)
-        if match:
-            dataset.at[i, "Expression"] = exp.replace(match.group(0), match.group(1))
 
-    # Read .tsv file and convert to usable dataframe
-    for i in range(len(dataset)):
-        line_data = dataset.iloc[i]
+def find_columns(string: str) -> tuple[str]:
+    pattern = re.compile(r"(\w+)\[(.*?)\]")
+    all_columns = re.findall(pattern, string)
+    unique_columns = list(set(all_columns))
+    return unique_columns
 
-        data_type = get_data_type(line_data["Object"])
 
-        # Currently don't need to do anything with all tables or hierarchies
-        if data_type[0] == "Table":
-            continue
+def get_data_type(string: str) -> tuple[str, str, str]:
+    data = "Table"
+    start_pos = find_nth_occurence(".", string, 2) + 1
+    end_pos = find_nth_occurence(".", string, 3)
+    if end_pos == -1:
+        table = string[start_pos:]
+    else:
+        table = string[start_pos:end_pos]
+
+    column = ""
+    if any(substring in string for substring in [".C.", ".H.", ".M."]):
+        start_pos = find_nth_occurence(".", string, 4) + 1
+        end_pos = find_nth_occurence(".", string, 5)
+        if end_pos == -1 or end_pos < len(string):
+            column = string[start_pos:]
+        else:
+            column = string[start_pos:end_pos]
+
+        if column[0] == "[":
+            column = column[1:]
+        if column[-1] == "]":
+            column = column[:-1]
+
+        if ".C." in string:
+            data = "Column"
+        elif ".H." in string:
+            data = "Hierarchy"
+        elif ".M." in string:
+            data = "Measure"
+
+    return (data, table, column)
+
+
+DAX_FINDING_COLUMNS = [
+    "Table",
+    "Name",
+    "Type",
+    "Rule",
+    "Severity",
+    "Line",
+    "Column",
+    "Snippet",
+]
 
-        elif data_type[0] == "Hierarchy":
-            all_hierarchies.append((data_type[1], data_type[2]))
-            continue
+DAX_ITERATORS = frozenset(
+    [
+        "SUMX",
+        "AVERAGEX",
+        "MINX",
+        "MAXX",
+        "COUNTX",
+        "COUNTAX",
+        "PRODUCTX",
+        "RANKX",
+        "CONCATENATEX",
+        "MEDIANX",
+    ]
+)
 
-        elif data_type[0] == "Column" or data_type[0] == "Measure":
-            unused_columns.append((data_type[1], data_type[2]))
+# Comments, strings, 'table names' and [column names]. Masked before parsing so the
+# brackets and commas in them are not read as code
+_DAX_MASK_PATTERN = re.compile(
+    r"//[^\n]*|--[^\n]*|/\*.*?\*/|\"(?:[^\"]|\"\")*\"|'(?:[^']|'')*'|\[[^\]]*\]",
+    re.DOTALL,
+)
+_DAX_CALL_PATTERN = re.compile(r"([A-Za-z_][\w.]*)\s*\(|[(),]")
+_DAX_TABLE_PATTERN = re.compile(r"^(?:'_*'|[A-Za-z_]\w*)$")
+_DAX_VAR_PATTERN = re.compile(r"\bVAR\s+([A-Za-z_]\w*)", re.IGNORECASE)
 
-        if not isinstance(line_data["Expression"], float):
-            definition = line_data["Expression"]
-            definition = definition.replace("    ", "\t")
-            definition = definition.replace("\\n", "\n")
-        else:
-            definition = ""
 
-        # Extract description if embedded in definition
-        if definition.find(DESCRIPT_TAG) != -1:
-            comment_start = find_nth_occurence(DESCRIPT_TAG, definition, 1) + 5
-            comment_end = find_nth_occurence(DESCRIPT_TAG, definition, 2) - 1
-            definition_start = comment_end + 6
-        else:
-            comment_start = 0
-            comment_end = comment_start
-            definition_start = comment_start
-
-        df_type = data_type[0]
-        df_name = line_data["Name"]
-        df_data_type = line_data["DataType"]
-        if pd.isna(line_data["Description"]):
-            df_description = definition[comment_start:comment_end].strip()
-            df_description = df_description.replace("\\n", "\\r\\n")
-        else:
-            df_description = line_data["Description"]
-        df_definition = definition[definition_start:].strip()
-        df_definition = df_definition.replace("\n", "\r\n")
-        df_table = data_type[1]
-        df_format = (
-            ""
-            if pd.isna(line_data.get("FormatString", ""))
-            else line_data.get("FormatString", "")
-        )
-        df_display = (
-            ""
-            if pd.isna(line_data.get("DisplayFolder", ""))
-            else line_data.get("DisplayFolder", "")
-        )
+def _mask_dax(match: re.Match) -> str:
+    text = match.group(0)
+    if text[0] in "/-":
+        return re.sub(r"[^\n]", " ", text)
+    return text[0] + "_" * (len(text) - 2) + text[-1]
 
-        # Find which page the measures/calculations are on
-        df_report_pages = []
-        for i, row in enumerate(report_info["Name"]):
-            if row == df_name:
-                df_report_pages.append(report_info["Page"][i])
-
-        new_data = {
-            "Type": df_type,
-            "Name": df_name,
-            "DataType": df_data_type,
-            "Description": df_description,
-            "Definition": df_definition,
-            "Table": df_table,
-            "Dependants": "",
-            "Format": df_format,
-            "Folder": df_display,
-            "Comment": "",
-        }
 
-        df.loc[-1] = new_data
-        df.index = df.index + 1
-    df = df.sort_index()
+def parse_dax_calls(code: str) -> list[list]:
+    """
+    Finds all function calls in masked DAX code
 
-    data = {
-        "Type": [],
-        "Child": [],
-        "Direction": [],
-        "Parent": [],
-    }
+    returns [NAME, start, end, [(arg_start, arg_end), ...], parent call index or -1]
+    in order of their start
+    """
+    calls = []
+    stack = []  # (call index or -1 for plain brackets, start of the current argument)
+    for match in _DAX_CALL_PATTERN.finditer(code):
+        token = match.group(0)
+        if match.group(1) is not None:
+            parent = next((index for index, _ in reversed(stack) if index != -1), -1)
+            calls.append([match.group(1).upper(), match.start(), None, [], parent])
+            stack.append((len(calls) - 1, match.end()))
+        elif token == "(":
+            stack.append((-1, match.end()))
+        elif not stack:
+            continue
+        elif token == ",":
+            index, arg_start = stack[-1]
+            if index != -1:
+                calls[index][3].append((arg_start, match.start()))
+                stack[-1] = (index, match.end())
+        else:
+            index, arg_start = stack.pop()
+            if index != -1:
+                calls[index][3].append((arg_start, match.start()))
+                calls[index][2] = match.end()
+    # Unbalanced brackets, the call runs to the end
+    for call in calls:
+        if call[2] is None:
+            call[2] = len(code)
+    return calls
+
+
+def lint_dax(definition: str) -> list[tuple[str, str, int, str]]:
+    """
+    Checks one DAX expression for patterns known to be slow
 
-    df_relations = pd.DataFrame(data)
-    for row in sorted(all_relationships):
-        i1 = row.find("]") + 1
-        i2 = row.find(">") + 2
-        t1 = row[:i1].replace("'", "")
-        t2 = row[i2:].replace("'", "")
-        rel = row[i1 + 1 : i2 - 1]
-
-        relation = "Unknown Type"
-        if rel == "-->":
-            relation = "One Way"
-        if rel == "<-->":
-            relation = "Two Way"
-
-        new_data_rel = {
-            "Type": "Relationship",
-            "Child": t1.split("[")[0],
-            "Direction": relation,
-            "Parent": t2.split("[")[0],
-        }
-        df_relations.loc[-1] = new_data_rel
-        df_relations.index = df_relations.index + 1
-    df_relations = df_relations.sort_index()
+    returns (rule, severity, position, snippet) per finding
+    """
+    code = _DAX_MASK_PATTERN.sub(_mask_dax, definition)
+    calls = parse_dax_calls(code)
+    var_names = {name.upper() for name in _DAX_VAR_PATTERN.findall(code)}
+    findings = []
+
+    def add(rule: str, severity: str, call: list):
+        snippet = " ".join(definition[call[1] : call[2]].split())
+        findings.append((rule, severity, call[1], snippet[:120]))
+
+    def arg_code(call: list, arg: int) -> str:
+        if arg >= len(call[3]):
+            return ""
+        return code[call[3][arg][0] : call[3][arg][1]].strip()
+
+    for call in calls:
+        name, parent = call[0], call[4]
+        parent_name = calls[parent][0] if parent != -1 else None
+
+        if name == "FILTER" and parent_name in ("CALCULATE", "CALCULATETABLE"):
+            table = arg_code(call, 0)
+            if (
+                _DAX_TABLE_PATTERN.match(table)
+                and table.upper() not in var_names
+                and calls[parent][3]
+                and call[1] >= calls[parent][3][0][1]
+            ):
+                add(
+                    "FILTER over a whole table inside CALCULATE, filter the columns instead",
+                    "Warning",
+                    call,
+                )
+        elif name in ("IFERROR", "ISERROR"):
+            add(
+                f"{name} forces row by row error handling, e.g. use DIVIDE",
+                "Warning",
+                call,
+            )
+        elif name == "COUNTROWS" and arg_code(call, 0).upper().startswith("FILTER"):
+            add(
+                "COUNTROWS(FILTER(...)), use CALCULATE(COUNTROWS(...), filters)",
+                "Info",
+                call,
+            )
+        elif name == "CROSSFILTER" and arg_code(call, 2).upper() == "BOTH":
+            add("Bidirectional CROSSFILTER", "Warning", call)
+
+        if name in DAX_ITERATORS:
+            while parent != -1 and calls[parent][0] not in DAX_ITERATORS:
+                parent = calls[parent][4]
+            if parent != -1:
+                add(f"{name} nested in {calls[parent][0]}", "Warning", call)
+
+    # Repeated sub-expressions, only the largest repeated call is reported
+    occurrences = {}
+    for call in calls:
+        if call[2] - call[1] >= 15:
+            key = " ".join(definition[call[1] : call[2]].split()).upper()
+            occurrences.setdefault(key, []).append(call)
+    reported = []
+    for key in sorted(occurrences, key=len, reverse=True):
+        repeated = occurrences[key]
+        if len(repeated) < 2:
+            continue
+        first = repeated[0]
+        if any(start <= first[1] and first[2] <= end for start, end in reported):
+            continue
+        reported.extend((call[1], call[2]) for call in repeated)
+        add(
+            f"Expression repeated {len(repeated)} times, store it in a VAR",
+            "Info",
+            first,
+        )
 
-    def generate_graph(df_relations: pd.DataFrame, w: int, h: int):
-        G = nx.DiGraph()
+    findings.sort(key=lambda finding: finding[2])
+    return findings
 
-        for _, row in df_relations.iterrows():
-            task_id = row["Child"]
-            parent_task = row["Parent"]
 
-            G.add_node(task_id)
-            if not pd.isnull(parent_task):
-                G.add_edge(str(parent_task), task_id)
+def lint_model_dax(model_objects: pd.DataFrame) -> pd.DataFrame:
+    """
+    Runs lint_dax over every measure and calculated column definition
 
-        def split_label(label):
-            return re.sub(r"([a-z])([A-Z])", r"\1\n\2", label)
+    returns DataFrame with DAX_FINDING_COLUMNS, Line/Column are 1 based
+    """
+    import pandas as pd
+
+    rows = []
+    with phase("dax lint"):
+        for table, name, object_type, definition in zip(
+            model_objects["Table"],
+            model_objects["Name"],
+            model_objects["Type"],
+            model_objects["Definition"],
+        ):
+            if not isinstance(definition, str) or "(" not in definition:
+                continue
+            try:
+                findings = lint_dax(definition)
+            # Whatever a broken definition raises, the other definitions are still linted
+            except Exception as e:
+                # Reported as a finding, the model analysis is shared and has no log
+                findings = [
+                    (
+                        f"Could not be checked: {type(e).__name__}: {e}",
+                        "Error",
+                        0,
+                        " ".join(definition.split())[:120],
+                    )
+                ]
+            for rule, severity, position, snippet in findings:
+                line_start = definition.rfind("\n", 0, position) + 1
+                rows.append(
+                    [
+                        table,
+                        name,
+                        object_type,
+                        rule,
+                        severity,
+                        definition.count("\n", 0, position) + 1,
+                        position - line_start + 1,
+                        snippet,
+                    ]
+                )
+    return pd.DataFrame(rows, columns=DAX_FINDING_COLUMNS)
 
-        child_nodes = set(df_relations["Parent"].dropna().unique())
-        parent_nodes = set(G.nodes) - child_nodes
 
-        colors = plt.cm.tab20.colors
-        color_map = {}
-        for i, node in enumerate(child_nodes):
-            color_map[node] = colors[i % len(colors)]
+class DocumentationResult:
+    """
+    Output of one extraction + analysis pass. Shared by all exporters so the
+    expensive work only runs once regardless of how many formats are written
+    """
 
-        node_colors = [
-            color_map[node] if node in child_nodes else "lightgreen" for node in G.nodes
+    def __init__(
+        self,
+        report_info: pd.DataFrame,
+        report_filters: list,
+        model_objects: pd.DataFrame,
+        relationships: pd.DataFrame,
+        unused_columns: list,
+        dax_references: dict,
+        log: ReportLog,
+        report_name: str,
+        config: InputConfig,
+        usage: UsageMatrix | None = None,
+        page_metrics: pd.DataFrame | None = None,
+        performance_findings: pd.DataFrame | None = None,
+        dax_findings: pd.DataFrame | None = None,
+    ):
+        self.report_info = report_info
+        self.report_filters = report_filters
+        self.report_filters_string = [
+            [
+                sublist[0],
+                sublist[1],
+                sublist[2],
+                f"{sublist[3]}[{sublist[4]}]",
+                " ".join(sublist[5:]),
+            ]
+            for sublist in report_filters
         ]
+        self.model_objects = model_objects
+        self.relationships = relationships
+        self.unused_columns = unused_columns
+        self.dax_references = dax_references
+        self.log = log
+        self.report_name = report_name
+        self.config = config
+        # Field x visual/filter/DAX usage, see UsageMatrix
+        self.usage = usage
+        # Render cost per page and metrics over their limit, see lint_performance
+        self.page_metrics = page_metrics
+        self.performance_findings = performance_findings
+        # Slow DAX patterns in measures and calculated columns, see lint_dax
+        self.dax_findings = dax_findings
+
+    def tables(self) -> dict[str, pd.DataFrame]:
+        """
+        Returns all tabular outputs keyed by dataset name
+        """
+        import pandas as pd
+
+        return {
+            "visuals": self.report_info,
+            "filters": pd.DataFrame(self.report_filters, columns=REPORT_FILTER_COLUMNS),
+            "model_objects": self.model_objects,
+            "relationships": self.relationships,
+            "page_metrics": self.page_metrics,
+            "performance_findings": self.performance_findings,
+            "dax_findings": self.dax_findings,
+        }
 
-        labels = {node: split_label(node) for node in parent_nodes}
 
-        plt.figure(figsize=(w, h))
+class UsageMatrix:
+    """
+    Field x usage incidence matrix of one report, stored as sparse coordinates
+    (rows[k], cols[k]) in NumPy arrays, one entry per use
 
-        pos = nx.spring_layout(G, k=2.5, iterations=500, scale=10)
-        nx.draw(
-            G,
-            pos,
-            with_labels=True,
-            labels=labels,
-            node_color=node_colors,
-            font_weight="bold",
-            node_size=300,
-            arrowsize=10,
-        )
+    Rows are the model fields (columns and measures) followed by fields only seen in
+    the report. Columns are the places using them, described by column_pages,
+    column_ids and column_kinds: a visual (kind "Visual"), a filter ("<type> Filter")
+    or a DAX definition ("DAX", id is Table[Name] of the measure/column)
+    """
 
-        legend_handles = [
-            plt.Line2D(
-                [0],
-                [0],
-                marker="o",
-                color="w",
-                markerfacecolor=color_map[node],
-                markersize=10,
-                label=node,
-            )
-            for node in child_nodes
-        ]
-        plt.legend(
-            handles=legend_handles,
-            title="Dimensions",
-            bbox_to_anchor=(1.05, 1),
-            loc="upper left",
+    def __init__(self, model_fields: list[tuple[str, str]], measures: set):
+        import numpy as np
+
+        self.fields = list(dict.fromkeys(model_fields))
+        self.model_field_count = len(self.fields)
+        self.field_index = {field: i for i, field in enumerate(self.fields)}
+        self.columns = []
+        self.column_index = {}
+        self._rows = []
+        self._cols = []
+
+        self.is_measure = np.array([field in measures for field in self.fields], bool)
+
+    def field_row(self, field: tuple[str, str]) -> int:
+        row = self.field_index.get(field)
+        if row is None:
+            row = self.field_index[field] = len(self.fields)
+            self.fields.append(field)
+        return row
+
+    def column(self, page: str, item_id: str, kind: str) -> int:
+        key = (page, item_id, kind)
+        col = self.column_index.get(key)
+        if col is None:
+            col = self.column_index[key] = len(self.columns)
+            self.columns.append(key)
+        return col
+
+    def add(self, rows: list[int], col: int):
+        self._rows.extend(rows)
+        self._cols.extend([col] * len(rows))
+
+    @classmethod
+    def build(
+        cls,
+        model_fields: list[tuple[str, str]],
+        model_objects: pd.DataFrame,
+        report_info: pd.DataFrame,
+        report_filters: list,
+        dax_references: dict,
+    ) -> UsageMatrix:
+        import numpy as np
+
+        measures = set(
+            zip(
+                model_objects["Table"][model_objects["Type"] == "Measure"],
+                model_objects["Name"][model_objects["Type"] == "Measure"],
+            )
         )
+        usage = cls(model_fields, measures)
 
-        plt.savefig(f"{SAVE_NAME}\\{SAVE_NAME}_Relationships.png", bbox_inches="tight")
-        plt.close()
+        for page, visual_id, table, name in zip(
+            report_info["Page"],
+            report_info["Visual ID"],
+            report_info["Table"],
+            report_info["Name"],
+        ):
+            if table:
+                usage.add(
+                    [usage.field_row((table, name))],
+                    usage.column(page, visual_id, "Visual"),
+                )
+        for row in report_filters:
+            if row[3]:
+                usage.add(
+                    [usage.field_row((row[3], row[4]))],
+                    usage.column(row[0], row[1], f"{row[2]} Filter"),
+                )
 
-    generate_graph(df_relations, 12, (len(df_relations) + 1) * 14.4 / 72)
+        # DAX refers to measures by name only, such a reference uses every model
+        # field with that name
+        rows_by_name = {}
+        for row, (_, name) in enumerate(usage.fields[: usage.model_field_count]):
+            rows_by_name.setdefault(name, []).append(row)
+        for index, references in dax_references.items():
+            definition = model_objects.loc[index]
+            col = usage.column(
+                "", f"{definition['Table']}[{definition['Name']}]", "DAX"
+            )
+            usage.add(
+                [
+                    usage.field_index[column]
+                    for column in references["columns"]
+                    if column in usage.field_index
+                ],
+                col,
+            )
+            for measure in references["measures"]:
+                usage.add(rows_by_name.get(measure[1:-1], []), col)
+
+        usage.rows = np.array(usage._rows, np.int32)
+        usage.cols = np.array(usage._cols, np.int32)
+        del usage._rows, usage._cols
+        usage.field_tables = np.array([field[0] for field in usage.fields], object)
+        usage.field_names = np.array([field[1] for field in usage.fields], object)
+        usage.column_pages = np.array([column[0] for column in usage.columns], object)
+        usage.column_ids = np.array([column[1] for column in usage.columns], object)
+        usage.column_kinds = np.array([column[2] for column in usage.columns], object)
+        usage.is_measure = np.concatenate(
+            [
+                usage.is_measure,
+                np.zeros(len(usage.fields) - usage.model_field_count, bool),
+            ]
+        )
+        return usage
 
-    # Remove Cols/Measures from 'unused_columns' that are used in visuals
-    for row in report_info.iloc():
-        used_columns = (row["Table"], row["Name"])
-        if used_columns in unused_columns:
-            unused_columns.remove(used_columns)
+    @property
+    def shape(self) -> tuple[int, int]:
+        return len(self.fields), len(self.columns)
 
-    for filter in report_filters:
-        temp_col = (filter[3], filter[4])
-        if temp_col in unused_columns:
-            unused_columns.remove(temp_col)
+    def entries(self, report_only: bool = False):
+        """
+        returns rows, cols of all uses, without DAX definitions if report_only
+        """
+        if not report_only:
+            return self.rows, self.cols
+        keep = self.column_kinds[self.cols] != "DAX"
+        return self.rows[keep], self.cols[keep]
 
-    # Delete old data
-    if os.path.exists(excel_file):
-        os.remove(excel_file)
+    def field_counts(self, report_only: bool = False):
+        """
+        returns number of uses per field row
+        """
+        import numpy as np
 
-    workbook = xlsxwriter.Workbook(excel_file)
-    worksheet = workbook.add_worksheet(f"{_PBIX_[0]} Common")
+        rows, _ = self.entries(report_only)
+        return np.bincount(rows, minlength=len(self.fields))
 
-    # Add column formatting.
-    def_format = workbook.add_format({"align": "top", "text_wrap": True})
-    wrap_format = workbook.add_format({"text_wrap": True})
-    worksheet.set_column(0, len(new_data), 30, wrap_format)
-    worksheet.set_column(definition_index, definition_index, 100, def_format)
-    worksheet.set_column(definition_index + 1, definition_index + 1, 30, wrap_format)
-    worksheet.set_column(parent_index, parent_index, 50, wrap_format)
+    def to_scipy(self):
+        """
+        returns the matrix as scipy.sparse.csr_matrix of use counts (requires scipy)
+        """
+        import numpy as np
+        from scipy.sparse import csr_matrix
 
-    def get_workbook_format(index: int):
-        return workbook.add_format(
-            {"color": rgba_tuple_to_hex(default_colors[index][1])}
+        return csr_matrix(
+            (np.ones(len(self.rows), np.int32), (self.rows, self.cols)),
+            shape=self.shape,
         )
 
-    paranthesis_color = ["#0433fa", "#319331", "#7b3831"]
-    formats = {
-        "function": get_workbook_format(0),
-        "measure": get_workbook_format(1),
-        "return": get_workbook_format(2),
-        "varname": get_workbook_format(3),
-        "comment": get_workbook_format(4),
-        "quote": get_workbook_format(5),
-        "var": get_workbook_format(6),
-        "bold": workbook.add_format({"bold": True}),
-        "italic": workbook.add_format({"italic": True}),
-        "bi": workbook.add_format({"bold": True, "italic": True}),
-        "para": [
-            workbook.add_format({"color": color}) for color in paranthesis_color * 5
-        ],
-    }
+    def unused_fields(self) -> list[tuple[str, str]]:
+        """
+        Model columns not used by any visual, filter or DAX definition. Measures
+        always count as used
+        """
+        import numpy as np
 
-    ## Print Relation Section
-    num_relations = len(df_relations)
-    row_num = 1
-    if num_relations > 0:
-        col = 0
-        for name, value in new_data_rel.items():
-            worksheet.write(0, col, name, formats["bi"])
-            col += 1
-
-        print_graph = True
-        for _, row in df_relations.iterrows():
-            if print_graph:
-                worksheet.insert_image(
-                    "E1",
-                    f"{SAVE_NAME}\\{SAVE_NAME}_Relationships.png",
-                    {"x_scale": 1, "y_scale": 1},
-                )
-                print_graph = False
+        unused = (self.field_counts() == 0) & ~self.is_measure
+        unused[self.model_field_count :] = False
+        return [self.fields[row] for row in np.flatnonzero(unused)]
 
-            for col, value in enumerate(row):
-                worksheet.write(row_num, col, value)
-            row_num += 1
+    def fields_per_page(self) -> dict[str, int]:
+        """
+        returns number of distinct fields used by visuals and filters of each page
+        """
+        import numpy as np
 
-    row_num += 2
-    col = 0
-    for name, value in new_data.items():
-        worksheet.write(row_num, col, name, formats["bi"])
-        col += 1
+        rows, cols = self.entries(report_only=True)
+        pages, page_codes = np.unique(self.column_pages[cols], return_inverse=True)
+        pairs = np.unique(page_codes.astype(np.int64) * len(self.fields) + rows)
+        counts = np.bincount(pairs // len(self.fields), minlength=len(pages))
+        return {page: int(count) for page, count in zip(pages, counts) if page}
 
-    def ls_app(*args):
-        format_array.extend(args)
+    def most_used_measures(self, count: int = 10) -> list[tuple[str, str, int]]:
+        """
+        returns (table, measure, uses) of the measures used most by visuals and filters
+        """
+        import numpy as np
 
-    row_num += 1
-    for _, row in df.iterrows():
-        vDefinition = row["Definition"]
+        uses = np.where(self.is_measure, self.field_counts(report_only=True), 0)
+        top = np.argsort(-uses, kind="stable")[:count]
+        return [(*self.fields[row], int(uses[row])) for row in top if uses[row] > 0]
 
-        # Skip traditional columns for now
-        if row["Type"] == "Column":
-            continue
+    def pages_using_table(self, table: str) -> list[str]:
+        """
+        returns the pages whose visuals or filters use a field of the table
+        """
+        import numpy as np
 
-        # Find Vars and measures
-        var_names = find_vars(vDefinition)
-        function_names = find_functions(vDefinition)
-        columns = find_columns(vDefinition)
-        tables = [i for i, _ in columns]
-        columns_clean = ["[" + i + "]" for _, i in columns]
-        measures = find_measures(vDefinition)
-
-        for column in columns:
-            if column in unused_columns:
-                unused_columns.remove(column)
-
-        for measure in measures:
-            for col_unused in unused_columns:
-                if measure[1:-1] == col_unused[1]:
-                    unused_columns.remove(col_unused)
-
-        if row["Type"] == "Measure":
-            for col_unused in unused_columns:
-                name = (row["Table"], row["Name"])
-                if name == col_unused:
-                    unused_columns.remove(name)
-
-        formated_text = vDefinition.replace("\t", " XXX ")
-        formated_text = formated_text.replace("\r\n", " YYY ")
-        formated_text = formated_text.replace("&&", " ZZZ ")
-        formated_text = formated_text.replace("||", " AAA ")
-
-        # Split the text into rows
-        pattern = re.compile(r"(\(|\)|\[.*?\]|,|//|\d+\.\d+|\w+|(?<!\d)\.(?!\d)|\W)")
-        tokens = [
-            token for token in re.findall(pattern, formated_text) if token.strip()
-        ]
+        rows, cols = self.entries(report_only=True)
+        pages = np.unique(self.column_pages[cols[self.field_tables[rows] == table]])
+        return [page for page in pages if page]
 
-        format_array = []
-        parents_array = []
-        parenthesis_count = -1
-        is_whole_line_comment = False
-        quote_counter = 0
-
-        # Store away all parents used in func. Columns get table name as prefix, measures get default measure table
-        if len(columns) > 0:
-            for token in [i + "[" + j + "]" for i, j in columns]:
-                parents_array.append(token)
-                parents_array.append("\r\n")
-            parents_array.pop(-1)
-
-        # Iternate through the segments and add a format before the corresponding tokens.
-        for token in tokens:
-            if token == "//":
-                is_whole_line_comment = True
-            elif token == "YYY":
-                is_whole_line_comment = False
 
-            if token == '"' and not is_whole_line_comment:
-                quote_counter += 1
+def extract_layout(
+    pbix_folder: str, pbix_name: str, log: ReportLog, config: InputConfig
+) -> tuple[pd.DataFrame, list]:
+    """
+    Layout stage: reads all visuals and filters of the report
 
-            if is_whole_line_comment:
-                ls_app(formats["comment"], token + " ")
-            elif quote_counter > 0:
-                ls_app(formats["quote"])
-                if quote_counter == 2:
-                    ls_app(token + " ")
-                    quote_counter = 0
-                else:
-                    ls_app(token)
-            elif token == "XXX":
-                ls_app("\t")
-            elif token == "YYY":
-                ls_app("\r\n")
-            elif token == "ZZZ":
-                ls_app("&& ")
-            elif token == "AAA":
-                ls_app("|| ")
-            elif token == "(":
-                parenthesis_count += 1
-                safe_count = max(0, min(parenthesis_count, 14))
-                ls_app(formats["para"][safe_count], token + " ")
-            elif token == ")":
-                safe_count = max(0, min(parenthesis_count, 14))
-                ls_app(formats["para"][safe_count], token + " ")
-                parenthesis_count -= 1
-            elif token == "VAR":
-                ls_app(formats["var"], token + " ")
-            elif token in var_names:
-                ls_app(formats["varname"], token + " ")
-            elif token in measures:
-                ls_app(
-                    formats["para"][parenthesis_count + 1],
-                    token[0],
-                    formats["measure"],
-                    token[1:-1],
-                    formats["para"][parenthesis_count + 1],
-                    token[-1] + " ",
-                )
-            elif token in tables or token in columns_clean:
-                ls_app(formats["measure"], token)
-            elif token in function_names:
-                ls_app(formats["function"], token + " ")
-            elif token == "RETURN":
-                ls_app(formats["return"], token + " ")
-            else:
-                ls_app(token, " ")
-
-        for col, value in enumerate(row):
-            if col == definition_index and len(format_array) != 0:
-                write_to_excel(worksheet, row_num, col, format_array)
-                if len(format_array) == 1:
-                    1
-            elif col == parent_index and len(parents_array) != 0:
-                write_to_excel(worksheet, row_num, col, parents_array)
-                if len(parents_array) == 1:
-                    1
-            elif value != "":
-                worksheet.write(row_num, col, value)
-        row_num += 1
+    returns report_info, report_filters, visual_metrics
+    """
+    import pandas as pd
 
-    row_num += 6
-    for col_pair in unused_columns:
-        worksheet.write(row_num, 0, col_pair[0] + "[" + col_pair[1] + "]")
-        row_num += 1
+    rep_ex = ReportExtractor(pbix_folder, pbix_name, log, config)
 
-    # Create a tab per report page with visual info.
-    for report_name in report_info["Page"].unique().tolist():
-        save_report_name = report_name.replace("/", "_")
-        worksheetX = workbook.add_worksheet(save_report_name)
+    with phase("extract"):
+        rep_ex.extract()
 
-        worksheetX.set_column(0, 5, 30, def_format)
-        worksheetX.set_column(2, 2, 100, def_format)
-        worksheetX.set_column(3, 3, 60, def_format)
+    report_info = pd.DataFrame(rep_ex.result, columns=REPORT_INFO_COLUMNS)
 
-        local_df = report_info[report_info["Page"] == report_name]
-        visual_ids = local_df[["Visual ID"]]["Visual ID"].unique().tolist()
+    report_filters = []
+    [
+        report_filters.append(sublist)
+        for sublist in rep_ex.filters
+        if sublist not in report_filters
+    ]
+    visual_metrics = pd.DataFrame(rep_ex.visual_metrics, columns=VISUAL_METRIC_COLUMNS)
+    return report_info, report_filters, visual_metrics
 
-        local_df = local_df.sort_values(by=["Visual Type", "Type"])
 
-        dataX = {
-            "Item Type": [],
-            "Visual Type": [],
-            "Description": [],
-            "Visual Filters": [],
-            "Interactivity": [],
-            "Comment": [],
-            "ID": [],
-        }
+def lint_performance(
+    visual_metrics: pd.DataFrame, thresholds: dict
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Rates how heavy each page is to render from its visuals. Only visible visuals
+    with fields send queries when the page opens
 
-        dfX = pd.DataFrame(dataX)
+    thresholds: metric -> limit, see PERFORMANCE_THRESHOLDS
 
-        for visual in visual_ids:
-            visual_type = local_df[local_df["Visual ID"] == visual].iloc[0][
-                "Visual Type"
-            ]
+    returns page_metrics (PAGE_METRIC_COLUMNS), findings of all metrics over their
+    limit (PERFORMANCE_FINDING_COLUMNS)
+    """
+    import pandas as pd
+
+    with phase("performance lint"):
+        visuals = visual_metrics
+        query = ~visuals["Hidden"].astype(bool) & (visuals["Fields"] > 0)
+        is_matrix = visuals["Visual Type"] == "pivotTable"
+        fanout = (
+            query
+            & is_matrix
+            & (visuals["Grouping Fields"] > thresholds["Matrix Grouping Fields"])
+        )
+        measure_heavy = query & (
+            visuals["Measures"] > thresholds["Measures per Visual"]
+        )
+        too_many_fields = query & (visuals["Fields"] > thresholds["Fields per Visual"])
+
+        page_metrics = (
+            pd.DataFrame(
+                {
+                    "Page": visuals["Page"],
+                    "Visuals": 1,
+                    "Query Visuals": query.astype(int),
+                    "Data Fields": visuals["Fields"].where(query, 0),
+                    "Max Fields per Visual": visuals["Fields"].where(query, 0),
+                    "Slicers": (
+                        visuals["Visual Type"].isin(list(SLICER_VISUAL_TYPES))
+                        & ~visuals["Hidden"]
+                    ).astype(int),
+                    "High Fanout Matrices": fanout.astype(int),
+                    "Measure Heavy Visuals": measure_heavy.astype(int),
+                }
+            )
+            .groupby("Page", sort=False)
+            .agg(
+                {
+                    **{c: "sum" for c in PAGE_METRIC_COLUMNS[1:]},
+                    "Max Fields per Visual": "max",
+                }
+            )
+            .reset_index()[PAGE_METRIC_COLUMNS]
+        )
 
-            v_type = "Visual"
-            if visual_type == "tableEx":
-                s_type = "Table"
-            elif visual_type == "pivotTable":
-                s_type = "Matrix"
-            elif visual_type == "card":
-                s_type = "Card"
-            elif visual_type == "cardVisual":
-                s_type = "Card (new)"
-            elif visual_type == "gauge":
-                s_type = "Gauge"
-            elif visual_type == "slicer":
-                v_type = "Slicer"
-                s_type = local_df[local_df["Visual ID"] == visual].iloc[0]["Table"]
-            elif visual_type == "advancedSlicerVisual":
-                v_type = "Slicer (new)"
-                s_type = local_df[local_df["Visual ID"] == visual].iloc[0]["Table"]
-            elif visual_type in visual_type_list:
-                words = re.findall("[a-zA-Z][^A-Z]*", visual_type)
-                s_type = ""
-                for word in words:
-                    s_type += word.capitalize() + " "
-            elif visual_type in button_type_list:
-                v_type = "Button"
-                s_type = visual_type
-            elif visual_type in ["actionButton"]:
-                v_type = "Button"
-                s_type = "Button"
-            elif visual_type == "Group":
-                v_type = "Group"
-                s_type = "Panel"
-            else:
-                REPORT_LOG += log_data(
-                    "New Visual type not yet supported!", visual_type, 1
+        findings = []
+        for metric in ("Query Visuals", "Data Fields", "Slicers"):
+            over = page_metrics[page_metrics[metric] > thresholds[metric]]
+            findings.extend(
+                [page, "", metric, value, thresholds[metric]]
+                for page, value in zip(over["Page"], over[metric])
+            )
+        for metric, column, mask in (
+            ("Fields per Visual", "Fields", too_many_fields),
+            ("Measures per Visual", "Measures", measure_heavy),
+            ("Matrix Grouping Fields", "Grouping Fields", fanout),
+        ):
+            over = visuals[mask]
+            findings.extend(
+                [page, visual_id, metric, value, thresholds[metric]]
+                for page, visual_id, value in zip(
+                    over["Page"], over["Visual ID"], over[column]
                 )
+            )
 
-            new_data = {
-                "Item Type": v_type,
-                "Visual Type": s_type,
-                "Description": "",
-                "Visual Filters": "",
-                "Interactivity": "",
-                "Comment": "",
-                "ID": visual,
-            }
+        page_order = {page: i for i, page in enumerate(page_metrics["Page"])}
+        findings.sort(key=lambda row: page_order[row[0]])
+    return page_metrics, pd.DataFrame(findings, columns=PERFORMANCE_FINDING_COLUMNS)
 
-            dfX.loc[-1] = new_data
-            dfX.index = dfX.index + 1
-
-        for i_filter, filter in enumerate(report_filters_string):
-            if filter[2] == "This Page" and filter[0] == report_name:
-                new_data = {
-                    "Item Type": "Filter",
-                    "Visual Type": "This Page",
-                    "Description": "",
-                    "Visual Filters": "",
-                    "Interactivity": "",
-                    "Comment": "",
-                    "ID": i_filter,
-                }
 
-                dfX.loc[-1] = new_data
-                dfX.index = dfX.index + 1
+def ingest_model(
+    tsv_path: str, description_tag: str = DESCRIPT_TAG
+) -> tuple[pd.DataFrame, pd.DataFrame, list]:
+    """
+    Model stage: reads the Tabular Editor .tsv output
 
-        col = 0
-        for name, value in new_data.items():
-            if name == "ID":
-                continue
-            worksheetX.write(0, col, name, formats["bi"])
-            col += 1
+    returns model_objects, relationships, (table, name) of all columns and measures
+    """
+    import pandas as pd
 
-        sort_order = ["Visual", "Slicer", "Filter", "Button", "Group"]
-        dfX["Item Type"] = pd.Categorical(
-            dfX["Item Type"], categories=sort_order, ordered=True
-        )
-        df_sorted = dfX.sort_values(by=["Item Type", "Visual Type"])
+    # Create the DataFrame
+    df = pd.DataFrame({name: [] for name in MODEL_OBJECT_COLUMNS})
 
-        row_num = 1
-        slicer_switch = True
-        filter_switch = True
-        button_switch = True
-        for _, row in df_sorted.iterrows():
-            filter_array = []
-            for filter in report_filters_string:
-                if (
-                    filter[2] == "Visual"
-                    and filter[0] == report_name
-                    and filter[1] == row["ID"]
+    # Define lists for future calculations
+    unused_columns = []
+    all_tables = []
+    all_relationships = []
+    all_hierarchies = []
+
+    with phase("tsv ingest"):
+        dataset = pd.read_csv(
+            tsv_path,
+            sep="\t",
+            header=0,
+        )
+
+        # Extract all Table names
+        tab_rel_pattern = r"^Relationship\.[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$"
+        for i in range(len(dataset)):
+            data_type = get_data_type(dataset.iloc[i]["Object"])
+            if data_type[0] == "Table":
+                rel_pattern = re.match(tab_rel_pattern, data_type[1])
+                if rel_pattern is not None and rel_pattern not in all_relationships:
+                    all_relationships.append(dataset.iloc[i]["Name"])
+
+                elif (
+                    data_type[1] not in all_tables
+                    and "Relationship." not in data_type[1]
+                ):
+                    all_tables.append(data_type[1])
+
+        # Remove excess " ' " surrounding table names
+        escape_pattern = (
+            r"'(?:\s*)(" + "|".join(map(re.escape, all_tables)) + r")(?:\s*)'"
+        )
+        for i, row in enumerate(dataset.iloc()):
+            exp = row["Expression"]
+            if pd.isna(exp):
+                continue
+
+            exp = exp.replace("\\t", "    ")
+
+            match = re.search(escape_pattern, exp)
+            if match:
+                dataset.at[i, "Expression"] = exp.replace(
+                    match.group(0), match.group(1)
+                )
+
+        # Read .tsv file and convert to usable dataframe
+        for i in range(len(dataset)):
+            report_progress("model objects read", i, len(dataset))
+            line_data = dataset.iloc[i]
+
+            data_type = get_data_type(line_data["Object"])
+
+            # Currently don't need to do anything with all tables or hierarchies
+            if data_type[0] == "Table":
+                continue
+
+            elif data_type[0] == "Hierarchy":
+                all_hierarchies.append((data_type[1], data_type[2]))
+                continue
+
+            elif data_type[0] == "Column" or data_type[0] == "Measure":
+                unused_columns.append((data_type[1], data_type[2]))
+
+            if not isinstance(line_data["Expression"], float):
+                definition = line_data["Expression"]
+                definition = definition.replace("    ", "\t")
+                definition = definition.replace("\\n", "\n")
+            else:
+                definition = ""
+
+            # Extract description if embedded in definition
+            if definition.find(description_tag) != -1:
+                comment_start = find_nth_occurence(description_tag, definition, 1) + 5
+                comment_end = find_nth_occurence(description_tag, definition, 2) - 1
+                definition_start = comment_end + 6
+            else:
+                comment_start = 0
+                comment_end = comment_start
+                definition_start = comment_start
+
+            df_type = data_type[0]
+            df_name = line_data["Name"]
+            df_data_type = line_data["DataType"]
+            if pd.isna(line_data["Description"]):
+                df_description = definition[comment_start:comment_end].strip()
+                df_description = df_description.replace("\\n", "\\r\\n")
+            else:
+                df_description = line_data["Description"]
+            df_definition = definition[definition_start:].strip()
+            df_definition = df_definition.replace("\n", "\r\n")
+            df_table = data_type[1]
+            df_format = (
+                ""
+                if pd.isna(line_data.get("FormatString", ""))
+                else line_data.get("FormatString", "")
+            )
+            df_display = (
+                ""
+                if pd.isna(line_data.get("DisplayFolder", ""))
+                else line_data.get("DisplayFolder", "")
+            )
+
+            new_data = {
+                "Type": df_type,
+                "Name": df_name,
+                "DataType": df_data_type,
+                "Description": df_description,
+                "Definition": df_definition,
+                "Table": df_table,
+                "Dependants": "",
+                "Format": df_format,
+                "Folder": df_display,
+                "Comment": "",
+            }
+
+            df.loc[-1] = new_data
+            df.index = df.index + 1
+        df = df.sort_index()
+
+        report_progress("model objects read", len(dataset), len(dataset))
+
+        df_relations = pd.DataFrame({name: [] for name in RELATIONSHIP_COLUMNS})
+        for row in sorted(all_relationships):
+            i1 = row.find("]") + 1
+            i2 = row.find(">") + 2
+            t1 = row[:i1].replace("'", "")
+            t2 = row[i2:].replace("'", "")
+            rel = row[i1 + 1 : i2 - 1]
+
+            relation = "Unknown Type"
+            if rel == "-->":
+                relation = "One Way"
+            if rel == "<-->":
+                relation = "Two Way"
+
+            new_data_rel = {
+                "Type": "Relationship",
+                "Child": t1.split("[")[0],
+                "Direction": relation,
+                "Parent": t2.split("[")[0],
+            }
+            df_relations.loc[-1] = new_data_rel
+            df_relations.index = df_relations.index + 1
+        df_relations = df_relations.sort_index()
+
+    return df, df_relations, unused_columns
+
+
+def analyze_model(model_objects: pd.DataFrame, config: InputConfig) -> tuple:
+    """
+    Model analysis stage: everything about the measures and calculated columns
+    that does not depend on a report
+
+    returns dax_references {model_objects index: {var_names, function_names,
+    columns, measures}}, dax_findings (see lint_model_dax)
+    """
+    with phase("dax analysis"):
+        # Find Vars, functions, columns and measures used in each definition
+        dax_references = {}
+        for index, row in model_objects.iterrows():
+            # Skip traditional columns for now
+            if row["Type"] == "Column":
+                continue
+
+            vDefinition = row["Definition"]
+            dax_references[index] = {
+                "var_names": find_vars(vDefinition),
+                "function_names": find_functions(vDefinition, config.known_functions),
+                "columns": find_columns(vDefinition),
+                "measures": find_measures(vDefinition),
+            }
+
+    return dax_references, lint_model_dax(model_objects)
+
+
+def analyze_report(
+    pbix_folder: str,
+    pbix_name: str,
+    tsv_path: str,
+    log: ReportLog | None = None,
+    config: InputConfig | None = None,
+    description_tag: str = DESCRIPT_TAG,
+    layout: tuple | None = None,
+    model: tuple | None = None,
+    model_analysis: tuple | None = None,
+):
+    """
+    Extracts the report layout and combines it with the Tabular Editor .tsv output
+
+    pbix_folder: folder of the .pbix file
+    pbix_name: name of the .pbix file including extension
+    tsv_path: path to documentation.tsv
+    log: log to add records to, a new in-memory log is used if not given
+    config: Input/*.csv settings, loaded from the working directory if not given
+    description_tag: marks a description embedded in a DAX definition
+    layout: earlier extract_layout output to reuse instead of reading the .pbix
+    model: earlier ingest_model output to reuse instead of reading the .tsv
+    model_analysis: earlier analyze_model output of the same model
+
+    returns DocumentationResult, ReportLog (also used by the exporters)
+    """
+    if log is None:
+        log = ReportLog()
+    if config is None:
+        config = load_config()
+
+    if layout is None:
+        layout = extract_layout(pbix_folder, pbix_name, log, config)
+    report_info, report_filters, visual_metrics = layout
+
+    if model is None:
+        model = ingest_model(tsv_path, description_tag)
+    df, df_relations, model_fields = model
+
+    if model_analysis is None:
+        model_analysis = analyze_model(df, config)
+    dax_references, dax_findings = model_analysis
+
+    with phase("usage analysis"):
+        usage = UsageMatrix.build(
+            model_fields, df, report_info, report_filters, dax_references
+        )
+        unused_columns = usage.unused_fields()
+
+    page_metrics, performance_findings = lint_performance(
+        visual_metrics, config.performance_thresholds
+    )
+
+    result = DocumentationResult(
+        report_info=report_info,
+        report_filters=report_filters,
+        model_objects=df,
+        relationships=df_relations,
+        unused_columns=unused_columns,
+        dax_references=dax_references,
+        log=log,
+        usage=usage,
+        page_metrics=page_metrics,
+        performance_findings=performance_findings,
+        dax_findings=dax_findings,
+        report_name=os.path.splitext(pbix_name)[0],
+        config=config,
+    )
+    return result, log
+
+
+class Exporter(ABC):
+    """
+    Base class for documentation writers. Subclasses set 'name' (used on the
+    command line) and implement export()
+    """
+
+    name = ""
+    extension = ""
+
+    def check_available(self) -> str | None:
+        """
+        returns an error message if the exporter cannot run in this environment
+        """
+        return None
+
+    @abstractmethod
+    def export(self, result: DocumentationResult, save_folder: str, save_name: str):
+        pass
+
+
+class TableExporter(Exporter):
+    """
+    Writes every dataset in DocumentationResult.tables() to its own file
+    """
+
+    @abstractmethod
+    def write_table(self, df: pd.DataFrame, file_path: str):
+        pass
+
+    def export(self, result: DocumentationResult, save_folder: str, save_name: str):
+        for table_name, df in result.tables().items():
+            file_path = os.path.join(
+                save_folder, f"{save_name}_{table_name}.{self.extension}"
+            )
+            self.write_table(df, file_path)
+
+
+class JsonExporter(TableExporter):
+    name = "json"
+    extension = "jsonl"
+
+    def write_table(self, df: pd.DataFrame, file_path: str):
+        df.to_json(file_path, orient="records", lines=True, force_ascii=False)
+
+
+class CsvExporter(TableExporter):
+    name = "csv"
+    extension = "csv"
+
+    def write_table(self, df: pd.DataFrame, file_path: str):
+        df.to_csv(file_path, index=False)
+
+
+class ParquetExporter(TableExporter):
+    name = "parquet"
+    extension = "parquet"
+
+    def check_available(self) -> str | None:
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            return "Parquet output requires pyarrow. Run: pip install pyarrow"
+        return None
+
+    def write_table(self, df: pd.DataFrame, file_path: str):
+        # Mixed object columns (e.g. None/str) are stored as strings
+        text_columns = df.select_dtypes(include=["object", "string"]).columns
+        df = df.astype({col: "string" for col in text_columns})
+        df.to_parquet(file_path, index=False)
+
+
+class ExcelExporter(Exporter):
+    name = "xlsx"
+    extension = "xlsx"
+
+    def __init__(self, colors: list | None = None, parallel: bool = True):
+        """
+        colors: DAX highlighting colors as in default_colors
+        parallel: render the relationship graph while the sheets are written
+        """
+        self.colors = default_colors if colors is None else colors
+        self.parallel = parallel
+
+    def export(self, result: DocumentationResult, save_folder: str, save_name: str):
+        import pandas as pd
+        import xlsxwriter
+
+        config = result.config
+
+        button_type_list = ["Bookmark", "PageNavigation", "Button"]
+
+        report_info = result.report_info
+        report_filters_string = result.report_filters_string
+        df = result.model_objects
+        df_relations = result.relationships
+        unused_columns = result.unused_columns
+
+        # Define indexes of special columns
+        definition_index = MODEL_OBJECT_COLUMNS.index("Definition")
+        parent_index = MODEL_OBJECT_COLUMNS.index("Dependants")
+
+        excel_file = os.path.join(save_folder, f"{save_name}.xlsx")
+        graph_file = os.path.join(save_folder, f"{save_name}_Relationships.png")
+
+        def generate_graph(df_relations: pd.DataFrame, w: int, h: int):
+            # Figure objects instead of pyplot, pyplot keeps one global current figure
+            import matplotlib
+            import networkx as nx
+            from matplotlib.figure import Figure
+            from matplotlib.lines import Line2D
+
+            G = nx.DiGraph()
+
+            for _, row in df_relations.iterrows():
+                task_id = row["Child"]
+                parent_task = row["Parent"]
+
+                G.add_node(task_id)
+                if not pd.isnull(parent_task):
+                    G.add_edge(str(parent_task), task_id)
+
+            def split_label(label):
+                return re.sub(r"([a-z])([A-Z])", r"\1\n\2", label)
+
+            child_nodes = set(df_relations["Parent"].dropna().unique())
+            parent_nodes = set(G.nodes) - child_nodes
+
+            colors = matplotlib.colormaps["tab20"].colors
+            color_map = {}
+            for i, node in enumerate(child_nodes):
+                color_map[node] = colors[i % len(colors)]
+
+            node_colors = [
+                color_map[node] if node in child_nodes else "lightgreen"
+                for node in G.nodes
+            ]
+
+            labels = {node: split_label(node) for node in parent_nodes}
+
+            figure = Figure(figsize=(w, h))
+            ax = figure.add_subplot()
+
+            pos = nx.spring_layout(G, k=2.5, iterations=500, scale=10)
+            nx.draw(
+                G,
+                pos,
+                ax=ax,
+                with_labels=True,
+                labels=labels,
+                node_color=node_colors,
+                font_weight="bold",
+                node_size=300,
+                arrowsize=10,
+            )
+
+            legend_handles = [
+                Line2D(
+                    [0],
+                    [0],
+                    marker="o",
+                    color="w",
+                    markerfacecolor=color_map[node],
+                    markersize=10,
+                    label=node,
+                )
+                for node in child_nodes
+            ]
+            ax.legend(
+                handles=legend_handles,
+                title="Dimensions",
+                bbox_to_anchor=(1.05, 1),
+                loc="upper left",
+            )
+
+            figure.savefig(graph_file, bbox_inches="tight")
+
+        def render_graph():
+            with phase("graph rendering"):
+                generate_graph(df_relations, 12, (len(df_relations) + 1) * 14.4 / 72)
+
+        # The graph only depends on the relationships, draw it next to the sheets. The
+        # image is read when inserted so it is only inserted once the graph is done
+        graph_executor = None
+        if self.parallel and len(df_relations) > 0:
+            from concurrent.futures import ThreadPoolExecutor
+
+            graph_executor = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="graph"
+            )
+            graph_future = graph_executor.submit(
+                contextvars.copy_context().run, render_graph
+            )
+        else:
+            render_graph()
+
+        # Write to a temp file and swap it in once complete
+        temp_file = excel_file + ".tmp"
+        workbook = xlsxwriter.Workbook(temp_file)
+        worksheet = workbook.add_worksheet(f"{result.report_name} Common")
+
+        # Add column formatting.
+        def_format = workbook.add_format({"align": "top", "text_wrap": True})
+        wrap_format = workbook.add_format({"text_wrap": True})
+        worksheet.set_column(0, len(MODEL_OBJECT_COLUMNS), 30, wrap_format)
+        worksheet.set_column(definition_index, definition_index, 100, def_format)
+        worksheet.set_column(
+            definition_index + 1, definition_index + 1, 30, wrap_format
+        )
+        worksheet.set_column(parent_index, parent_index, 50, wrap_format)
+
+        def get_workbook_format(index: int):
+            return workbook.add_format(
+                {"color": rgba_tuple_to_hex(self.colors[index][1])}
+            )
+
+        paranthesis_color = ["#0433fa", "#319331", "#7b3831"]
+        formats = {
+            "function": get_workbook_format(0),
+            "measure": get_workbook_format(1),
+            "return": get_workbook_format(2),
+            "varname": get_workbook_format(3),
+            "comment": get_workbook_format(4),
+            "quote": get_workbook_format(5),
+            "var": get_workbook_format(6),
+            "bold": workbook.add_format({"bold": True}),
+            "italic": workbook.add_format({"italic": True}),
+            "bi": workbook.add_format({"bold": True, "italic": True}),
+            "para": [
+                workbook.add_format({"color": color}) for color in paranthesis_color
+            ]
+            * 5,
+        }
+
+        ## Print Relation Section
+        num_relations = len(df_relations)
+        row_num = 1
+        if num_relations > 0:
+            for col, name in enumerate(RELATIONSHIP_COLUMNS):
+                worksheet.write(0, col, name, formats["bi"])
+
+            for _, row in df_relations.iterrows():
+                for col, value in enumerate(row):
+                    worksheet.write(row_num, col, value)
+                row_num += 1
+
+        row_num += 2
+        for col, name in enumerate(MODEL_OBJECT_COLUMNS):
+            worksheet.write(row_num, col, name, formats["bi"])
+
+        def ls_app(*args):
+            format_array.extend(args)
+
+        row_num += 1
+        with phase("dax highlighting"):
+            for position, (index, row) in enumerate(df.iterrows()):
+                report_progress("definitions highlighted", position, len(df))
+                vDefinition = row["Definition"]
+
+                # Skip traditional columns for now
+                if row["Type"] == "Column":
+                    continue
+
+                # Find Vars and measures
+                references = result.dax_references[index]
+                var_names = references["var_names"]
+                function_names = references["function_names"]
+                columns = references["columns"]
+                tables = [i for i, _ in columns]
+                columns_clean = ["[" + i + "]" for _, i in columns]
+                measures = references["measures"]
+
+                formated_text = vDefinition.replace("\t", " XXX ")
+                formated_text = formated_text.replace("\r\n", " YYY ")
+                formated_text = formated_text.replace("&&", " ZZZ ")
+                formated_text = formated_text.replace("||", " AAA ")
+
+                # Split the text into rows
+                pattern = re.compile(
+                    r"(\(|\)|\[.*?\]|,|//|\d+\.\d+|\w+|(?<!\d)\.(?!\d)|\W)"
+                )
+                tokens = [
+                    token
+                    for token in re.findall(pattern, formated_text)
+                    if token.strip()
+                ]
+
+                format_array = []
+                parents_array = []
+                parenthesis_count = -1
+                is_whole_line_comment = False
+                quote_counter = 0
+
+                # Store away all parents used in func. Columns get table name as prefix, measures get default measure table
+                if len(columns) > 0:
+                    for token in [i + "[" + j + "]" for i, j in columns]:
+                        parents_array.append(token)
+                        parents_array.append("\r\n")
+                    parents_array.pop(-1)
+
+                # Iternate through the segments and add a format before the corresponding tokens.
+                for token in tokens:
+                    if token == "//":
+                        is_whole_line_comment = True
+                    elif token == "YYY":
+                        is_whole_line_comment = False
+
+                    if token == '"' and not is_whole_line_comment:
+                        quote_counter += 1
+
+                    if is_whole_line_comment:
+                        ls_app(formats["comment"], token + " ")
+                    elif quote_counter > 0:
+                        ls_app(formats["quote"])
+                        if quote_counter == 2:
+                            ls_app(token + " ")
+                            quote_counter = 0
+                        else:
+                            ls_app(token)
+                    elif token == "XXX":
+                        ls_app("\t")
+                    elif token == "YYY":
+                        ls_app("\r\n")
+                    elif token == "ZZZ":
+                        ls_app("&& ")
+                    elif token == "AAA":
+                        ls_app("|| ")
+                    elif token == "(":
+                        parenthesis_count += 1
+                        safe_count = max(0, min(parenthesis_count, 14))
+                        ls_app(formats["para"][safe_count], token + " ")
+                    elif token == ")":
+                        safe_count = max(0, min(parenthesis_count, 14))
+                        ls_app(formats["para"][safe_count], token + " ")
+                        parenthesis_count -= 1
+                    elif token == "VAR":
+                        ls_app(formats["var"], token + " ")
+                    elif token in var_names:
+                        ls_app(formats["varname"], token + " ")
+                    elif token in measures:
+                        ls_app(
+                            formats["para"][parenthesis_count + 1],
+                            token[0],
+                            formats["measure"],
+                            token[1:-1],
+                            formats["para"][parenthesis_count + 1],
+                            token[-1] + " ",
+                        )
+                    elif token in tables or token in columns_clean:
+                        ls_app(formats["measure"], token)
+                    elif token in function_names:
+                        ls_app(formats["function"], token + " ")
+                    elif token == "RETURN":
+                        ls_app(formats["return"], token + " ")
+                    else:
+                        ls_app(token, " ")
+
+                for col, value in enumerate(row):
+                    if col == definition_index and len(format_array) != 0:
+                        write_to_excel(worksheet, row_num, col, format_array)
+                    elif col == parent_index and len(parents_array) != 0:
+                        write_to_excel(worksheet, row_num, col, parents_array)
+                    elif value != "":
+                        worksheet.write(row_num, col, value)
+                row_num += 1
+
+        row_num += 6
+        for col_pair in unused_columns:
+            worksheet.write(row_num, 0, col_pair[0] + "[" + col_pair[1] + "]")
+            row_num += 1
+
+        report_progress("definitions highlighted", len(df), len(df))
+
+        with phase("page sheets"):
+            # Create a tab per report page with visual info.
+            report_pages = report_info["Page"].unique().tolist()
+            for page_index, report_name in enumerate(report_pages):
+                report_progress("sheets written", page_index, len(report_pages))
+                save_report_name = report_name.replace("/", "_")
+                worksheetX = workbook.add_worksheet(save_report_name)
+
+                worksheetX.set_column(0, 5, 30, def_format)
+                worksheetX.set_column(2, 2, 100, def_format)
+                worksheetX.set_column(3, 3, 60, def_format)
+
+                local_df = report_info[report_info["Page"] == report_name]
+                visual_ids = local_df[["Visual ID"]]["Visual ID"].unique().tolist()
+
+                local_df = local_df.sort_values(by=["Visual Type", "Type"])
+
+                dataX = {
+                    "Item Type": [],
+                    "Visual Type": [],
+                    "Description": [],
+                    "Visual Filters": [],
+                    "Interactivity": [],
+                    "Comment": [],
+                    "ID": [],
+                }
+
+                dfX = pd.DataFrame(dataX)
+
+                for visual in visual_ids:
+                    visual_type = local_df[local_df["Visual ID"] == visual].iloc[0][
+                        "Visual Type"
+                    ]
+
+                    v_type = "Visual"
+                    if visual_type == "tableEx":
+                        s_type = "Table"
+                    elif visual_type == "pivotTable":
+                        s_type = "Matrix"
+                    elif visual_type == "card":
+                        s_type = "Card"
+                    elif visual_type == "cardVisual":
+                        s_type = "Card (new)"
+                    elif visual_type == "gauge":
+                        s_type = "Gauge"
+                    elif visual_type in SLICER_VISUAL_TYPES:
+                        v_type = SLICER_VISUAL_TYPES[visual_type]
+                        s_type = local_df[local_df["Visual ID"] == visual].iloc[0][
+                            "Table"
+                        ]
+                    elif visual_type in config.visual_types:
+                        words = re.findall("[a-zA-Z][^A-Z]*", visual_type)
+                        s_type = ""
+                        for word in words:
+                            s_type += word.capitalize() + " "
+                    elif visual_type in button_type_list:
+                        v_type = "Button"
+                        s_type = visual_type
+                    elif visual_type in ["actionButton"]:
+                        v_type = "Button"
+                        s_type = "Button"
+                    elif visual_type == "Group":
+                        v_type = "Group"
+                        s_type = "Panel"
+                    else:
+                        result.log.log(
+                            "New Visual type not yet supported!", visual_type, 1
+                        )
+
+                    new_data = {
+                        "Item Type": v_type,
+                        "Visual Type": s_type,
+                        "Description": "",
+                        "Visual Filters": "",
+                        "Interactivity": "",
+                        "Comment": "",
+                        "ID": visual,
+                    }
+
+                    dfX.loc[-1] = new_data
+                    dfX.index = dfX.index + 1
+
+                for i_filter, filter in enumerate(report_filters_string):
+                    if filter[2] == "This Page" and filter[0] == report_name:
+                        new_data = {
+                            "Item Type": "Filter",
+                            "Visual Type": "This Page",
+                            "Description": "",
+                            "Visual Filters": "",
+                            "Interactivity": "",
+                            "Comment": "",
+                            "ID": i_filter,
+                        }
+
+                        dfX.loc[-1] = new_data
+                        dfX.index = dfX.index + 1
+
+                col = 0
+                for name, value in new_data.items():
+                    if name == "ID":
+                        continue
+                    worksheetX.write(0, col, name, formats["bi"])
+                    col += 1
+
+                sort_order = ["Visual", "Slicer", "Filter", "Button", "Group"]
+                dfX["Item Type"] = pd.Categorical(
+                    dfX["Item Type"], categories=sort_order, ordered=True
+                )
+                df_sorted = dfX.sort_values(by=["Item Type", "Visual Type"])
+
+                row_num = 1
+                slicer_switch = True
+                filter_switch = True
+                button_switch = True
+                for _, row in df_sorted.iterrows():
+                    filter_array = []
+                    for filter in report_filters_string:
+                        if (
+                            filter[2] == "Visual"
+                            and filter[0] == report_name
+                            and filter[1] == row["ID"]
+                        ):
+                            filter_array.extend(
+                                [formats["bold"], filter[3], " " + filter[4] + "\n"]
+                            )
+
+                    if filter_array and filter_array[-1][-1] == "\n":
+                        filter_array[-1] = filter_array[-1][:-1]
+
+                    if slicer_switch and row["Item Type"] == "Slicer":
+                        slicer_switch = False
+
+                    if filter_switch and row["Item Type"] == "Filter":
+                        filter_switch = False
+
+                    if button_switch and row["Item Type"] == "Button":
+                        button_switch = False
+
+                    if filter_switch:
+                        # Regular Measures
+                        format_array = []
+                        r_data = local_df[local_df["Visual ID"] == row["ID"]]
+                        current_type = None
+                        for im, rrow in enumerate(r_data.iloc()):
+                            if rrow["Type"] != current_type:
+                                current_type = rrow["Type"]
+                                if im != 0:
+                                    ls_app("\n")
+                                ls_app(formats["bold"], current_type + ": ")
+                            ls_app(
+                                "\n",
+                                formats["italic"],
+                                f"{rrow['Table']}[{rrow['Name']}]",
+                            )
+
+                            if rrow["Display Name"]:
+                                ls_app(
+                                    "\n\t Display Name: ",
+                                    formats["italic"],
+                                    rrow["Display Name"],
+                                )
+
+                    elif row["Item Type"] in ["Button", "Group"]:
+                        rrow = report_info[report_info["Visual ID"] == row["ID"]].iloc[
+                            0
+                        ]
+                        format_array = [
+                            formats["bold"],
+                            rrow["Type"] + ": ",
+                            formats["italic"],
+                            rrow["Display Name"],
+                            "\n",
+                            rrow["Name"],
+                        ]
+
+                    else:
+                        if isinstance(row["Item Type"], float):
+                            result.log.log("NaN Item Type Encountered!", row, 2)
+                            continue  # Temp fix for NaN Item Type
+
+                        # Filters
+                        format_array = [formats["bold"]]
+                        ls_app(
+                            report_filters_string[row["ID"]][3],
+                            " " + report_filters_string[row["ID"]][4],
+                        )
+
+                    for col, value in enumerate(row):
+                        if col == 2 and len(format_array) != 0:
+                            write_to_excel(worksheetX, row_num, col, format_array)
+                        elif col == 3 and len(filter_array) != 0:
+                            write_to_excel(worksheetX, row_num, col, filter_array)
+                        elif col == 6:
+                            continue
+                        elif value != "":
+                            worksheetX.write(row_num, col, value)
+
+                    row_num += 1
+
+        dax_findings = result.dax_findings
+        if dax_findings is not None and len(dax_findings) > 0:
+            with phase("dax findings sheet"):
+                worksheetD = workbook.add_worksheet("DAX Findings")
+                worksheetD.set_column(0, len(DAX_FINDING_COLUMNS) - 1, 20, def_format)
+                worksheetD.set_column(3, 3, 60, def_format)
+                worksheetD.set_column(7, 7, 80, def_format)
+                worksheetD.write_row(0, 0, DAX_FINDING_COLUMNS)
+                for row_num, row in enumerate(
+                    dax_findings.itertuples(index=False), start=1
                 ):
-                    filter_array.extend(
-                        [formats["bold"], filter[3], " " + filter[4] + "\n"]
+                    worksheetD.write_row(row_num, 0, row)
+
+        if num_relations > 0:
+            if graph_executor is not None:
+                with phase("graph wait"):
+                    graph_future.result()
+                graph_executor.shutdown()
+            worksheet.insert_image(
+                "E1",
+                graph_file,
+                {"x_scale": 1, "y_scale": 1},
+            )
+
+        report_progress("sheets written", len(report_pages), len(report_pages))
+
+        with phase("workbook writing"):
+            workbook.close()
+            replace_file(temp_file, excel_file)
+
+
+EXPORTERS = {
+    exporter.name: exporter
+    for exporter in (ExcelExporter, JsonExporter, CsvExporter, ParquetExporter)
+}
+
+
+CATALOG_SCHEMA = """
+CREATE TABLE IF NOT EXISTS reports (
+    report_id INTEGER PRIMARY KEY,
+    name TEXT NOT NULL UNIQUE,
+    path TEXT,
+    current_snapshot_id INTEGER
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    snapshot_id INTEGER PRIMARY KEY,
+    report_id INTEGER NOT NULL REFERENCES reports(report_id),
+    content_hash TEXT NOT NULL,
+    ingested_at TEXT NOT NULL,
+    UNIQUE (report_id, content_hash)
+);
+CREATE TABLE IF NOT EXISTS visuals (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(snapshot_id),
+    page TEXT,
+    visual_id TEXT,
+    visual_type TEXT
+);
+CREATE TABLE IF NOT EXISTS filters (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(snapshot_id),
+    page TEXT,
+    visual_id TEXT,
+    filter_type TEXT,
+    table_name TEXT,
+    field_name TEXT,
+    operator TEXT,
+    value TEXT
+);
+CREATE TABLE IF NOT EXISTS model_objects (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(snapshot_id),
+    object_type TEXT,
+    table_name TEXT,
+    name TEXT,
+    data_type TEXT,
+    definition TEXT,
+    folder TEXT,
+    is_unused INTEGER
+);
+CREATE TABLE IF NOT EXISTS usage (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(snapshot_id),
+    page TEXT,
+    visual_id TEXT,
+    usage_kind TEXT,
+    table_name TEXT,
+    field_name TEXT
+);
+CREATE TABLE IF NOT EXISTS dependencies (
+    snapshot_id INTEGER NOT NULL REFERENCES snapshots(snapshot_id),
+    table_name TEXT,
+    name TEXT,
+    ref_table TEXT,
+    ref_name TEXT
+);
+CREATE INDEX IF NOT EXISTS ix_snapshots_hash ON snapshots (content_hash);
+CREATE INDEX IF NOT EXISTS ix_visuals_snapshot ON visuals (snapshot_id);
+CREATE INDEX IF NOT EXISTS ix_filters_snapshot ON filters (snapshot_id);
+CREATE INDEX IF NOT EXISTS ix_model_objects_field ON model_objects (table_name, name);
+CREATE INDEX IF NOT EXISTS ix_model_objects_snapshot ON model_objects (snapshot_id);
+CREATE INDEX IF NOT EXISTS ix_usage_field ON usage (table_name, field_name);
+CREATE INDEX IF NOT EXISTS ix_usage_snapshot ON usage (snapshot_id, table_name, field_name);
+CREATE INDEX IF NOT EXISTS ix_dependencies_ref ON dependencies (snapshot_id, ref_table, ref_name);
+"""
+
+
+def parse_field_name(field: str) -> tuple[str, str]:
+    """
+    Splits a DAX style field reference, e.g. 'Sales'[Margin %] or Sales[Margin %]
+
+    returns (table, name)
+    """
+    match = re.match(r"^\s*'?(.*?)'?\s*\[(.*)\]\s*$", field)
+    if match is None:
+        raise ValueError(f"Field must be given as Table[Name], got: {field}")
+    return match.group(1), match.group(2)
+
+
+def file_state(file_path: str) -> tuple[int, int]:
+    """
+    returns (modification time in ns, size) of the file, a cheap change check
+    """
+    stat = os.stat(file_path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+def file_content_hash(*file_paths: str) -> str:
+    """
+    returns sha256 hex digest over the content of all given files
+    """
+    digest = hashlib.sha256()
+    for file_path in file_paths:
+        with open(file_path, "rb") as file:
+            for chunk in iter(lambda: file.read(1 << 20), b""):
+                digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ReportCatalog:
+    """
+    SQLite catalog of visuals, filters, model objects and field usage across many reports.
+    Every distinct report content hash is stored as its own snapshot, queries default to the
+    latest snapshot of each report
+    """
+
+    def __init__(self, db_path: str):
+        self.db_path = db_path
+        self.connection = sqlite3.connect(db_path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.executescript(CATALOG_SCHEMA)
+
+    def close(self):
+        self.connection.close()
+
+    def has_snapshot(self, report_name: str, content_hash: str) -> bool:
+        """
+        Checks if the report has already been ingested with this content. If so the
+        matching snapshot is made current again
+        """
+        row = self.connection.execute(
+            """
+            SELECT r.report_id, s.snapshot_id FROM reports r
+            JOIN snapshots s ON s.report_id = r.report_id
+            WHERE r.name = ? AND s.content_hash = ?
+            """,
+            (report_name, content_hash),
+        ).fetchone()
+        if row is None:
+            return False
+
+        with self.connection:
+            self.connection.execute(
+                "UPDATE reports SET current_snapshot_id = ? WHERE report_id = ?",
+                (row[1], row[0]),
+            )
+        return True
+
+    def ingest(
+        self,
+        report_name: str,
+        report_path: str,
+        content_hash: str,
+        result: DocumentationResult,
+    ) -> bool:
+        """
+        Stores the result as a new snapshot of the report
+
+        returns False if this content was already ingested
+        """
+        if self.has_snapshot(report_name, content_hash):
+            return False
+
+        import pandas as pd
+
+        with self.connection:
+            cursor = self.connection.cursor()
+            cursor.execute(
+                """
+                INSERT INTO reports (name, path) VALUES (?, ?)
+                ON CONFLICT (name) DO UPDATE SET path = excluded.path
+                """,
+                (report_name, report_path),
+            )
+            report_id = cursor.execute(
+                "SELECT report_id FROM reports WHERE name = ?", (report_name,)
+            ).fetchone()[0]
+            cursor.execute(
+                "INSERT INTO snapshots (report_id, content_hash, ingested_at) VALUES (?, ?, ?)",
+                (report_id, content_hash, time.strftime("%Y-%m-%d %H:%M:%S")),
+            )
+            snapshot_id = cursor.lastrowid
+
+            report_info = result.report_info
+            visuals = report_info[
+                ["Page", "Visual ID", "Visual Type"]
+            ].drop_duplicates()
+            cursor.executemany(
+                "INSERT INTO visuals VALUES (?, ?, ?, ?)",
+                [(snapshot_id, *row) for row in visuals.itertuples(index=False)],
+            )
+
+            cursor.executemany(
+                "INSERT INTO filters VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(snapshot_id, *row) for row in result.report_filters],
+            )
+
+            usage = [
+                (snapshot_id, row.Page, row[2], row.Type, row.Table, row.Name)
+                for row in report_info.itertuples(index=False)
+                if row.Table
+            ]
+            usage.extend(
+                (snapshot_id, row[0], row[1], f"{row[2]} Filter", row[3], row[4])
+                for row in result.report_filters
+                if row[3]
+            )
+            cursor.executemany("INSERT INTO usage VALUES (?, ?, ?, ?, ?, ?)", usage)
+
+            unused = set(result.unused_columns)
+            model_objects = result.model_objects
+            cursor.executemany(
+                "INSERT INTO model_objects VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (
+                        snapshot_id,
+                        row["Type"],
+                        row["Table"],
+                        row["Name"],
+                        None if pd.isna(row["DataType"]) else str(row["DataType"]),
+                        row["Definition"],
+                        row["Folder"],
+                        int((row["Table"], row["Name"]) in unused),
+                    )
+                    for _, row in model_objects.iterrows()
+                ],
+            )
+
+            # Measures are referenced without table name, resolve them through the model
+            measure_tables = {
+                row["Name"]: row["Table"]
+                for _, row in model_objects.iterrows()
+                if row["Type"] == "Measure"
+            }
+            dependencies = []
+            for index, references in result.dax_references.items():
+                row = model_objects.loc[index]
+                for ref_table, ref_name in references["columns"]:
+                    dependencies.append(
+                        (snapshot_id, row["Table"], row["Name"], ref_table, ref_name)
+                    )
+                for measure in references["measures"]:
+                    if measure[1:-1] in measure_tables:
+                        dependencies.append(
+                            (
+                                snapshot_id,
+                                row["Table"],
+                                row["Name"],
+                                measure_tables[measure[1:-1]],
+                                measure[1:-1],
+                            )
+                        )
+            cursor.executemany(
+                "INSERT INTO dependencies VALUES (?, ?, ?, ?, ?)", dependencies
+            )
+
+            cursor.execute(
+                "UPDATE reports SET current_snapshot_id = ? WHERE report_id = ?",
+                (snapshot_id, report_id),
+            )
+        return True
+
+    def _snapshot_filter(self, history: bool) -> str:
+        if history:
+            return "1 = 1"
+        return "s.snapshot_id = r.current_snapshot_id"
+
+    def query_usage(self, field: str, history: bool = False) -> list[tuple]:
+        """
+        Finds all visuals and filters that use the field
+
+        field: Table[Name]
+        history: search all snapshots instead of only the latest per report
+
+        returns [(report, ingested_at, page, visual_id, usage_kind), ...]
+        """
+        table_name, field_name = parse_field_name(field)
+        return self.connection.execute(
+            f"""
+            SELECT r.name, s.ingested_at, u.page, u.visual_id, u.usage_kind
+            FROM usage u
+            JOIN snapshots s ON s.snapshot_id = u.snapshot_id
+            JOIN reports r ON r.report_id = s.report_id
+            WHERE u.table_name = ? AND u.field_name = ? AND {self._snapshot_filter(history)}
+            ORDER BY r.name, s.ingested_at, u.page, u.visual_id
+            """,
+            (table_name, field_name),
+        ).fetchall()
+
+    def query_impact(self, field: str, max_depth: int = 25) -> list[tuple]:
+        """
+        Finds everything affected by changing the field: visuals and filters using it
+        directly or through measures that (recursively) reference it
+
+        field: Table[Name]
+
+        returns [(report, page, visual_id, usage_kind, used_through, depth), ...]
+        """
+        table_name, field_name = parse_field_name(field)
+        return self.connection.execute(
+            """
+            WITH RECURSIVE affected (snapshot_id, table_name, name, depth) AS (
+                SELECT current_snapshot_id, ?, ?, 0 FROM reports
+                WHERE current_snapshot_id IS NOT NULL
+                UNION
+                SELECT d.snapshot_id, d.table_name, d.name, a.depth + 1
+                FROM dependencies d
+                JOIN affected a ON d.snapshot_id = a.snapshot_id
+                    AND d.ref_table = a.table_name AND d.ref_name = a.name
+                WHERE a.depth < ?
+            )
+            SELECT r.name, u.page, u.visual_id, u.usage_kind,
+                a.table_name || '[' || a.name || ']', MIN(a.depth)
+            FROM affected a
+            JOIN usage u ON u.snapshot_id = a.snapshot_id
+                AND u.table_name = a.table_name AND u.field_name = a.name
+            JOIN snapshots s ON s.snapshot_id = a.snapshot_id
+            JOIN reports r ON r.report_id = s.report_id
+            GROUP BY r.name, u.page, u.visual_id, u.usage_kind, a.table_name, a.name
+            ORDER BY r.name, u.page, u.visual_id
+            """,
+            (table_name, field_name, max_depth),
+        ).fetchall()
+
+
+class Documenter:
+    """
+    Documents one report without touching module state. Takes the input paths and
+    options, keeps the in-memory result and log of the last run. Separate instances
+    can run at the same time in threads as long as they write to different
+    output folders
+
+    pbix_path: .pbix file
+    bim_path: model file for Tabular Editor, defaults to the .bim next to the .pbix
+    output_folder: where outputs, logs and documentation.tsv go, defaults to ./<save_name>
+    save_name: base name of the output files, defaults to the .pbix name
+    tsv_path: existing documentation.tsv, defaults to output_folder/documentation.tsv
+    input_folder: folder with the Input/*.csv settings, defaults to ./Input
+    description_tag: marks a description embedded in a DAX definition
+    colors: DAX highlighting colors as in default_colors
+    log_enabled: collect log records
+    log_to_file: also stream the log to output_folder/logs
+    parallel: run independent stages (layout/model, graph/sheets, exporters) in threads
+    hooks: phase hooks (Profiler, MemoryProfiler, ProgressTracker) that receive the
+        phases of this instance only
+    """
+
+    def __init__(
+        self,
+        pbix_path: str,
+        bim_path: str | None = None,
+        output_folder: str | None = None,
+        save_name: str | None = None,
+        tsv_path: str | None = None,
+        input_folder: str | None = None,
+        description_tag: str = DESCRIPT_TAG,
+        colors: list | None = None,
+        log_enabled: bool = True,
+        log_to_file: bool = True,
+        parallel: bool = True,
+        hooks: list | None = None,
+    ):
+        self.pbix_path = pbix_path
+        self.report_name = os.path.splitext(os.path.basename(pbix_path))[0]
+        self.bim_path = bim_path or os.path.splitext(pbix_path)[0] + ".bim"
+        self.save_name = save_name or self.report_name
+        self.output_folder = output_folder or os.path.join(os.getcwd(), self.save_name)
+        self.tsv_path = tsv_path or os.path.join(
+            self.output_folder, "documentation.tsv"
+        )
+        self.input_folder = input_folder
+        self.description_tag = description_tag
+        self.colors = [list(color) for color in (colors or default_colors)]
+        self.log_enabled = log_enabled
+        self.log_to_file = log_to_file
+        self.parallel = parallel
+        self.hooks = list(hooks or [])
+
+        self.log = None
+        self.result = None
+        # Stage outputs of earlier runs and the file state they were made from, only
+        # stages whose input changed are run again
+        self.layout = None
+        self.layout_key = None
+        self.layout_records = []
+        self.model = None
+        self.model_key = None
+        self.model_analysis = None
+        self.model_analysis_key = None
+        self.stages_run = []
+
+    def make_exporter(self, export_format: str) -> Exporter:
+        if export_format == ExcelExporter.name:
+            return ExcelExporter(self.colors, self.parallel)
+        return EXPORTERS[export_format]()
+
+    def generate_tsv(self, force: bool = False) -> str | None:
+        """
+        Runs Tabular Editor on bim_path, see gen_tsv. Tabular Editor always writes
+        output_folder/documentation.tsv, tsv_path is set to it
+        """
+        status = gen_tsv(self.bim_path, self.output_folder, force, self.input_folder)
+        if status is None:
+            self.tsv_path = os.path.join(self.output_folder, "documentation.tsv")
+        return status
+
+    @with_phase_hooks
+    def analyze(self) -> DocumentationResult:
+        """
+        Extracts and analyzes the report in memory, generating documentation.tsv
+        first if it does not exist
+
+        returns DocumentationResult, also kept as self.result
+        """
+        if not os.path.isfile(self.tsv_path):
+            with phase("tsv generation"):
+                if self.generate_tsv() == "NoTabEd":
+                    raise FileNotFoundError(
+                        "Could not find Tabular Editor, add its location in Input/TabularEditorLocations.txt"
                     )
 
-            if filter_array and filter_array[-1][-1] == "\n":
-                filter_array[-1] = filter_array[-1][:-1]
+        log_path = None
+        if self.log_to_file:
+            current_time = time.strftime("%H_%M_%S", time.localtime())
+            log_path = os.path.join(
+                self.output_folder, "logs", f"log_data_{current_time}.jsonl"
+            )
+        self.log = ReportLog(log_path, enabled=self.log_enabled)
+        config = load_config(self.input_folder)
+        self.stages_run = []
+        try:
+            layout_key = (file_state(self.pbix_path), config)
+            model_key = (file_state(self.tsv_path), self.description_tag)
+            run_layout = layout_key != self.layout_key
+            run_model = model_key != self.model_key
+
+            # The layout and model stages are independent, read the model in a
+            # second thread while the layout is extracted
+            model_future = None
+            if run_model and run_layout and self.parallel:
+                from concurrent.futures import ThreadPoolExecutor
+
+                model_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="model"
+                )
+                model_future = model_executor.submit(
+                    contextvars.copy_context().run,
+                    ingest_model,
+                    self.tsv_path,
+                    self.description_tag,
+                )
+                model_executor.shutdown(wait=False)
+
+            if run_layout:
+                first_record = len(self.log.records)
+                self.layout = extract_layout(
+                    os.path.dirname(self.pbix_path) or ".",
+                    os.path.basename(self.pbix_path),
+                    self.log,
+                    config,
+                )
+                self.layout_key = layout_key
+                self.layout_records = self.log.records[first_record:]
+                self.stages_run.append("layout")
+            else:
+                self.log.add_records(self.layout_records)
+
+            if run_model:
+                if model_future is not None:
+                    self.model = model_future.result()
+                else:
+                    self.model = ingest_model(self.tsv_path, self.description_tag)
+                self.model_key = model_key
+                self.stages_run.append("model")
+
+            model_analysis_key = (model_key, config)
+            if model_analysis_key != self.model_analysis_key:
+                self.model_analysis = analyze_model(self.model[0], config)
+                self.model_analysis_key = model_analysis_key
+                self.stages_run.append("model analysis")
+
+            self.result, _ = analyze_report(
+                os.path.dirname(self.pbix_path) or ".",
+                os.path.basename(self.pbix_path),
+                self.tsv_path,
+                self.log,
+                config,
+                self.description_tag,
+                layout=self.layout,
+                model=self.model,
+                model_analysis=self.model_analysis,
+            )
+        finally:
+            self.log.close()
+        return self.result
+
+    def use_shared_model(self, shared_model: SharedModel):
+        """
+        Uses the already read and analyzed model instead of generating and reading
+        documentation.tsv for this report. The model is only read, never changed
+        """
+        self.tsv_path = shared_model.tsv_path
+        self.model = shared_model.model
+        self.model_key = shared_model.model_key
+        self.model_analysis = shared_model.model_analysis
+        self.model_analysis_key = (shared_model.model_key, shared_model.config)
+
+    @with_phase_hooks
+    def export(self, export_formats: list[str]) -> list[str]:
+        """
+        Writes the last result in every format to output_folder
+
+        returns paths of the written files
+        """
+        if not os.path.exists(self.output_folder):
+            os.makedirs(self.output_folder)
+
+        def run_exporter(export_format: str):
+            exporter = self.make_exporter(export_format)
+            with phase(f"export {exporter.name}"):
+                exporter.export(self.result, self.output_folder, self.save_name)
+
+        before = set(os.listdir(self.output_folder))
+        try:
+            if self.parallel and len(export_formats) > 1:
+                from concurrent.futures import ThreadPoolExecutor
+
+                with ThreadPoolExecutor(
+                    max_workers=len(export_formats), thread_name_prefix="export"
+                ) as executor:
+                    futures = [
+                        executor.submit(
+                            contextvars.copy_context().run, run_exporter, export_format
+                        )
+                        for export_format in export_formats
+                    ]
+                # Raises the first exporter error, e.g. PermissionError
+                for future in futures:
+                    future.result()
+            else:
+                for export_format in export_formats:
+                    run_exporter(export_format)
+        finally:
+            # Exporters write to the log after analysis, keep those in the file too
+            self.log.close()
+        return sorted(
+            os.path.join(self.output_folder, name)
+            for name in set(os.listdir(self.output_folder)) - before
+        )
+
+    @with_phase_hooks
+    def run(
+        self, export_formats: list[str] | None = None, catalog_path: str | None = None
+    ):
+        """
+        Analyzes the report, writes the outputs and optionally updates the catalog
+
+        export_formats: output formats, see EXPORTERS. Defaults to xlsx
+        catalog_path: optional SQLite catalog to ingest the report into
+
+        returns status string
+        """
+        if export_formats is None:
+            export_formats = ["xlsx"]
+
+        # Validate all requested outputs before doing any work
+        for export_format in export_formats:
+            if export_format not in EXPORTERS:
+                return f"Unknown output format: {export_format}. Use one of {', '.join(EXPORTERS)}"
+            error = EXPORTERS[export_format]().check_available()
+            if error is not None:
+                return error
+
+        excel_file = os.path.join(self.output_folder, f"{self.save_name}.xlsx")
+        if "xlsx" in export_formats and is_file_locked(excel_file):
+            return f"Please Close File: {self.save_name}.xlsx before proceeding!"
+
+        if not os.path.isfile(self.tsv_path):
+            with phase("tsv generation"):
+                if self.generate_tsv() == "NoTabEd":
+                    return "NoTabEd"
+
+        if catalog_path is not None:
+            content_hash = file_content_hash(self.pbix_path, self.tsv_path)
+            if not export_formats:
+                catalog = ReportCatalog(catalog_path)
+                try:
+                    if catalog.has_snapshot(self.report_name, content_hash):
+                        return "Unchanged"
+                finally:
+                    catalog.close()
+
+        self.analyze()
+
+        try:
+            self.export(export_formats)
+        except PermissionError as e:
+            return f"Please Close File: {os.path.basename(e.filename2 or e.filename or '')} before proceeding!"
+
+        if catalog_path is not None:
+            catalog = ReportCatalog(catalog_path)
+            try:
+                with phase("catalog ingest"):
+                    catalog.ingest(
+                        self.report_name, self.pbix_path, content_hash, self.result
+                    )
+            finally:
+                catalog.close()
+
+        if self.log:
+            return "Log"
+
+        return "Success"
+
+
+class SharedModel:
+    """
+    Semantic model used by several (thin) reports. documentation.tsv is generated,
+    read and analyzed once, the Documenters of all reports on the model then use
+    the result read-only, see Documenter.use_shared_model
+
+    Models are stored in models_folder/<bim name>_<content hash>, an unchanged
+    .bim reuses the documentation.tsv of an earlier batch. The read and analyzed
+    model is saved there as model.pkl for the report processes of a batch
+    """
+
+    def __init__(
+        self,
+        bim_path: str,
+        models_folder: str,
+        content_hash: str | None = None,
+        input_folder: str | None = None,
+        description_tag: str = DESCRIPT_TAG,
+    ):
+        self.bim_path = bim_path
+        self.content_hash = content_hash or file_content_hash(bim_path)
+        self.name = os.path.splitext(os.path.basename(bim_path))[0]
+        self.folder = os.path.join(
+            models_folder, f"{self.name}_{self.content_hash[:12]}"
+        )
+        self.tsv_path = os.path.join(self.folder, "documentation.tsv")
+        self.input_folder = input_folder
+        self.description_tag = description_tag
+        self.config = None
+        self.model = None
+        self.model_key = None
+        self.model_analysis = None
+
+    def load(self) -> SharedModel:
+        """
+        Generates (if needed), reads and analyzes the model and saves the result to
+        model_path for subprocesses, see open
+
+        raises FileNotFoundError if Tabular Editor is needed but not found
+        """
+        if not os.path.isfile(self.tsv_path):
+            with phase("tsv generation"):
+                status = gen_tsv(
+                    self.bim_path, self.folder, input_folder=self.input_folder
+                )
+                if status == "NoTabEd":
+                    raise FileNotFoundError(
+                        "Could not find Tabular Editor, add its location in Input/TabularEditorLocations.txt"
+                    )
+        self.config = load_config(self.input_folder)
+        self.model = ingest_model(self.tsv_path, self.description_tag)
+        self.model_key = (file_state(self.tsv_path), self.description_tag)
+        self.model_analysis = analyze_model(self.model[0], self.config)
+        self.save()
+        return self
+
+    @property
+    def model_path(self) -> str:
+        return os.path.join(self.folder, "model.pkl")
+
+    def save(self):
+        import pickle
+
+        with open(self.model_path, "wb") as file:
+            pickle.dump(
+                {
+                    "bim_path": self.bim_path,
+                    "content_hash": self.content_hash,
+                    "model": self.model,
+                    "model_key": self.model_key,
+                    "model_analysis": self.model_analysis,
+                },
+                file,
+                protocol=pickle.HIGHEST_PROTOCOL,
+            )
+
+    @classmethod
+    def open(
+        cls,
+        folder: str,
+        input_folder: str | None = None,
+        description_tag: str = DESCRIPT_TAG,
+    ) -> SharedModel:
+        """
+        Opens a model saved by load in another process without reading or
+        analyzing it again
+        """
+        import pickle
+
+        with open(os.path.join(folder, "model.pkl"), "rb") as file:
+            saved = pickle.load(file)
+        shared_model = cls(
+            saved["bim_path"],
+            os.path.dirname(folder),
+            saved["content_hash"],
+            input_folder,
+            description_tag,
+        )
+        shared_model.folder = folder
+        shared_model.tsv_path = os.path.join(folder, "documentation.tsv")
+        shared_model.config = load_config(input_folder)
+        shared_model.model = saved["model"]
+        shared_model.model_key = saved["model_key"]
+        shared_model.model_analysis = saved["model_analysis"]
+        return shared_model
+
+    def dax_field_counts(self):
+        """
+        returns per model field how often DAX of the model references it
+        """
+        import pandas as pd
+
+        model_fields = list(dict.fromkeys(self.model[2]))
+        usage = UsageMatrix.build(
+            model_fields,
+            self.model[0],
+            pd.DataFrame(columns=REPORT_INFO_COLUMNS),
+            [],
+            self.model_analysis[0],
+        )
+        return usage.field_counts()[: len(model_fields)]
+
+
+MODEL_USAGE_COLUMNS = ["Table", "Name", "Reports", "Report Uses", "DAX Uses", "Used By"]
+
+
+def model_usage_rollup(
+    shared_model: SharedModel, report_uses: dict[str, list[int]]
+) -> pd.DataFrame:
+    """
+    Usage of every field of a shared model summed over the reports on it. Fields
+    with 0 Reports and 0 DAX Uses are unused in all of them
+
+    report_uses: report name -> uses per model field by visuals and filters of a
+        report on shared_model, see DocumentationResult.usage
+
+    returns DataFrame with MODEL_USAGE_COLUMNS, least used first
+    """
+    import numpy as np
+    import pandas as pd
+
+    model_fields = list(dict.fromkeys(shared_model.model[2]))
+    total_uses = np.zeros(len(model_fields), np.int64)
+    reports = np.zeros(len(model_fields), np.int64)
+    used_by = [[] for _ in model_fields]
+    for report_name, counts in sorted(report_uses.items()):
+        counts = np.asarray(counts, np.int64)
+        total_uses += counts
+        reports += counts > 0
+        for row in np.flatnonzero(counts):
+            used_by[row].append(report_name)
+
+    rollup = pd.DataFrame(
+        {
+            "Table": [field[0] for field in model_fields],
+            "Name": [field[1] for field in model_fields],
+            "Reports": reports,
+            "Report Uses": total_uses,
+            # DAX uses come from the model alone, the same in every report
+            "DAX Uses": shared_model.dax_field_counts(),
+            "Used By": [", ".join(names) for names in used_by],
+        }
+    )
+    return rollup.sort_values(
+        ["Reports", "Report Uses", "DAX Uses"], kind="stable"
+    ).reset_index(drop=True)
+
+
+BATCH_DONE_STATUSES = ("Success", "Log", "Unchanged")
+
+
+class BatchJournal:
+    """
+    Checkpoint journal of batch runs over one folder, one JSON line per finished
+    report with the hash of its input files. Every line is flushed to disk before
+    the next report starts, so a run that dies loses only the reports in progress.
+    Lines are only ever appended, with resume the finished reports of earlier runs
+    are skipped
+    """
+
+    def __init__(self, file_path: str, resume: bool = False):
+        self.file_path = file_path
+        self.lock = threading.Lock()
+        self.finished = {}
+        if resume and os.path.isfile(file_path):
+            with open(file_path, encoding="utf-8") as file:
+                for line in file:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        # Last line of a run killed while writing it
+                        continue
+                    self.finished[self.key(record)] = record
+        folder = os.path.dirname(file_path)
+        if folder and not os.path.exists(folder):
+            os.makedirs(folder, exist_ok=True)
+        # A partly written last line is ended, else the next record is appended to it
+        # and lost as well
+        if os.path.isfile(file_path) and os.path.getsize(file_path):
+            with open(file_path, "rb+") as file:
+                file.seek(-1, os.SEEK_END)
+                if file.read(1) != b"\n":
+                    file.write(b"\n")
+
+    @staticmethod
+    def default_path(folder: str) -> str:
+        """
+        returns ./batch_journals/<folder name>_<hash of its full path>.jsonl
+        """
+        folder = os.path.abspath(folder)
+        folder_hash = hashlib.sha256(folder.encode("utf-8")).hexdigest()[:12]
+        return os.path.join(
+            os.getcwd(),
+            "batch_journals",
+            f"{os.path.basename(folder.rstrip(os.sep)) or 'root'}_{folder_hash}.jsonl",
+        )
+
+    @staticmethod
+    def key(record: dict) -> tuple:
+        # Runs with other formats or another catalog (e.g. --catalog-folder) on the
+        # same folder do not replace each other's records
+        return (record["report"], tuple(record["formats"]), record.get("catalog"))
+
+    def finished_record(
+        self,
+        report: str,
+        input_hash: str,
+        export_formats: list[str],
+        catalog_path: str | None,
+    ) -> dict | None:
+        """
+        returns the journal record if the report was finished with the same input
+        files, formats and catalog, else None
+        """
+        record = self.finished.get((report, tuple(export_formats), catalog_path))
+        if (
+            record is not None
+            and record["status"] in BATCH_DONE_STATUSES
+            and record["input_hash"] == input_hash
+        ):
+            return record
+        return None
+
+    def write(self, record: dict):
+        line = json.dumps(record) + "\n"
+        with self.lock, open(self.file_path, "a", encoding="utf-8") as file:
+            file.write(line)
+            file.flush()
+            os.fsync(file.fileno())
+            self.finished[self.key(record)] = record
+
+
+def run_batch_model(bim_path: str, models_folder: str, result_path: str):
+    """
+    Generates, reads and analyzes a shared model of a batch, run by run_batch in its
+    own process. The model is saved to its folder (see SharedModel.open), the
+    status to result_path. A missing Tabular Editor is a result, not a crash
+    """
+    shared_model = SharedModel(bim_path, models_folder)
+    try:
+        shared_model.load()
+        status = "Success"
+    except FileNotFoundError:
+        status = "NoTabEd"
+    with open(result_path, "w") as file:
+        json.dump({"status": status, "folder": shared_model.folder}, file)
+
+
+def run_batch_report(
+    pbix_path: str,
+    export_formats: list[str],
+    catalog_path: str | None,
+    shared_model_folder: str | None,
+    result_path: str,
+):
+    """
+    Documents one report of a batch, run by run_batch in its own process. The
+    status and the uses per field of the shared model are written to result_path
+    """
+    documenter = Documenter(pbix_path)
+    shared_model = None
+    if shared_model_folder:
+        shared_model = SharedModel.open(shared_model_folder)
+        documenter.use_shared_model(shared_model)
+    status = documenter.run(export_formats, catalog_path)
+
+    report_uses = None
+    if shared_model is not None and documenter.result is not None:
+        model_field_count = len(dict.fromkeys(shared_model.model[2]))
+        counts = documenter.result.usage.field_counts(report_only=True)
+        report_uses = counts[:model_field_count].tolist()
+    with open(result_path, "w") as file:
+        json.dump({"status": status, "report_uses": report_uses}, file)
+
+
+def run_batch_subprocess(arguments: list[str], timeout: float | None = None) -> dict:
+    """
+    Runs this script with arguments (--batch-model or --batch-report) in a new
+    Python process, a crash or hang there only fails that step
+
+    returns the result the process wrote, {"status": "Failed: ..."} if it wrote none
+    """
+    import tempfile
+
+    with tempfile.TemporaryDirectory(prefix="pbix_batch_") as folder:
+        result_path = os.path.join(folder, "result.json")
+        command = [
+            sys.executable,
+            os.path.abspath(__file__),
+            *arguments,
+            "--batch-result",
+            result_path,
+        ]
+        try:
+            process = subprocess.run(
+                command, capture_output=True, text=True, timeout=timeout, check=False
+            )
+        except subprocess.TimeoutExpired:
+            return {"status": f"Failed: no result after {timeout:.0f} s"}
+        if process.returncode != 0 or not os.path.isfile(result_path):
+            error = process.stderr.strip().splitlines()
+            return {
+                "status": f"Failed: exit code {process.returncode}"
+                + (f": {error[-1]}" if error else "")
+            }
+        with open(result_path) as file:
+            return json.load(file)
+
+
+def run_batch_retried(
+    name: str,
+    arguments: list[str],
+    retries: int,
+    retry_delay: float,
+    timeout: float | None = None,
+    log: ReportLog | None = None,
+) -> tuple[dict, int]:
+    """
+    run_batch_subprocess, failed attempts are repeated up to retries times with
+    retry_delay doubling after each and logged as warnings. Results other than
+    "Failed: ..." (e.g. NoTabEd) are final
+
+    returns (result, attempts)
+    """
+    attempt = 0
+    while True:
+        attempt += 1
+        result = run_batch_subprocess(arguments, timeout)
+        if not result["status"].startswith("Failed") or attempt > retries:
+            return result, attempt
+        delay = retry_delay * 2 ** (attempt - 1)
+        if log is not None:
+            log.log(f"{name}: {result['status']}, retry in {delay:g} s", None, 1)
+        time.sleep(delay)
+
+
+def run_batch(
+    folder: str,
+    export_formats: list[str],
+    catalog_path: str | None = None,
+    workers: int = 1,
+    models_folder: str | None = None,
+    resume: bool = False,
+    retries: int = 2,
+    retry_delay: float = 2.0,
+    timeout: float | None = None,
+    journal_path: str | None = None,
+    log: ReportLog | None = None,
+) -> dict[str, str]:
+    """
+    Documents every .pbix in folder, each in its own process. Reports whose .bim
+    (next to the .pbix, same name) has the same content share one SharedModel, built
+    in its own process as well, and a usage rollup per model is written to
+    models_folder/<model>/<model>_usage.csv
+
+    workers: reports documented at the same time
+    resume: skips reports the journal of earlier runs lists as finished with
+        unchanged .pbix/.bim, the same formats and the same catalog
+    retries: extra attempts for failed models and reports, retry_delay doubles
+        after each
+    timeout: seconds after which a model or report process is killed and counted
+        as failed
+    journal_path: checkpoint journal, default see BatchJournal.default_path
+    log: receives the status of every report, retries and the usage rollups.
+        Progress is reported as "reports documented", see report_progress
+
+    returns report name -> status
+    """
+    from concurrent.futures import ThreadPoolExecutor
+
+    if log is None:
+        log = ReportLog()
+
+    if models_folder is None:
+        models_folder = os.path.join(os.getcwd(), "models")
+    if journal_path is None:
+        journal_path = BatchJournal.default_path(folder)
+
+    groups = {}
+    for pbix_file in sorted(Path(folder).glob("*.pbix")):
+        bim_file = pbix_file.with_suffix(".bim")
+        key = file_content_hash(str(bim_file)) if bim_file.is_file() else None
+        groups.setdefault(key, []).append(pbix_file)
+
+    journal = BatchJournal(journal_path, resume)
+    statuses = {}
+    report_count = sum(len(pbix_files) for pbix_files in groups.values())
+    status_lock = threading.Lock()
+
+    def set_status(pbix_file: Path, status: str, note: str = ""):
+        failed = status.startswith("Failed") or status == "NoTabEd"
+        log.log(f"{pbix_file.name}: {status}{note}", None, 2 if failed else 0)
+        with status_lock:
+            statuses[pbix_file.stem] = status
+            report_progress("reports documented", len(statuses), report_count)
+
+    def finish(pbix_file: Path, input_hash: str, result: dict, attempts: int):
+        journal.write(
+            {
+                "report": str(pbix_file.resolve()),
+                "input_hash": input_hash,
+                "formats": export_formats,
+                "catalog": catalog_path,
+                "status": result["status"],
+                "attempts": attempts,
+                "report_uses": result.get("report_uses"),
+                "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+            }
+        )
+        set_status(pbix_file, result["status"])
+
+    def input_hash(pbix_file: Path, shared: bool) -> str:
+        if shared:
+            return file_content_hash(str(pbix_file), str(pbix_file.with_suffix(".bim")))
+        return file_content_hash(str(pbix_file))
+
+    for content_hash, pbix_files in groups.items():
+        shared_model = None
+        if content_hash is not None:
+            bim_path = str(pbix_files[0].with_suffix(".bim"))
+            with phase("shared model", reports=len(pbix_files)):
+                result, attempts = run_batch_retried(
+                    os.path.basename(bim_path),
+                    ["--batch-model", bim_path, "--models-folder", models_folder],
+                    retries,
+                    retry_delay,
+                    timeout,
+                    log,
+                )
+            if result["status"] == "Success":
+                try:
+                    shared_model = SharedModel.open(result["folder"])
+                # A broken saved model only fails the reports on this model
+                except Exception as e:
+                    result = {"status": f"Failed: {type(e).__name__}: {e}"}
+            if shared_model is None:
+                # Every report on the model fails the same way, record it per report
+                # so that resume tries them again
+                for pbix_file in pbix_files:
+                    finish(pbix_file, input_hash(pbix_file, True), result, attempts)
+                continue
+
+        report_uses = {}
+
+        def document(
+            pbix_file: Path, shared_model=shared_model, report_uses=report_uses
+        ):
+            try:
+                file_hash = input_hash(pbix_file, shared_model is not None)
+            except OSError as e:
+                finish(pbix_file, "", {"status": f"Failed: {e}"}, 0)
+                return
+            record = journal.finished_record(
+                str(pbix_file.resolve()), file_hash, export_formats, catalog_path
+            )
+            if record is not None:
+                result = {
+                    "status": record["status"],
+                    "report_uses": record["report_uses"],
+                }
+                set_status(pbix_file, result["status"], " (earlier run)")
+            else:
+                arguments = [
+                    "--batch-report",
+                    str(pbix_file),
+                    "--formats",
+                    ",".join(export_formats),
+                ]
+                if catalog_path:
+                    arguments += ["--catalog", catalog_path]
+                if shared_model is not None:
+                    arguments += ["--shared-model", shared_model.folder]
+                result, attempts = run_batch_retried(
+                    pbix_file.name, arguments, retries, retry_delay, timeout, log
+                )
+                finish(pbix_file, file_hash, result, attempts)
+
+            if result.get("report_uses") is not None and result["status"] in (
+                "Success",
+                "Log",
+            ):
+                report_uses[pbix_file.stem] = result["report_uses"]
+
+        with ThreadPoolExecutor(
+            max_workers=max(workers, 1), thread_name_prefix="batch"
+        ) as executor:
+            # Each report gets the phase hooks of the caller, e.g. for report_progress
+            futures = [
+                executor.submit(contextvars.copy_context().run, document, pbix_file)
+                for pbix_file in pbix_files
+            ]
+            for future in futures:
+                future.result()
+
+        if shared_model is not None and report_uses:
+            rollup_path = os.path.join(
+                shared_model.folder, f"{shared_model.name}_usage.csv"
+            )
+            try:
+                rollup = model_usage_rollup(shared_model, report_uses)
+                rollup.to_csv(rollup_path, index=False)
+            except (OSError, ValueError) as e:
+                log.log(f"Model {shared_model.name}: usage rollup failed: {e}", None, 2)
+                continue
+            unused = int(((rollup["Reports"] == 0) & (rollup["DAX Uses"] == 0)).sum())
+            log.log(
+                f"Model {shared_model.name}: {len(report_uses)} reports, {unused} of "
+                f"{len(rollup)} fields unused in all of them -> {rollup_path}"
+            )
+    return statuses
+
+
+def run_cmd(
+    export_formats: list[str] = None,
+    catalog_path: str = None,
+    profile: bool = False,
+    cprofile_phase: str = None,
+    memory: bool = False,
+    progress: ProgressTracker | None = None,
+    save_name: str | None = None,
+    colors: list | None = None,
+):
+    """
+    Runs the documentation for the currently selected _PBIX_/_BIM_ with the UI/command
+    line settings
+
+    export_formats: output formats, see EXPORTERS. Defaults to xlsx
+    catalog_path: optional SQLite catalog to ingest the report into
+    profile: writes a timing trace of every phase to <save_name>/logs
+    cprofile_phase: also collects cProfile stats for this phase name (requires profile)
+    memory: writes peak memory and top allocation sites per phase to <save_name>/logs
+    progress: receives the progress of the run, raises RunCancelled when cancelled
+    save_name: base name of the output folder and files, defaults to the .pbix name
+    colors: DAX highlighting colors, defaults to default_colors
+
+    returns status string
+    """
+    global REPORT_LOG
+
+    hooks = []
+    # Memory tracking is the outer hook so its snapshots are not part of the timings
+    if memory:
+        hooks.append(MemoryProfiler())
+    if profile:
+        hooks.append(Profiler(cprofile_phase))
+
+    documenter = Documenter(
+        os.path.join(_PBIX_[1], f"{_PBIX_[0]}.pbix"),
+        bim_path=os.path.join(_BIM_[1], f"{_BIM_[0]}.bim"),
+        save_name=save_name,
+        description_tag=DESCRIPT_TAG,
+        colors=colors,
+        log_enabled=LOG_DATA,
+        # Memory tracking follows one stack of phases, keep all stages on one thread
+        parallel=not memory,
+        hooks=hooks if progress is None else [*hooks, progress],
+    )
+
+    try:
+        with use_phase_hooks(documenter.hooks), phase("run"):
+            return documenter.run(export_formats, catalog_path)
+    finally:
+        REPORT_LOG = documenter.log
+        current_time = time.strftime("%H_%M_%S", time.localtime())
+        for hook in hooks:
+            hook.write(
+                os.path.join(documenter.output_folder, "logs"),
+                f"{hook.file_prefix}_{current_time}",
+            )
+
+
+def run_catalog_folder(folder: str, catalog_path: str):
+    """
+    Ingests every .pbix file in folder into the catalog and prints the outcome. The
+    .bim file is expected next to the .pbix file with the same name
+    """
+    run_batch_command(folder, [], catalog_path)
+
+
+def run_batch_command(folder: str, export_formats: list[str], *args, **kwargs):
+    """
+    run_batch for the command line: prints the progress while it runs and the
+    status of every report, retries and usage rollups at the end
+
+    returns report name -> status
+    """
+    log = ReportLog()
+    with use_phase_hooks([ConsoleProgress()]):
+        statuses = run_batch(folder, export_formats, *args, log=log, **kwargs)
+    print()
+    for record in log.records:
+        print(record["message"])
+    failed = sum(status not in BATCH_DONE_STATUSES for status in statuses.values())
+    print(f"{len(statuses)} reports, {failed} not documented")
+    return statuses
+
+
+def run_catalog_query(catalog_path: str, field: str, impact: bool, history: bool):
+    catalog = ReportCatalog(catalog_path)
+    try:
+        start_time = time.perf_counter()
+        if impact:
+            header = ["Report", "Page", "Visual ID", "Usage", "Used Through", "Depth"]
+            rows = catalog.query_impact(field)
+        else:
+            header = ["Report", "Ingested", "Page", "Visual ID", "Usage"]
+            rows = catalog.query_usage(field, history)
+        elapsed = (time.perf_counter() - start_time) * 1000
+    finally:
+        catalog.close()
+
+    print("\t".join(header))
+    for row in rows:
+        print("\t".join(str(value) for value in row))
+    print(f"{len(rows)} rows in {elapsed:.1f} ms")
+
+
+DIFF_COLUMNS = ["Area", "Change", "Page", "Item", "Detail"]
+
+
+def structure_hash(data) -> bytes:
+    canonical = json.dumps(data, separators=(",", ":"))
+    return hashlib.blake2b(canonical.encode("utf-8"), digest_size=16).digest()
+
+
+def _diff_rows(old_rows: list[str], new_rows: list[str]) -> tuple[list, list]:
+    """
+    returns rows only in old_rows, rows only in new_rows (duplicates counted)
+    """
+    from collections import Counter
+
+    old_count, new_count = Counter(old_rows), Counter(new_rows)
+    return list((old_count - new_count).elements()), list(
+        (new_count - old_count).elements()
+    )
+
+
+def _short(value: str, length: int = 80) -> str:
+    value = str(value)
+    return value if len(value) <= length else value[: length - 3] + "..."
+
+
+class ReportDiff:
+    """
+    Compares two versions of a report. Pages and visuals are matched by their name
+    id, model objects by their Object path in documentation.tsv. Every level is
+    compared by a hash first, detailed rows are only extracted where hashes differ
+
+    changes: [Area, Change, Page, Item, Detail] rows, see DIFF_COLUMNS
+    """
+
+    def __init__(self, config: InputConfig | None = None):
+        self.config = config if config is not None else load_config()
+        self.changes = []
+        self.extractor = ReportExtractor(
+            None, None, ReportLog(enabled=False), self.config
+        )
+
+    def add_change(self, area: str, change: str, page: str, item: str, detail=""):
+        self.changes.append([area, change, page, item, detail])
+
+    def visual_rows(self, page_name: str, ex_data: dict, sections: list) -> tuple:
+        """
+        returns the field and filter rows of one visual as text, page and visual
+        name left out so both versions compare equal when only those differ
+        """
+        extractor = self.extractor
+        extractor.result, extractor.filters = [], []
+        visual_type = extractor.find_value_by_key(ex_data["config"], "visualType")
+        if extractor.extract_visual(
+            page_name, ex_data, visual_type, self.config, sections
+        ):
+            extractor.extract_visual_filters(page_name, ex_data)
+        fields = [
+            f"{row[3]}[{row[4]}] as {row[6]}" + (f" ({row[5]})" if row[5] else "")
+            for row in extractor.result
+        ]
+        return visual_type, fields, [self.filter_text(row) for row in extractor.filters]
+
+    def page_filter_rows(self, page_name: str, section: dict) -> list[str]:
+        self.extractor.filters = []
+        self.extractor.extract_page_filters(page_name, section)
+        return [self.filter_text(row) for row in self.extractor.filters]
+
+    @staticmethod
+    def filter_text(row: list) -> str:
+        return f"{row[3]}[{row[4]}] {row[5]} {row[6]}".strip()
+
+    def compare_layouts(self, old_layout: dict, new_layout: dict):
+        old_sections = {s["name"]: s for s in old_layout["sections"]}
+        new_sections = {s["name"]: s for s in new_layout["sections"]}
+
+        for name, section in old_sections.items():
+            if name not in new_sections:
+                self.add_change("Page", "Removed", section["displayName"], name)
+        for name, section in new_sections.items():
+            old_section = old_sections.get(name)
+            if old_section is None:
+                self.add_change("Page", "Added", section["displayName"], name)
+            elif structure_hash(old_section) != structure_hash(section):
+                with phase("page diff", page=section["displayName"]):
+                    self.compare_pages(
+                        old_section,
+                        section,
+                        old_layout["sections"],
+                        new_layout["sections"],
+                    )
+
+    def compare_pages(
+        self,
+        old_section: dict,
+        new_section: dict,
+        old_sections: list,
+        new_sections: list,
+    ):
+        page_name = new_section["displayName"]
+        if old_section["displayName"] != page_name:
+            self.add_change(
+                "Page",
+                "Renamed",
+                page_name,
+                new_section["name"],
+                f"{old_section['displayName']} -> {page_name}",
+            )
+
+        if old_section.get("filters") != new_section.get("filters"):
+            removed, added = _diff_rows(
+                self.page_filter_rows(page_name, old_section),
+                self.page_filter_rows(page_name, new_section),
+            )
+            for row in removed:
+                self.add_change("Page Filter", "Removed", page_name, "", row)
+            for row in added:
+                self.add_change("Page Filter", "Added", page_name, "", row)
+
+        def visuals(section: dict) -> dict:
+            containers = {}
+            for visual_container in section["visualContainers"]:
+                ex_data = ReportExtractor.decode_visual_container(
+                    dict(visual_container)
+                )
+                if ex_data.get("config", "") != "":
+                    containers[ex_data["config"]["name"]] = ex_data
+            return containers
+
+        old_visuals, new_visuals = visuals(old_section), visuals(new_section)
+        for name, ex_data in old_visuals.items():
+            if name not in new_visuals:
+                visual_type, fields, _ = self.visual_rows(
+                    page_name, ex_data, old_sections
+                )
+                self.add_change(
+                    "Visual",
+                    "Removed",
+                    page_name,
+                    name,
+                    f"{visual_type}: {', '.join(fields)}",
+                )
+        for name, ex_data in new_visuals.items():
+            old_data = old_visuals.get(name)
+            if old_data is None:
+                visual_type, fields, _ = self.visual_rows(
+                    page_name, ex_data, new_sections
+                )
+                self.add_change(
+                    "Visual",
+                    "Added",
+                    page_name,
+                    name,
+                    f"{visual_type}: {', '.join(fields)}",
+                )
+                continue
+
+            # Same key as the extraction memo, moving or resizing is no change
+            extractor = self.extractor
+            old_type = extractor.find_value_by_key(old_data["config"], "visualType")
+            new_type = extractor.find_value_by_key(ex_data["config"], "visualType")
+            if extractor.visual_memo_key(
+                old_data, old_type
+            ) == extractor.visual_memo_key(ex_data, new_type):
+                continue
+
+            old_type, old_fields, old_filters = self.visual_rows(
+                page_name, old_data, old_sections
+            )
+            new_type, new_fields, new_filters = self.visual_rows(
+                page_name, ex_data, new_sections
+            )
+            if old_type != new_type:
+                self.add_change(
+                    "Visual", "Changed", page_name, name, f"{old_type} -> {new_type}"
+                )
+            removed, added = _diff_rows(old_fields, new_fields)
+            for row in removed:
+                self.add_change("Visual Field", "Removed", page_name, name, row)
+            for row in added:
+                self.add_change("Visual Field", "Added", page_name, name, row)
+            removed, added = _diff_rows(old_filters, new_filters)
+            for row in removed:
+                self.add_change("Visual Filter", "Removed", page_name, name, row)
+            for row in added:
+                self.add_change("Visual Filter", "Added", page_name, name, row)
+
+    def compare_models(self, old_tsv_path: str, new_tsv_path: str):
+        if file_content_hash(old_tsv_path) == file_content_hash(new_tsv_path):
+            return
+        old_objects = read_model_objects(old_tsv_path)
+        new_objects = read_model_objects(new_tsv_path)
+
+        for object_path, row in old_objects.items():
+            if object_path not in new_objects:
+                area, item = model_object_label(row)
+                self.add_change(area, "Removed", "", item)
+        for object_path, row in new_objects.items():
+            old_row = old_objects.get(object_path)
+            if old_row is None:
+                area, item = model_object_label(row)
+                self.add_change(area, "Added", "", item, row.get("Expression", ""))
+            elif old_row != row:
+                area, item = model_object_label(row)
+                self.add_change(
+                    area, "Changed", "", item, model_object_changes(old_row, row)
+                )
+
+    def compare(
+        self,
+        old_pbix_path: str,
+        new_pbix_path: str,
+        old_tsv_path: str | None = None,
+        new_tsv_path: str | None = None,
+    ) -> list[list]:
+        """
+        Compares the layouts of both .pbix files and, if both are given, the models
+        of both documentation.tsv files
+
+        returns self.changes
+        """
+        with phase("layout diff"):
+            if file_content_hash(old_pbix_path) != file_content_hash(new_pbix_path):
+                self.compare_layouts(
+                    ReportExtractor(*os.path.split(old_pbix_path)).read_layout(),
+                    ReportExtractor(*os.path.split(new_pbix_path)).read_layout(),
+                )
+        if old_tsv_path is not None and new_tsv_path is not None:
+            with phase("model diff"):
+                self.compare_models(old_tsv_path, new_tsv_path)
+        return self.changes
+
+
+def read_model_objects(tsv_path: str) -> dict[str, dict]:
+    """
+    Reads documentation.tsv as written by Tabular Editor
+
+    returns {Object: {column: value}}
+    """
+    with open(tsv_path, newline="", encoding="utf-8-sig") as tsv_file:
+        reader = csv.DictReader(tsv_file, delimiter="\t", quoting=csv.QUOTE_NONE)
+        return {row["Object"]: row for row in reader}
+
+
+def model_object_label(row: dict) -> tuple[str, str]:
+    """
+    returns object type, readable name of a documentation.tsv row
+    """
+    object_path = row["Object"]
+    if "Relationship." in object_path:
+        return "Relationship", row["Name"]
+    if ".Partitions." in object_path:
+        return "Partition", row["Name"]
+    data_type, table, name = get_data_type(object_path)
+    return data_type, f"{table}[{name}]" if name else table
+
+
+def model_object_changes(old_row: dict, new_row: dict) -> str:
+    """
+    Describes the changed properties of a model object, DAX as a line diff
+    """
+    import difflib
+
+    changes = []
+    for key, value in new_row.items():
+        old_value = old_row.get(key)
+        if value == old_value:
+            continue
+        if key == "Expression":
+            lines = difflib.unified_diff(
+                (old_value or "").split("\\n"),
+                (value or "").split("\\n"),
+                lineterm="",
+                n=0,
+            )
+            changes.append(
+                "Expression:\n"
+                + "\n".join(
+                    line for line in lines if not line.startswith(("---", "+++", "@@"))
+                )
+            )
+        else:
+            changes.append(f"{key}: {_short(old_value)} -> {_short(value)}")
+    return "\n".join(changes)
+
+
+def print_diff(changes: list[list]):
+    print("\t".join(DIFF_COLUMNS))
+    for row in changes:
+        print("\t".join(str(value).replace("\n", " | ") for value in row))
+    print(f"{len(changes)} changes")
+
+
+def run_diff(
+    old_pbix_path: str,
+    new_pbix_path: str,
+    tsv_paths: list[str] | None = None,
+    output_path: str | None = None,
+):
+    """
+    Compares two versions of a report. The models are compared from the given
+    documentation.tsv files, else from the .bim files next to the .pbix files if
+    Tabular Editor is available
+    """
+    if tsv_paths is None:
+        import tempfile
+
+        tsv_paths = []
+        for pbix_path in (old_pbix_path, new_pbix_path):
+            bim_path = os.path.splitext(pbix_path)[0] + ".bim"
+            tsv_folder = tempfile.mkdtemp(prefix="pbix_diff_")
+            if (
+                not os.path.isfile(bim_path)
+                or gen_tsv(bim_path, tsv_folder) == "NoTabEd"
+            ):
+                print("No .bim or Tabular Editor, only comparing the report layouts")
+                tsv_paths = [None, None]
+                break
+            tsv_paths.append(os.path.join(tsv_folder, "documentation.tsv"))
+
+    start_time = time.perf_counter()
+    changes = ReportDiff().compare(old_pbix_path, new_pbix_path, *tsv_paths)
+    elapsed = (time.perf_counter() - start_time) * 1000
+
+    print_diff(changes)
+    print(f"Compared in {elapsed:.1f} ms")
+    if output_path:
+        with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(DIFF_COLUMNS)
+            writer.writerows(changes)
+
+
+def run_performance_lint(pbix_path: str, input_folder: str | None = None) -> int:
+    """
+    Prints the render cost metrics of every page and all metrics over their limit.
+    Only reads the report layout, no model or Tabular Editor needed
+
+    returns number of findings
+    """
+    config = load_config(input_folder)
+    _, _, visual_metrics = extract_layout(
+        os.path.dirname(pbix_path) or ".",
+        os.path.basename(pbix_path),
+        ReportLog(enabled=False),
+        config,
+    )
+    page_metrics, findings = lint_performance(
+        visual_metrics, config.performance_thresholds
+    )
+
+    print("\t".join(PAGE_METRIC_COLUMNS))
+    for row in page_metrics.itertuples(index=False):
+        print("\t".join(str(value) for value in row))
+    print()
+    print("\t".join(PERFORMANCE_FINDING_COLUMNS))
+    for row in findings.itertuples(index=False):
+        print(
+            "\t".join(
+                f"{value:g}" if isinstance(value, float) else str(value)
+                for value in row
+            )
+        )
+    print(f"{len(findings)} findings")
+    return len(findings)
+
+
+STORAGE_COLUMNS = [
+    "Table",
+    "Column",
+    "Cardinality",
+    "Encoding",
+    "Dictionary Size",
+    "Hash Index Size",
+    "Data Size",
+    "Total Size",
+    "Unused",
+]
+
+
+def read_storage_statistics(pbix_path: str) -> pd.DataFrame:
+    """
+    Reads the per column storage statistics of the VertiPaq model embedded in the
+    .pbix (DataModel) with pbixray
+
+    returns pbixray statistics: TableName, ColumnName, Cardinality, Dictionary,
+    HashIndex, DataSize (sizes in bytes)
+    """
+    try:
+        from pbixray import PBIXRay
+    except ImportError:
+        raise ImportError(
+            "Storage analysis requires pbixray. Run: pip install pbixray"
+        ) from None
+
+    with phase("storage read"):
+        return PBIXRay(pbix_path).statistics
+
+
+def analyze_storage(
+    statistics: pd.DataFrame, unused_columns: list[tuple[str, str]] | None = None
+) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Sizes per column and table, and what removing the unused columns would save.
+    Columns without a dictionary are value encoded, all others hash encoded
+
+    statistics: see read_storage_statistics
+    unused_columns: (table, column) pairs, e.g. DocumentationResult.unused_columns
+
+    returns columns (STORAGE_COLUMNS, largest first), tables (Table, Columns,
+    Total Size, Unused Columns, Unused Size)
+    """
+    import pandas as pd
+
+    unused = set(unused_columns or [])
+    sizes = (
+        statistics[["Dictionary", "HashIndex", "DataSize"]].fillna(0).astype("int64")
+    )
+    columns = pd.DataFrame(
+        {
+            "Table": statistics["TableName"],
+            "Column": statistics["ColumnName"],
+            "Cardinality": statistics["Cardinality"],
+            "Encoding": sizes["Dictionary"].gt(0).map({True: "Hash", False: "Value"}),
+            "Dictionary Size": sizes["Dictionary"],
+            "Hash Index Size": sizes["HashIndex"],
+            "Data Size": sizes["DataSize"],
+            "Total Size": sizes.sum(axis=1),
+            "Unused": [
+                (table, column) in unused
+                for table, column in zip(
+                    statistics["TableName"], statistics["ColumnName"]
+                )
+            ],
+        }
+    ).sort_values("Total Size", ascending=False, kind="stable")
+
+    tables = (
+        columns.assign(
+            **{"Unused Size": columns["Total Size"].where(columns["Unused"], 0)}
+        )
+        .groupby("Table", sort=False)
+        .agg(
+            **{
+                "Columns": ("Column", "count"),
+                "Total Size": ("Total Size", "sum"),
+                "Unused Columns": ("Unused", "sum"),
+                "Unused Size": ("Unused Size", "sum"),
+            }
+        )
+        .sort_values("Total Size", ascending=False, kind="stable")
+        .reset_index()
+    )
+    return columns.reset_index(drop=True), tables
+
+
+def run_storage_analysis(
+    pbix_path: str, tsv_path: str | None = None, output_path: str | None = None
+):
+    """
+    Prints table and column sizes of the embedded model and the memory saved by
+    removing unused columns. Unused columns need documentation.tsv, given or
+    generated from the .bim next to the .pbix
+    """
+    try:
+        statistics = read_storage_statistics(pbix_path)
+    except ImportError as e:
+        print(e)
+        return
+
+    unused_columns = None
+    try:
+        unused_columns = (
+            Documenter(pbix_path, tsv_path=tsv_path, log_to_file=False)
+            .analyze()
+            .unused_columns
+        )
+    # Whatever stops the model analysis, the sizes are still worth printing
+    except Exception as e:
+        print(f"{e}\nUnused columns are not marked")
+
+    columns, tables = analyze_storage(statistics, unused_columns)
+
+    def mb(size) -> str:
+        return f"{size / 1024 / 1024:.2f}"
+
+    total_size = int(columns["Total Size"].sum())
+    print(f"{'Table':<40}{'Columns':>8}{'Size MB':>10}{'Unused MB':>11}")
+    for row in tables.itertuples(index=False):
+        print(f"{row[0]:<40}{row[1]:>8}{mb(row[2]):>10}{mb(row[4]):>11}")
+    print()
+    print(f"{'Column':<60}{'Encoding':>9}{'Cardinality':>13}{'Size MB':>10}")
+    for row in columns.head(25).itertuples(index=False):
+        print(
+            f"{row[0] + '[' + row[1] + ']':<60}{row[3]:>9}{row[2]:>13}{mb(row[7]):>10}"
+            + ("  unused" if row[8] else "")
+        )
+
+    if unused_columns is not None:
+        unused = columns[columns["Unused"]]
+        saved = int(unused["Total Size"].sum())
+        print(
+            f"\nRemoving {len(unused)} unused columns saves {mb(saved)} MB of "
+            f"{mb(total_size)} MB ({saved / max(total_size, 1):.1%})"
+        )
+
+    if output_path:
+        columns.to_csv(output_path, index=False)
+
+
+DUPLICATE_COLUMNS = ["Cluster", "Kind", "Similarity", "Source", "Table", "Name"]
+
+_DAX_TOKEN_PATTERN = re.compile(
+    r"//[^\n]*|--[^\n]*|/\*.*?\*/|\"(?:[^\"]|\"\")*\"|'(?:[^']|'')*'|\[[^\]]*\]"
+    r"|\d+(?:\.\d+)?|[A-Za-z_][\w.]*|\S",
+    re.DOTALL,
+)
+
+
+def normalize_dax(expression: str) -> tuple[str, ...]:
+    """
+    Token stream of a DAX expression without comments and whitespace. Functions
+    and names are case folded (DAX ignores case) and variables renumbered in
+    order of declaration, so measures only differing in those compare equal
+    """
+    tokens = []
+    var_names = {}
+    for match in _DAX_TOKEN_PATTERN.finditer(expression):
+        token = match.group(0)
+        if token[0] in "/-" and len(token) > 1 and token[1] in "/-*":
+            continue
+        if token[0] != '"':
+            token = token.upper()
+        if tokens and tokens[-1] == "VAR":
+            token = var_names.setdefault(token, f"VAR{len(var_names)}")
+        else:
+            token = var_names.get(token, token)
+        tokens.append(token)
+    return tuple(tokens)
+
+
+def read_measures(model_path: str) -> list[tuple[str, str, str]]:
+    """
+    Reads all measures of a .bim file or Tabular Editor documentation.tsv
+
+    returns [(table, name, expression), ...]
+    """
+    if model_path.lower().endswith(".tsv"):
+        measures = []
+        for object_path, row in read_model_objects(model_path).items():
+            data_type, table, name = get_data_type(object_path)
+            if data_type == "Measure":
+                expression = (row.get("Expression") or "").replace("\\n", "\n")
+                measures.append((table, name, expression))
+        return measures
+
+    with open(model_path, "r", encoding="utf-8-sig") as bim_file:
+        model = json.load(bim_file)["model"]
+    measures = []
+    for table in model.get("tables", []):
+        for measure in table.get("measures", []):
+            expression = measure.get("expression", "")
+            if isinstance(expression, list):
+                expression = "\n".join(expression)
+            measures.append((table["name"], measure["name"], expression))
+    return measures
+
+
+class MeasureDuplicateFinder:
+    """
+    Groups measures with the same normalized DAX (exact duplicates) and measures
+    whose token shingles are similar (near duplicates). Near duplicates are found
+    with MinHash signatures and LSH banding, so only measures sharing a band are
+    compared instead of all pairs
+
+    threshold: estimated Jaccard similarity of two measures to be near duplicates
+    shingle: tokens per shingle
+    bands, rows: LSH bands x rows per band = MinHash signature length
+    """
+
+    def __init__(
+        self,
+        threshold: float = 0.8,
+        shingle: int = 3,
+        bands: int = 16,
+        rows: int = 4,
+    ):
+        self.threshold = threshold
+        self.shingle = shingle
+        self.bands = bands
+        self.rows = rows
+        # source, table, name per measure, and the index of its normalized form
+        self.measures = []
+        self.form_of = []
+        self.forms = {}
+
+    def add(self, source: str, table: str, name: str, expression: str):
+        tokens = normalize_dax(expression)
+        self.measures.append((source, table, name))
+        self.form_of.append(self.forms.setdefault(tokens, len(self.forms)))
+
+    def add_model(self, model_path: str):
+        source = os.path.basename(model_path)
+        for table, name, expression in read_measures(model_path):
+            self.add(source, table, name, expression)
+
+    def signatures(self, forms: list[tuple[str, ...]]):
+        """
+        returns MinHash signatures, one row of bands * rows values per form
+        """
+        import zlib
+
+        import numpy as np
+
+        prime = (1 << 61) - 1
+        generator = np.random.default_rng(0)
+        size = self.bands * self.rows
+        a = generator.integers(1, 1 << 31, size, dtype=np.uint64)
+        b = generator.integers(0, 1 << 31, size, dtype=np.uint64)
+
+        result = np.empty((len(forms), size), np.uint64)
+        for index, tokens in enumerate(forms):
+            count = max(len(tokens) - self.shingle + 1, 1)
+            hashes = np.fromiter(
+                (
+                    zlib.crc32("\x1f".join(tokens[i : i + self.shingle]).encode())
+                    for i in range(count)
+                ),
+                np.uint64,
+                count,
+            )
+            # a * hash stays below 2^63, no overflow before the modulo
+            result[index] = ((np.outer(a, hashes) + b[:, None]) % prime).min(axis=1)
+        return result
+
+    def clusters(self) -> list[list]:
+        """
+        returns rows of DUPLICATE_COLUMNS. Similarity is the estimated similarity
+        to the first measure of the cluster
+        """
+        import numpy as np
+
+        forms = list(self.forms)
+        with phase("minhash"):
+            signatures = self.signatures(forms)
+
+        # Union-find over forms sharing a band and similar enough
+        parent = list(range(len(forms)))
+
+        def find(index: int) -> int:
+            while parent[index] != index:
+                parent[index] = parent[parent[index]]
+                index = parent[index]
+            return index
+
+        with phase("lsh"):
+            for band in range(self.bands):
+                buckets = {}
+                band_values = signatures[:, band * self.rows : (band + 1) * self.rows]
+                for index, key in enumerate(map(bytes, band_values)):
+                    buckets.setdefault(key, []).append(index)
+                for members in buckets.values():
+                    first = members[0]
+                    for other in members[1:]:
+                        root, other_root = find(first), find(other)
+                        if root == other_root:
+                            continue
+                        similarity = np.mean(signatures[first] == signatures[other])
+                        if similarity >= self.threshold:
+                            parent[other_root] = root
+
+        members_of = {}
+        for measure, form in enumerate(self.form_of):
+            members_of.setdefault(find(form), []).append(measure)
+
+        rows = []
+        cluster = 0
+        for members in members_of.values():
+            if len(members) < 2:
+                continue
+            cluster += 1
+            kind = "Exact"
+            if len({self.form_of[measure] for measure in members}) > 1:
+                kind = "Near"
+            first = signatures[self.form_of[members[0]]]
+            for measure in members:
+                similarity = np.mean(signatures[self.form_of[measure]] == first)
+                rows.append(
+                    [
+                        cluster,
+                        kind,
+                        round(float(similarity), 2),
+                        *self.measures[measure],
+                    ]
+                )
+        return rows
+
+
+def run_duplicate_measures(
+    paths: list[str], threshold: float = 0.8, output_path: str | None = None
+):
+    """
+    Reports clusters of duplicated measures across .bim/documentation.tsv files.
+    Folders are searched for .bim files
+    """
+    finder = MeasureDuplicateFinder(threshold)
+    for path in paths:
+        model_paths = (
+            sorted(str(p) for p in Path(path).rglob("*.bim"))
+            if os.path.isdir(path)
+            else [path]
+        )
+        for model_path in model_paths:
+            finder.add_model(model_path)
+
+    start_time = time.perf_counter()
+    rows = finder.clusters()
+    elapsed = (time.perf_counter() - start_time) * 1000
+
+    print("\t".join(DUPLICATE_COLUMNS))
+    for row in rows:
+        print("\t".join(str(value) for value in row))
+    clusters = len({row[0] for row in rows})
+    print(
+        f"{clusters} clusters with {len(rows)} of {len(finder.measures)} measures "
+        f"({len(finder.forms)} distinct) in {elapsed:.1f} ms"
+    )
+    if output_path:
+        with open(output_path, "w", newline="", encoding="utf-8") as csv_file:
+            writer = csv.writer(csv_file)
+            writer.writerow(DUPLICATE_COLUMNS)
+            writer.writerows(rows)
+
+
+def watch_folder(
+    folder: str,
+    export_formats: list[str] | None = None,
+    debounce: float = 1.5,
+    interval: float = 0.5,
+):
+    """
+    Documents every .pbix in folder and again whenever it or its .bim is saved.
+    A change is handled once the file has not changed for debounce seconds, so
+    multi-step saves only trigger once. A changed .pbix only reruns the layout stage,
+    a changed .bim regenerates documentation.tsv and reruns the model stage
+    """
+    from zipfile import BadZipFile
+
+    documenters = {}
+    pending = {}
 
-            if slicer_switch and row["Item Type"] == "Slicer":
-                slicer_switch = False
+    def scan() -> dict[str, tuple[int, int]]:
+        states = {}
+        for pattern in ("*.pbix", "*.bim"):
+            for file_path in Path(folder).glob(pattern):
+                if file_path.name.startswith("~$"):
+                    continue
+                try:
+                    states[str(file_path)] = file_state(str(file_path))
+                except OSError:
+                    # Removed or replaced during the scan, picked up next time
+                    continue
+        return states
 
-            if filter_switch and row["Item Type"] == "Filter":
-                filter_switch = False
+    def document(pbix_path: str, bim_changed: bool):
+        documenter = documenters.get(pbix_path)
+        if documenter is None:
+            documenter = documenters[pbix_path] = Documenter(pbix_path)
 
-            if button_switch and row["Item Type"] == "Button":
-                button_switch = False
+        start_time = time.perf_counter()
+        try:
+            if (
+                bim_changed
+                and os.path.exists(documenter.bim_path)
+                and documenter.generate_tsv(force=True) == "NoTabEd"
+            ):
+                print(f"{os.path.basename(pbix_path)}: NoTabEd")
+                return
+            status = documenter.run(export_formats)
+        except (OSError, ValueError, KeyError, BadZipFile) as e:
+            # Mostly a file still being written, the next save triggers again
+            status = f"{type(e).__name__}: {e}"
+        elapsed = time.perf_counter() - start_time
+        stages = ", ".join(documenter.stages_run) or "none"
+        print(
+            f"{time.strftime('%H:%M:%S')} {os.path.basename(pbix_path)}: {status} in {elapsed:.1f} s (stages run: {stages})"
+        )
 
-            if filter_switch:
-                # Regular Measures
-                format_array = []
-                r_data = local_df[local_df["Visual ID"] == row["ID"]]
-                current_type = None
-                for im, rrow in enumerate(r_data.iloc()):
-                    if rrow["Type"] != current_type:
-                        current_type = rrow["Type"]
-                        if im != 0:
-                            ls_app("\n")
-                        ls_app(formats["bold"], current_type + ": ")
-                    ls_app("\n", formats["italic"], f"{rrow['Table']}[{rrow['Name']}]")
-
-                    if rrow["Display Name"]:
-                        ls_app(
-                            "\n\t Display Name: ",
-                            formats["italic"],
-                            rrow["Display Name"],
+    known_states = scan()
+    for file_path in sorted(known_states):
+        if file_path.endswith(".pbix"):
+            document(file_path, bim_changed=False)
+
+    print(f"Watching {folder} for saved reports, Ctrl+C to stop")
+    try:
+        while True:
+            time.sleep(interval)
+            now = time.monotonic()
+            states = scan()
+            for file_path, state in states.items():
+                if known_states.get(file_path) != state:
+                    known_states[file_path] = state
+                    pending[file_path] = now
+
+            for file_path, changed_at in list(pending.items()):
+                if now - changed_at < debounce:
+                    continue
+                del pending[file_path]
+                if file_path not in states:
+                    continue
+
+                pbix_path = os.path.splitext(file_path)[0] + ".pbix"
+                bim_changed = file_path.endswith(".bim")
+                if bim_changed:
+                    # Both files saved together, the .pbix entry is handled with it
+                    pending.pop(pbix_path, None)
+                elif os.path.splitext(file_path)[0] + ".bim" in pending:
+                    bim_changed = True
+                    pending.pop(os.path.splitext(file_path)[0] + ".bim")
+                if os.path.exists(pbix_path):
+                    document(pbix_path, bim_changed)
+    except KeyboardInterrupt:
+        pass
+
+
+class DocumentationService:
+    """
+    Keeps one warm process for many documentation jobs. Jobs are queued and run by a
+    bounded pool of worker threads, each job with its own Documenter. Submissions are
+    rejected once max_queue jobs are waiting
+
+    service_folder: uploads, job output folders and catalogs are stored here
+    workers: jobs run at the same time
+    max_queue: waiting jobs accepted before submit() refuses new ones
+    keep_jobs: finished jobs kept for status queries
+    """
+
+    def __init__(
+        self,
+        service_folder: str,
+        workers: int = 2,
+        max_queue: int = 16,
+        keep_jobs: int = 500,
+    ):
+        from concurrent.futures import ThreadPoolExecutor
+
+        self.service_folder = service_folder
+        self.upload_folder = os.path.join(service_folder, "uploads")
+        self.job_folder = os.path.join(service_folder, "jobs")
+        self.catalog_folder = os.path.join(service_folder, "catalogs")
+        for folder in (self.upload_folder, self.job_folder, self.catalog_folder):
+            if not os.path.exists(folder):
+                os.makedirs(folder)
+
+        self.workers = workers
+        self.max_queue = max_queue
+        self.keep_jobs = keep_jobs
+        self.executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="documenter"
+        )
+        self.lock = threading.Lock()
+        self.jobs = {}
+        self.next_id = 1
+        self.started = time.time()
+        self.counts = {"submitted": 0, "rejected": 0, "succeeded": 0, "failed": 0}
+        # (finished at, queue seconds, run seconds) of the latest jobs
+        self.latencies = []
+
+        self.warm_up()
+
+    def warm_up(self):
+        """
+        Imports the heavy modules once so the first job does not pay for them
+        """
+        import matplotlib
+        import networkx  # noqa: F401
+        import pandas  # noqa: F401
+        import xlsxwriter  # noqa: F401
+
+        matplotlib.use("agg")
+        from matplotlib.figure import Figure  # noqa: F401
+
+    def save_upload(self, file_name: str, data: bytes) -> str:
+        """
+        Stores an uploaded .pbix/.bim/.tsv file in its own folder, so a new upload
+        with the same name never replaces the file of a queued job
+
+        returns the stored path, for use in submit()
+        """
+        import uuid
+
+        file_name = os.path.basename(file_name)
+        if os.path.splitext(file_name)[1].lower() not in (".pbix", ".bim", ".tsv"):
+            raise ValueError("Only .pbix, .bim and .tsv files can be uploaded")
+        upload_folder = os.path.join(self.upload_folder, uuid.uuid4().hex)
+        os.makedirs(upload_folder)
+        file_path = os.path.join(upload_folder, file_name)
+        temp_path = file_path + ".tmp"
+        with open(temp_path, "wb") as file:
+            file.write(data)
+        os.replace(temp_path, file_path)
+        return file_path
+
+    def uploaded_path(self, request: dict, key: str) -> str | None:
+        """
+        returns request[key] resolved, raises ValueError unless it is an uploaded file
+        """
+        path = request.get(key)
+        if not path:
+            return None
+        path = os.path.realpath(path)
+        upload_folder = os.path.realpath(self.upload_folder)
+        if os.path.commonpath([path, upload_folder]) != upload_folder:
+            raise ValueError(f"{key} must be a file uploaded with POST /uploads")
+        if not os.path.isfile(path):
+            raise ValueError(f"{key} not found: {path}")
+        return path
+
+    def submit(self, request: dict) -> dict:
+        """
+        Queues a job. request holds pbix_path and optionally bim_path, tsv_path,
+        save_name, formats and catalog. The paths must be files returned by
+        save_upload. Output is written to jobs/<job id> and catalog is the name of
+        a catalog in the catalogs folder of the service
+
+        returns the job status, raises ValueError for bad requests and
+        OverflowError if the queue is full
+        """
+        pbix_path = self.uploaded_path(request, "pbix_path")
+        if pbix_path is None:
+            raise ValueError("pbix_path is required")
+        bim_path = self.uploaded_path(request, "bim_path")
+        tsv_path = self.uploaded_path(request, "tsv_path")
+        export_formats = request.get("formats", ["xlsx"])
+        for export_format in export_formats:
+            if export_format not in EXPORTERS:
+                raise ValueError(
+                    f"Unknown output format: {export_format}. Use one of {', '.join(EXPORTERS)}"
+                )
+
+        with self.lock:
+            queued = sum(job["status"] == "queued" for job in self.jobs.values())
+            if queued >= self.max_queue:
+                self.counts["rejected"] += 1
+                raise OverflowError(f"Queue is full ({self.max_queue} jobs waiting)")
+
+            job_id = str(self.next_id)
+            self.next_id += 1
+            job = {
+                "id": job_id,
+                "status": "queued",
+                "pbix_path": pbix_path,
+                "formats": export_formats,
+                "submitted": time.time(),
+                "started": None,
+                "finished": None,
+                "result": None,
+                "error": None,
+                "files": [],
+                "log_records": 0,
+            }
+            self.jobs[job_id] = job
+            self.counts["submitted"] += 1
+            self._prune_jobs()
+
+        # Clients only name files, they never choose where the service writes
+        save_name = request.get("save_name")
+        catalog_path = request.get("catalog")
+        if catalog_path:
+            catalog_path = os.path.join(
+                self.catalog_folder, os.path.basename(catalog_path)
+            )
+        documenter = Documenter(
+            pbix_path,
+            bim_path=bim_path,
+            output_folder=os.path.join(self.job_folder, job_id),
+            save_name=save_name and os.path.basename(save_name),
+            tsv_path=tsv_path,
+        )
+        self.executor.submit(self._run_job, job, documenter, catalog_path)
+        return self.job_status(job_id)
+
+    def _run_job(self, job: dict, documenter: Documenter, catalog_path: str | None):
+        with self.lock:
+            job["status"] = "running"
+            job["started"] = time.time()
+        try:
+            result = documenter.run(job["formats"], catalog_path)
+            error = None
+        # Any error fails only this job, the worker thread keeps serving
+        except Exception as e:
+            result = "Error"
+            error = f"{type(e).__name__}: {e}"
+
+        with self.lock:
+            job["finished"] = time.time()
+            job["result"] = result
+            job["error"] = error
+            job["status"] = (
+                "done" if result in ("Success", "Log", "Unchanged") else "failed"
+            )
+            job["output_folder"] = documenter.output_folder
+            if os.path.exists(documenter.output_folder):
+                job["files"] = sorted(
+                    name
+                    for name in os.listdir(documenter.output_folder)
+                    if os.path.isfile(os.path.join(documenter.output_folder, name))
+                )
+            if documenter.log is not None:
+                job["log_records"] = len(documenter.log.records)
+
+            self.counts["succeeded" if job["status"] == "done" else "failed"] += 1
+            self.latencies.append(
+                (
+                    job["finished"],
+                    job["started"] - job["submitted"],
+                    job["finished"] - job["started"],
+                )
+            )
+            del self.latencies[:-1000]
+
+    def _prune_jobs(self):
+        finished = [
+            job_id
+            for job_id, job in self.jobs.items()
+            if job["status"] in ("done", "failed")
+        ]
+        for job_id in finished[: max(len(self.jobs) - self.keep_jobs, 0)]:
+            del self.jobs[job_id]
+
+    def job_status(self, job_id: str) -> dict | None:
+        with self.lock:
+            job = self.jobs.get(job_id)
+            if job is None:
+                return None
+            return {key: value for key, value in job.items() if key != "pbix_path"}
+
+    def job_file(self, job_id: str, file_name: str) -> str | None:
+        """
+        returns path of an output file of a finished job
+        """
+        status = self.job_status(job_id)
+        if status is None or os.path.basename(file_name) not in status["files"]:
+            return None
+        return os.path.join(status["output_folder"], os.path.basename(file_name))
+
+    def metrics(self) -> dict:
+        """
+        returns job counters, queue state and latency percentiles in ms of the
+        latest 1000 jobs, throughput is jobs finished in the last minute
+        """
+
+        def percentiles(values: list[float]) -> dict:
+            if not values:
+                return {"p50": None, "p95": None, "max": None}
+            values = sorted(values)
+            return {
+                "p50": values[int(0.5 * (len(values) - 1))] * 1000,
+                "p95": values[int(0.95 * (len(values) - 1))] * 1000,
+                "max": values[-1] * 1000,
+            }
+
+        with self.lock:
+            now = time.time()
+            statuses = [job["status"] for job in self.jobs.values()]
+            return {
+                "uptime_s": now - self.started,
+                "workers": self.workers,
+                "max_queue": self.max_queue,
+                "queued": statuses.count("queued"),
+                "running": statuses.count("running"),
+                **self.counts,
+                "jobs_last_minute": sum(
+                    finished > now - 60 for finished, _, _ in self.latencies
+                ),
+                "queue_ms": percentiles([queue for _, queue, _ in self.latencies]),
+                "run_ms": percentiles([run for _, _, run in self.latencies]),
+            }
+
+    def shutdown(self):
+        self.executor.shutdown(wait=True)
+
+
+def serve(service: DocumentationService, host: str = "127.0.0.1", port: int = 8765):
+    """
+    HTTP API for the service:
+        POST /uploads/<file name>       body is the file, returns {"path"}
+        POST /jobs                      JSON request, see DocumentationService.submit
+        GET  /jobs/<id>                 job status
+        GET  /jobs/<id>/files/<name>    output file of the job
+        GET  /metrics                   counters and latencies
+    """
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+    from urllib.parse import unquote
+
+    class Handler(BaseHTTPRequestHandler):
+        def send_json(self, code: int, data):
+            body = json.dumps(data).encode("utf-8")
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def read_body(self) -> bytes:
+            return self.rfile.read(int(self.headers.get("Content-Length", 0)))
+
+        def do_GET(self):
+            parts = [unquote(part) for part in self.path.strip("/").split("/")]
+            if parts == ["metrics"]:
+                self.send_json(200, service.metrics())
+            elif len(parts) == 2 and parts[0] == "jobs":
+                status = service.job_status(parts[1])
+                if status is None:
+                    self.send_json(404, {"error": "Unknown job"})
+                else:
+                    self.send_json(200, status)
+            elif len(parts) == 4 and parts[0] == "jobs" and parts[2] == "files":
+                file_path = service.job_file(parts[1], parts[3])
+                if file_path is None:
+                    self.send_json(404, {"error": "Unknown file"})
+                    return
+                with open(file_path, "rb") as file:
+                    body = file.read()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/octet-stream")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+            else:
+                self.send_json(404, {"error": "Unknown path"})
+
+        def do_POST(self):
+            parts = [unquote(part) for part in self.path.strip("/").split("/")]
+            # Browsers send cross-site POSTs without a preflight only for form and
+            # text/plain bodies, requiring other types keeps web pages out
+            content_type = self.headers.get_content_type()
+            try:
+                if len(parts) == 2 and parts[0] == "uploads":
+                    if content_type != "application/octet-stream":
+                        self.send_json(
+                            415, {"error": "Use Content-Type application/octet-stream"}
+                        )
+                        return
+                    path = service.save_upload(parts[1], self.read_body())
+                    self.send_json(201, {"path": path})
+                elif parts == ["jobs"]:
+                    if content_type != "application/json":
+                        self.send_json(
+                            415, {"error": "Use Content-Type application/json"}
                         )
+                        return
+                    self.send_json(202, service.submit(json.loads(self.read_body())))
+                else:
+                    self.send_json(404, {"error": "Unknown path"})
+            except OverflowError as e:
+                self.send_json(503, {"error": str(e)})
+            except (ValueError, TypeError, AttributeError) as e:
+                self.send_json(400, {"error": str(e)})
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    print(f"Serving on http://{host}:{server.server_port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.shutdown()
+
+
+SYNTHETIC_VISUAL_TYPES = [
+    ("tableEx", "Values"),
+    ("card", "Values"),
+    ("clusteredColumnChart", "Y"),
+    ("slicer", "Values"),
+    ("pivotTable", "Rows"),
+    ("lineChart", "Y"),
+]
+
+SYNTHETIC_FUNCTIONS = ["SUM", "CALCULATE", "DIVIDE", "IF", "SUMX", "COUNTROWS"]
+
+
+class SyntheticReport:
+    """
+    Generates a synthetic report archive (.pbix with Report/Layout) together with
+    matching model metadata: documentation.tsv as exported by Tabular Editor and a
+    .bim file. All content is deterministic for a given seed
+    """
+
+    def __init__(
+        self,
+        pages: int = 5,
+        visuals_per_page: int = 10,
+        fields_per_visual: int = 4,
+        filters_per_visual: int = 1,
+        measures: int = 50,
+        dax_lines: int = 8,
+        relationships: int = 10,
+        columns_per_table: int = 8,
+        seed: int = 0,
+    ):
+        import random
+
+        self.pages = pages
+        self.visuals_per_page = visuals_per_page
+        self.fields_per_visual = fields_per_visual
+        self.filters_per_visual = filters_per_visual
+        self.measure_count = measures
+        self.dax_lines = dax_lines
+        self.relationship_count = relationships
+        self.columns_per_table = columns_per_table
+        self.random = random.Random(seed)
+
+        self.tables = ["Sales"] + [f"Dim{i}" for i in range(relationships)]
+        self.columns = {
+            table: [f"{table}Col{i}" for i in range(columns_per_table)]
+            for table in self.tables
+        }
+        self.measures = [f"Measure {i}" for i in range(measures)]
+
+    def params(self) -> dict:
+        return {
+            "pages": self.pages,
+            "visuals_per_page": self.visuals_per_page,
+            "fields_per_visual": self.fields_per_visual,
+            "filters_per_visual": self.filters_per_visual,
+            "measures": self.measure_count,
+            "dax_lines": self.dax_lines,
+            "relationships": self.relationship_count,
+        }
+
+    def _random_column(self) -> tuple[str, str]:
+        table = self.random.choice(self.tables)
+        return table, self.random.choice(self.columns[table])
+
+    def _field(self) -> tuple[str, str, str]:
+        """returns (table, name, 'Column' or 'Measure')"""
+        if self.measures and self.random.random() < 0.5:
+            return "Sales", self.random.choice(self.measures), "Measure"
+        return (*self._random_column(), "Column")
+
+    def _column_filter(self, table: str, column: str, values: int) -> dict:
+        return {
+            "name": f"Filter{self.random.getrandbits(32):08x}",
+            "expression": {
+                "Column": {
+                    "Expression": {"SourceRef": {"Entity": table}},
+                    "Property": column,
+                }
+            },
+            "filter": {
+                "Version": 2,
+                "From": [{"Name": "t", "Entity": table, "Type": 0}],
+                "Where": [
+                    {
+                        "Condition": {
+                            "In": {
+                                "Expressions": [
+                                    {
+                                        "Column": {
+                                            "Expression": {
+                                                "SourceRef": {"Source": "t"}
+                                            },
+                                            "Property": column,
+                                        }
+                                    }
+                                ],
+                                "Values": [
+                                    [{"Literal": {"Value": f"'Value {i}'"}}]
+                                    for i in range(values)
+                                ],
+                            }
+                        }
+                    }
+                ],
+            },
+            "type": "Categorical",
+        }
+
+    def _visual(self, page: int, index: int) -> dict:
+        visual_type, role = SYNTHETIC_VISUAL_TYPES[index % len(SYNTHETIC_VISUAL_TYPES)]
+        fields = [self._field() for _ in range(self.fields_per_visual)]
+        if visual_type == "slicer":
+            fields = [(*self._random_column(), "Column")]
+
+        sources = {}
+        selects = []
+        projections = []
+        for table, name, kind in fields:
+            source = sources.setdefault(table, f"s{len(sources)}")
+            query_ref = f"{table}.{name}"
+            selects.append(
+                {
+                    kind: {
+                        "Expression": {"SourceRef": {"Source": source}},
+                        "Property": name,
+                    },
+                    "Name": query_ref,
+                }
+            )
+            projections.append({"queryRef": query_ref})
+
+        config = {
+            "name": f"{page:04x}{index:04x}{self.random.getrandbits(32):08x}",
+            "layouts": [
+                {"id": 0, "position": {"x": index * 40, "y": index * 30, "z": index}}
+            ],
+            "singleVisual": {
+                "visualType": visual_type,
+                "projections": {role: projections},
+                "prototypeQuery": {
+                    "Version": 2,
+                    "From": [
+                        {"Name": source, "Entity": table, "Type": 0}
+                        for table, source in sources.items()
+                    ],
+                    "Select": selects,
+                },
+            },
+        }
+        filters = [
+            self._column_filter(*self._random_column(), values=3)
+            for _ in range(self.filters_per_visual)
+        ]
+        return {
+            "x": index * 40,
+            "y": index * 30,
+            "z": index,
+            "width": 300,
+            "height": 200,
+            "config": json.dumps(config),
+            "filters": json.dumps(filters),
+        }
+
+    def layout(self) -> dict:
+        sections = []
+        for page in range(self.pages):
+            sections.append(
+                {
+                    "name": f"ReportSection{page:04x}",
+                    "displayName": f"Page {page}",
+                    "filters": json.dumps(
+                        [self._column_filter(*self._random_column(), values=1)]
+                    ),
+                    "visualContainers": [
+                        self._visual(page, index)
+                        for index in range(self.visuals_per_page)
+                    ],
+                }
+            )
+        return {"config": json.dumps({"version": "5.43"}), "sections": sections}
+
+    def _dax(self, measure_index: int) -> list[str]:
+        """returns the lines of a measure definition"""
+        lines = []
+        for i in range(max(self.dax_lines - 2, 1)):
+            table, column = self._random_column()
+            function = self.random.choice(SYNTHETIC_FUNCTIONS)
+            if i % 4 == 3:
+                lines.append(f'// Comment line {i} with "quoted" text')
+            elif function in ("SUMX", "COUNTROWS"):
+                lines.append(f"VAR v{i} = {function}({table}, {table}[{column}])")
+            elif measure_index > 0 and i % 3 == 1:
+                other = self.measures[self.random.randrange(measure_index)]
+                lines.append(f"VAR v{i} = {function}([{other}], {table}[{column}])")
+            else:
+                lines.append(f'VAR v{i} = {function}({table}[{column}], "text {i}")')
+        lines.append("RETURN")
+        lines.append("    v0")
+        return lines
+
+    def relationships(self) -> list[tuple[str, str, str, str]]:
+        """returns [(guid, from_table, to_table, key_column), ...]"""
+        result = []
+        for i, table in enumerate(self.tables[1:]):
+            guid = f"{i:08x}-0000-4000-8000-{self.random.getrandbits(48):012x}"
+            result.append((guid, "Sales", table, self.columns[table][0]))
+        return result
+
+    def write(self, folder: str, name: str) -> dict[str, str]:
+        """
+        Writes <name>.pbix, <name>.bim and documentation.tsv into folder
+
+        returns paths of the written files
+        """
+        from zipfile import ZIP_DEFLATED
+
+        if not os.path.exists(folder):
+            os.makedirs(folder)
 
-            elif row["Item Type"] in ["Button", "Group"]:
-                rrow = report_info[report_info["Visual ID"] == row["ID"]].iloc[0]
-                format_array = [
-                    formats["bold"],
-                    rrow["Type"] + ": ",
-                    formats["italic"],
-                    rrow["Display Name"],
-                    "\n",
-                    rrow["Name"],
+        pbix_path = os.path.join(folder, f"{name}.pbix")
+        with ZipFile(pbix_path, "w", ZIP_DEFLATED) as archive:
+            archive.writestr(
+                "Report/Layout", json.dumps(self.layout()).encode("utf-16-le")
+            )
+            archive.writestr("DataModel", b"\0" * 1024)
+            archive.writestr("Version", "1.28".encode("utf-16-le"))
+
+        measure_definitions = [self._dax(i) for i in range(self.measure_count)]
+        relationships = self.relationships()
+
+        tsv_rows = []
+        for table in self.tables:
+            tsv_rows.append([f"Model.Tables.{table}", table, "", "", "", "", "", ""])
+            for column in self.columns[table]:
+                tsv_rows.append(
+                    [
+                        f"Model.Tables.{table}.C.{column}",
+                        column,
+                        "",
+                        column,
+                        "",
+                        "",
+                        "String",
+                        "",
+                    ]
+                )
+        for measure, lines in zip(self.measures, measure_definitions):
+            tsv_rows.append(
+                [
+                    f"Model.Tables.Sales.M.{measure}",
+                    measure,
+                    "",
+                    "",
+                    "\\n".join(lines).replace("    ", "\\t"),
+                    "#,0",
+                    "Decimal",
+                    "Measures",
+                ]
+            )
+        for guid, from_table, to_table, key in relationships:
+            tsv_rows.append(
+                [
+                    f"Relationship.{guid}",
+                    f"'{from_table}'[{key}] --> '{to_table}'[{key}]",
+                    "",
+                    "",
+                    "",
+                    "",
+                    "",
+                    "",
                 ]
+            )
+
+        tsv_path = os.path.join(folder, "documentation.tsv")
+        with open(tsv_path, "w", encoding="utf-8", newline="") as tsv_file:
+            tsv_file.write(
+                "Object\tName\tDescription\tSourceColumn\tExpression\tFormatString\tDataType\tDisplayFolder\n"
+            )
+            tsv_file.writelines("\t".join(row) + "\n" for row in tsv_rows)
+
+        bim = {
+            "name": name,
+            "compatibilityLevel": 1550,
+            "model": {
+                "tables": [
+                    {
+                        "name": table,
+                        "columns": [
+                            {
+                                "name": column,
+                                "dataType": "string",
+                                "sourceColumn": column,
+                            }
+                            for column in self.columns[table]
+                        ],
+                        "measures": [
+                            {
+                                "name": measure,
+                                "expression": lines,
+                                "formatString": "#,0",
+                                "displayFolder": "Measures",
+                            }
+                            for measure, lines in zip(
+                                self.measures, measure_definitions
+                            )
+                        ]
+                        if table == "Sales"
+                        else [],
+                    }
+                    for table in self.tables
+                ],
+                "relationships": [
+                    {
+                        "name": guid,
+                        "fromTable": from_table,
+                        "fromColumn": key,
+                        "toTable": to_table,
+                        "toColumn": key,
+                    }
+                    for guid, from_table, to_table, key in relationships
+                ],
+            },
+        }
+        bim_path = os.path.join(folder, f"{name}.bim")
+        with open(bim_path, "w", encoding="utf-8") as bim_file:
+            json.dump(bim, bim_file, indent=2)
+
+        return {"pbix": pbix_path, "bim": bim_path, "tsv": tsv_path}
+
+
+def benchmark_workloads(scales: list[int]) -> list[tuple[str, SyntheticReport]]:
+    """
+    returns [(workload name, SyntheticReport), ...] growing pages, measures and
+    relationships linearly with each scale factor
+    """
+    return [
+        (
+            f"scale_{scale}",
+            SyntheticReport(
+                pages=5 * scale,
+                visuals_per_page=10,
+                fields_per_visual=4,
+                filters_per_visual=1,
+                measures=50 * scale,
+                dax_lines=8,
+                relationships=min(5 * scale, 40),
+                seed=scale,
+            ),
+        )
+        for scale in scales
+    ]
+
+
+def _benchmark_pass(folder: str, name: str, export_formats: list[str], hook):
+    """
+    Runs extraction, analysis and the exporters once with hook installed
+
+    returns the DocumentationResult
+    """
+    documenter = Documenter(
+        os.path.join(folder, f"{name}.pbix"),
+        output_folder=os.path.join(folder, "output"),
+        tsv_path=os.path.join(folder, "documentation.tsv"),
+        log_to_file=False,
+        parallel=not isinstance(hook, MemoryProfiler),
+        hooks=[hook],
+    )
+    with use_phase_hooks(documenter.hooks), phase("run"):
+        documenter.analyze()
+        documenter.export(export_formats)
+    return documenter.result
+
+
+def run_benchmark(
+    scales: list[int] | None = None,
+    repeat: int = 3,
+    export_formats: list[str] | None = None,
+) -> dict:
+    """
+    Generates synthetic reports for each scale and measures every pipeline stage
+
+    scales: workload size multipliers
+    repeat: timed runs per workload, the median is reported
+    export_formats: exporters to include, defaults to xlsx and json
 
+    returns {"workloads": [{"name", "params", "counts", "stages": {stage: {...}}}]}
+    """
+    import statistics
+    import tempfile
+
+    if scales is None:
+        scales = [1, 2, 4, 8]
+    if export_formats is None:
+        export_formats = ["xlsx", "json"]
+
+    import platform
+
+    results = {
+        "scales": scales,
+        "formats": export_formats,
+        "repeat": repeat,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "workloads": [],
+    }
+    for name, report in benchmark_workloads(scales):
+        with tempfile.TemporaryDirectory() as folder:
+            report.write(folder, name)
+
+            timings = {}
+            for _ in range(repeat):
+                profiler = Profiler()
+                result = _benchmark_pass(folder, name, export_formats, profiler)
+                for stage, total, _count in profiler.summary():
+                    if stage.startswith(("page: ", "visual: ")):
+                        continue
+                    timings.setdefault(stage, []).append(total)
+
+            memory_profiler = MemoryProfiler()
+            try:
+                _benchmark_pass(folder, name, export_formats, memory_profiler)
+            finally:
+                memory_profiler.stop()
+            peaks = {}
+            for record in memory_profiler.records:
+                peaks[record["name"]] = max(
+                    peaks.get(record["name"], 0), record["peak"]
+                )
+
+        counts = {
+            "visuals": int(result.report_info["Visual ID"].nunique()),
+            "fields": len(result.report_info),
+            "filters": len(result.report_filters),
+            "model_objects": len(result.model_objects),
+        }
+        # Work items each stage is dominated by, used for throughput
+        stage_items = {
+            "extract": counts["visuals"],
+            "layout decode": counts["visuals"],
+            "tsv ingest": counts["model_objects"],
+            "usage analysis": counts["model_objects"],
+            "dax highlighting": counts["model_objects"],
+            "page sheets": counts["visuals"],
+        }
+
+        stages = {}
+        for stage, runs in timings.items():
+            median_ms = statistics.median(runs)
+            stages[stage] = {
+                "median_ms": median_ms,
+                "runs_ms": runs,
+                "peak_mb": peaks.get(stage, 0) / 1024 / 1024,
+            }
+            if stage in stage_items and median_ms > 0:
+                stages[stage]["items_per_s"] = stage_items[stage] / median_ms * 1000
+
+        results["workloads"].append(
+            {
+                "name": name,
+                "params": report.params(),
+                "counts": counts,
+                "stages": stages,
+            }
+        )
+    return results
+
+
+def print_benchmark(results: dict):
+    for workload in results["workloads"]:
+        counts = ", ".join(f"{k}: {v}" for k, v in workload["counts"].items())
+        print(f"\n{workload['name']} ({counts})")
+        print(f"{'Stage':<24}{'Median ms':>12}{'Peak MB':>10}{'Items/s':>12}")
+        for stage, values in sorted(
+            workload["stages"].items(), key=lambda item: -item[1]["median_ms"]
+        ):
+            items = values.get("items_per_s")
+            items = "-" if items is None else f"{items:.0f}"
+            print(
+                f"{stage:<24}{values['median_ms']:>12.1f}{values['peak_mb']:>10.1f}{items:>12}"
+            )
+
+
+def compare_benchmark(
+    baseline: dict, current: dict, tolerance: float = 0.15, min_ms: float = 5.0
+) -> list[tuple]:
+    """
+    Compares the median stage times of two run_benchmark results. A stage regresses
+    when it got slower by more than the largest of:
+        tolerance * baseline median
+        3 * median absolute deviation of the baseline and current runs (noise)
+        min_ms
+
+    returns [(workload, stage, baseline ms, current ms, delta %, threshold ms, status), ...]
+    """
+    import statistics
+
+    def deviation(runs: list[float]) -> float:
+        median = statistics.median(runs)
+        return statistics.median(abs(run - median) for run in runs)
+
+    current_workloads = {w["name"]: w for w in current["workloads"]}
+    rows = []
+    for workload in baseline["workloads"]:
+        current_workload = current_workloads.get(workload["name"])
+        if current_workload is None:
+            continue
+        for stage, base in workload["stages"].items():
+            now = current_workload["stages"].get(stage)
+            if now is None:
+                rows.append(
+                    (
+                        workload["name"],
+                        stage,
+                        base["median_ms"],
+                        None,
+                        None,
+                        None,
+                        "missing",
+                    )
+                )
+                continue
+            noise = 3 * max(deviation(base["runs_ms"]), deviation(now["runs_ms"]))
+            threshold = max(tolerance * base["median_ms"], noise, min_ms)
+            delta = now["median_ms"] - base["median_ms"]
+            if delta > threshold:
+                status = "REGRESSION"
+            elif -delta > threshold:
+                status = "improved"
             else:
-                if isinstance(row["Item Type"], float):
-                    REPORT_LOG += log_data("NaN Item Type Encountered!", row, 2)
-                    continue  # Temp fix for NaN Item Type
-
-                # Filters
-                format_array = [formats["bold"]]
-                ls_app(
-                    report_filters_string[row["ID"]][3],
-                    " " + report_filters_string[row["ID"]][4],
+                status = "ok"
+            delta_percent = delta / base["median_ms"] * 100 if base["median_ms"] else 0
+            rows.append(
+                (
+                    workload["name"],
+                    stage,
+                    base["median_ms"],
+                    now["median_ms"],
+                    delta_percent,
+                    threshold,
+                    status,
                 )
+            )
+    return rows
 
-            for col, value in enumerate(row):
-                if col == 2 and len(format_array) != 0:
-                    write_to_excel(worksheetX, row_num, col, format_array)
-                elif col == 3 and len(filter_array) != 0:
-                    write_to_excel(worksheetX, row_num, col, filter_array)
-                elif col == 6:
-                    continue
-                elif value != "":
-                    worksheetX.write(row_num, col, value)
 
-            row_num += 1
+def run_benchmark_compare(baseline_path: str, tolerance: float) -> int:
+    """
+    Reruns the workloads stored in the baseline file and prints per stage deltas
 
-    workbook.close()
+    returns number of regressed stages
+    """
+    with open(baseline_path, "r") as baseline_file:
+        baseline = json.load(baseline_file)
 
-    ## Print Logging Info -- Needs more love
-    if REPORT_LOG and LOG_DATA:
-        t = time.localtime()
-        current_time = time.strftime("%H_%M_%S", t)
-        location_folder = cwd + f"\\{SAVE_NAME}\\logs"
-        location = location_folder + f"\\log_data_{current_time}.txt"
+    current = run_benchmark(baseline["scales"], baseline["repeat"], baseline["formats"])
+    if (current["python"], current["platform"]) != (
+        baseline["python"],
+        baseline["platform"],
+    ):
+        print(
+            f"Warning: baseline was recorded on Python {baseline['python']} ({baseline['platform']})"
+        )
 
-        if not os.path.exists(location_folder):
-            os.makedirs(location_folder)
+    rows = compare_benchmark(baseline, current, tolerance)
+    print(
+        f"{'Workload':<12}{'Stage':<24}{'Base ms':>10}{'Now ms':>10}{'Delta':>9}{'Limit ms':>10}  Status"
+    )
+    for workload, stage, base_ms, now_ms, delta, threshold, status in rows:
+        if now_ms is None:
+            print(
+                f"{workload:<12}{stage:<24}{base_ms:>10.1f}{'-':>10}{'-':>9}{'-':>10}  {status}"
+            )
+            continue
+        print(
+            f"{workload:<12}{stage:<24}{base_ms:>10.1f}{now_ms:>10.1f}{delta:>+8.1f}%{threshold:>10.1f}  {status}"
+        )
 
-        with open(location, "w") as text_file:
-            text_file.write(REPORT_LOG)
+    regressions = sum(row[-1] == "REGRESSION" for row in rows)
+    print(f"{regressions} regressed stages (tolerance {tolerance:.0%})")
+    return regressions
 
-        return "Log"
 
-    return "Success"
+def parse_formats(text: str | None, default: list[str] | None) -> list[str] | None:
+    """
+    Splits the --formats value, default if it was not given
+    """
+    if text is None:
+        return default
+    return [f.strip() for f in text.split(",") if f.strip() != ""]
 
 
 if __name__ == "__main__":
@@ -2330,9 +7058,230 @@ if __name__ == "__main__":
     parser.add_argument("-o", dest="output", type=str, help="Name of output-File")
     parser.add_argument(
         "--ui",
-        default=True,
+        default=False,
+        action="store_true",
+        help="Runs in UI mode with additional options. Default if no PBIX-File is given",
+    )
+    parser.add_argument(
+        "--formats",
+        dest="formats",
+        type=str,
+        help=f"Comma separated list of output formats ({', '.join(EXPORTERS)}), default xlsx (xlsx,json for --benchmark)",
+    )
+    parser.add_argument(
+        "--catalog",
+        dest="catalog",
+        type=str,
+        help="SQLite catalog file. Ingests the report into the catalog after the run",
+    )
+    parser.add_argument(
+        "--catalog-folder",
+        dest="catalog_folder",
+        type=str,
+        help="Ingests every .pbix file in the folder into --catalog",
+    )
+    parser.add_argument(
+        "--query-usage",
+        dest="query_usage",
+        type=str,
+        help="Lists all visuals/filters in --catalog using the field, e.g. Sales[Margin %%]",
+    )
+    parser.add_argument(
+        "--query-impact",
+        dest="query_impact",
+        type=str,
+        help="Lists all visuals/filters in --catalog affected by the field, also through measures",
+    )
+    parser.add_argument(
+        "--history",
+        action="store_true",
+        help="Searches all catalog snapshots in --query-usage, not only the latest",
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Writes a timing trace of every pipeline phase to <output>/logs",
+    )
+    parser.add_argument(
+        "--profile-phase",
+        dest="profile_phase",
+        type=str,
+        help="Also collects cProfile stats for one phase, e.g. 'dax highlighting' (implies --profile)",
+    )
+    parser.add_argument(
+        "--memory",
+        action="store_true",
+        help="Writes peak memory and top allocation sites per pipeline phase to <output>/logs",
+    )
+    parser.add_argument(
+        "--batch",
+        dest="batch",
+        type=str,
+        help="Documents every .pbix in the folder, reports with the same .bim share one model analysis",
+    )
+    parser.add_argument(
+        "--resume",
+        dest="resume",
+        action="store_true",
+        help="Continues an interrupted --batch, skips reports finished unchanged in batch_journal.jsonl",
+    )
+    parser.add_argument(
+        "--retries",
+        dest="retries",
+        type=int,
+        default=2,
+        help="Extra attempts for reports that fail in --batch",
+    )
+    # Used by --batch to build each model and document each report in its own process
+    parser.add_argument("--batch-model", dest="batch_model", help=argparse.SUPPRESS)
+    parser.add_argument("--models-folder", dest="models_folder", help=argparse.SUPPRESS)
+    parser.add_argument("--batch-report", dest="batch_report", help=argparse.SUPPRESS)
+    parser.add_argument("--batch-result", dest="batch_result", help=argparse.SUPPRESS)
+    parser.add_argument("--shared-model", dest="shared_model", help=argparse.SUPPRESS)
+    parser.add_argument(
+        "--watch",
+        dest="watch",
+        type=str,
+        help="Folder to watch, documents every .pbix again when it or its .bim is saved",
+    )
+    parser.add_argument(
+        "--debounce",
+        dest="debounce",
+        type=float,
+        default=1.5,
+        help="Seconds a saved file has to stay unchanged before --watch reruns",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Runs a local HTTP service that documents queued reports, see ReadMe",
+    )
+    parser.add_argument(
+        "--port", dest="port", type=int, default=8765, help="Port for --serve"
+    )
+    parser.add_argument(
+        "--workers",
+        dest="workers",
+        type=int,
+        default=2,
+        help="Reports documented at the same time by --serve and --batch",
+    )
+    parser.add_argument(
+        "--max-queue",
+        dest="max_queue",
+        type=int,
+        default=16,
+        help="Waiting jobs accepted by --serve before new ones are refused",
+    )
+    parser.add_argument(
+        "--benchmark",
         action="store_true",
-        help="Runs in UI mode with additional options",
+        help="Generates synthetic reports of growing size and times every pipeline stage",
+    )
+    parser.add_argument(
+        "--bench-scales",
+        dest="bench_scales",
+        type=str,
+        default="1,2,4,8",
+        help="Comma separated workload size multipliers for --benchmark",
+    )
+    parser.add_argument(
+        "--bench-repeat",
+        dest="bench_repeat",
+        type=int,
+        default=3,
+        help="Timed runs per workload for --benchmark, the median is reported",
+    )
+    parser.add_argument(
+        "--bench-baseline",
+        dest="bench_baseline",
+        type=str,
+        help="Stores the --benchmark results as baseline JSON for --bench-compare",
+    )
+    parser.add_argument(
+        "--bench-compare",
+        dest="bench_compare",
+        type=str,
+        help="Reruns the workloads of a baseline JSON and exits with 1 if a stage regressed",
+    )
+    parser.add_argument(
+        "--bench-tolerance",
+        dest="bench_tolerance",
+        type=float,
+        default=0.15,
+        help="Allowed slowdown per stage for --bench-compare, default 0.15 (15%%)",
+    )
+    parser.add_argument(
+        "--bench-output",
+        dest="bench_output",
+        type=str,
+        help="Writes the --benchmark results as JSON to this file",
+    )
+    parser.add_argument(
+        "--diff",
+        dest="diff",
+        type=str,
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="Lists pages, visuals, filters and model objects changed between two .pbix versions",
+    )
+    parser.add_argument(
+        "--diff-tsv",
+        dest="diff_tsv",
+        type=str,
+        nargs=2,
+        metavar=("OLD", "NEW"),
+        help="documentation.tsv of both --diff versions, else generated from the .bim files",
+    )
+    parser.add_argument(
+        "--diff-output",
+        dest="diff_output",
+        type=str,
+        help="Also writes the --diff changes to this .csv file",
+    )
+    parser.add_argument(
+        "--lint-performance",
+        dest="lint_performance",
+        type=str,
+        help="Prints render cost metrics per page of the .pbix and flags pages/visuals over the limits in Input/PerformanceThresholds.csv",
+    )
+    parser.add_argument(
+        "--storage",
+        dest="storage",
+        type=str,
+        help="Prints table/column sizes of the model in the .pbix and what removing unused columns saves (requires pbixray)",
+    )
+    parser.add_argument(
+        "--storage-tsv",
+        dest="storage_tsv",
+        type=str,
+        help="documentation.tsv used by --storage to find unused columns",
+    )
+    parser.add_argument(
+        "--storage-output",
+        dest="storage_output",
+        type=str,
+        help="Also writes the --storage column sizes to this .csv file",
+    )
+    parser.add_argument(
+        "--duplicates",
+        dest="duplicates",
+        type=str,
+        nargs="+",
+        help="Lists clusters of duplicated measures in .bim/documentation.tsv files or folders of .bim files",
+    )
+    parser.add_argument(
+        "--dup-threshold",
+        dest="dup_threshold",
+        type=float,
+        default=0.8,
+        help="Similarity (0-1) from which --duplicates groups measures as near duplicates",
+    )
+    parser.add_argument(
+        "--dup-output",
+        dest="dup_output",
+        type=str,
+        help="Also writes the --duplicates clusters to this .csv file",
     )
     parser.add_argument(
         "--yes_man", dest="yes_man", action="store_true", help="Remove Input Protection"
@@ -2341,32 +7290,99 @@ if __name__ == "__main__":
     # Parse the command-line arguments
     args = parser.parse_args()
 
-    if args.ui:
+    if (args.query_usage or args.query_impact or args.catalog_folder) and (
+        not args.catalog
+    ):
+        parser.error("--catalog is required for catalog commands")
+
+    if args.query_usage or args.query_impact:
+        run_catalog_query(
+            args.catalog,
+            args.query_impact or args.query_usage,
+            impact=bool(args.query_impact),
+            history=args.history,
+        )
+    elif args.duplicates:
+        run_duplicate_measures(args.duplicates, args.dup_threshold, args.dup_output)
+    elif args.storage:
+        run_storage_analysis(args.storage, args.storage_tsv, args.storage_output)
+    elif args.lint_performance:
+        run_performance_lint(args.lint_performance)
+    elif args.diff:
+        run_diff(*args.diff, args.diff_tsv, args.diff_output)
+    elif args.batch_model:
+        run_batch_model(args.batch_model, args.models_folder, args.batch_result)
+    elif args.batch_report:
+        run_batch_report(
+            args.batch_report,
+            parse_formats(args.formats, ["xlsx"]),
+            args.catalog,
+            args.shared_model,
+            args.batch_result,
+        )
+    elif args.batch:
+        run_batch_command(
+            args.batch,
+            parse_formats(args.formats, ["xlsx"]),
+            args.catalog,
+            args.workers,
+            resume=args.resume,
+            retries=args.retries,
+        )
+    elif args.catalog_folder:
+        run_catalog_folder(args.catalog_folder, args.catalog)
+    elif args.watch:
+        watch_folder(
+            args.watch,
+            parse_formats(args.formats, ["xlsx"]),
+            args.debounce,
+        )
+    elif args.serve:
+        serve(
+            DocumentationService(
+                os.path.join(os.getcwd(), "service"), args.workers, args.max_queue
+            ),
+            port=args.port,
+        )
+    elif args.bench_compare:
+        if run_benchmark_compare(args.bench_compare, args.bench_tolerance):
+            sys.exit(1)
+    elif args.benchmark or args.bench_baseline:
+        results = run_benchmark(
+            [int(s) for s in args.bench_scales.split(",") if s.strip() != ""],
+            args.bench_repeat,
+            parse_formats(args.formats, None),
+        )
+        print_benchmark(results)
+        for output_path in (args.bench_output, args.bench_baseline):
+            if output_path:
+                with open(output_path, "w") as bench_file:
+                    json.dump(results, bench_file, indent=1)
+    elif args.ui or not args.file:
         run_ui()
     else:
-        if args.file:
-            _file_ = args.file
-            if args.output:
-                SAVE_NAME = args.output
-            else:
-                SAVE_NAME = _file_
-            yes_man = args.yes_man
+        # -i is a path to the .pbix file or a report name in the default folder
+        report_folder, _file_ = os.path.split(args.file)
+        _file_ = _file_.removesuffix(".pbix")
+        if not report_folder:
+            report_folder = "C:\\Users\\Reports"
+        if args.output:
+            SAVE_NAME = args.output
         else:
-            _file_ = "SemanticModell"
-            yes_man = False
             SAVE_NAME = _file_
-
-        _PBIX_ = [
-            _file_,
-            "C:\\Users\\Reports",
-        ]
-        _BIM_ = [
-            _file_,
-            "C:\\Users\\Reports",
-        ]
-
-        result = run_cmd()
-        # result = run_ui()
+        yes_man = args.yes_man
+
+        _PBIX_ = [_file_, report_folder]
+        _BIM_ = [_file_, report_folder]
+
+        result = run_cmd(
+            parse_formats(args.formats, ["xlsx"]),
+            args.catalog,
+            profile=args.profile or args.profile_phase is not None,
+            cprofile_phase=args.profile_phase,
+            memory=args.memory,
+            save_name=SAVE_NAME,
+        )
         print(result)
 
 # Maybe includes additional info to extract? https://www.linkedin.com/pulse/streamlining-model-documentation-tabular-editor-power-jarom-gleed
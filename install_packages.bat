@@ -1,6 +1,6 @@
 @echo off
 :: List of Python packages to install
-set packages=argparse pandas xlsxwriter psutil zipfile36 networkx matplotlib
+set packages=argparse pandas xlsxwriter zipfile36 networkx matplotlib
 
 :: Install each package if it's not already installed
 for %%p in (%packages%) do (
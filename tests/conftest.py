@@ -0,0 +1,213 @@
+import importlib.util
+import json
+import os
+import sys
+from zipfile import ZipFile
+
+import pytest
+
+REPO_FOLDER = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+INPUT_FOLDER = os.path.join(REPO_FOLDER, "Input")
+
+TSV_HEADER = [
+    "Object",
+    "Name",
+    "Description",
+    "SourceColumn",
+    "Expression",
+    "FormatString",
+    "DataType",
+    "DisplayFolder",
+]
+
+# Avg -> Total Sales -> Sales[Amount], a two level measure dependency
+TSV_ROWS = [
+    ("Model.Tables.Sales", "Sales", "", "", "", "", "", ""),
+    ("Model.Tables.Sales.C.Amount", "Amount", "", "Amount", "", "#,0", "Decimal", ""),
+    ("Model.Tables.Sales.C.Region", "Region", "", "Region", "", "", "String", ""),
+    ("Model.Tables.Sales.C.Unused", "Unused", "", "Unused", "", "", "String", ""),
+    (
+        "Model.Tables.Sales.M.Total Sales",
+        "Total Sales",
+        "",
+        "",
+        "SUM(Sales[Amount])",
+        "#,0",
+        "Decimal",
+        "",
+    ),
+    (
+        "Model.Tables.Sales.M.Avg",
+        "Avg",
+        "",
+        "",
+        "DIVIDE([Total Sales], COUNTROWS(Sales))",
+        "",
+        "Decimal",
+        "",
+    ),
+]
+
+REGION_FILTER = [
+    {
+        "name": "f1",
+        "expression": {
+            "Column": {
+                "Expression": {"SourceRef": {"Entity": "Sales"}},
+                "Property": "Region",
+            }
+        },
+        "filter": {
+            "Version": 2,
+            "From": [{"Name": "s", "Entity": "Sales"}],
+            "Where": [
+                {
+                    "Condition": {
+                        "In": {
+                            "Expressions": [
+                                {
+                                    "Column": {
+                                        "Expression": {"SourceRef": {"Source": "s"}},
+                                        "Property": "Region",
+                                    }
+                                }
+                            ],
+                            "Values": [[{"Literal": {"Value": "'North'"}}]],
+                        }
+                    }
+                }
+            ],
+        },
+        "type": "Categorical",
+    }
+]
+
+
+def visual_container(
+    name: str,
+    visual_type: str,
+    fields: list,
+    filters: list | None = None,
+    x: int = 0,
+    unprojected: list | None = None,
+) -> dict:
+    """
+    fields: (table, name, "Column" or "Measure") per field
+    unprojected: fields queried without a projection, logged as unknown data type
+    """
+    unprojected = unprojected or []
+    config = {
+        "name": name,
+        "layouts": [{"position": {"x": x, "y": 0}}],
+        "singleVisual": {
+            "visualType": visual_type,
+            "projections": {
+                "Values": [
+                    {"queryRef": f"{table}.{field}"} for table, field, _ in fields
+                ]
+            },
+            "prototypeQuery": {
+                "Version": 2,
+                "From": [{"Name": "s", "Entity": "Sales", "Type": 0}],
+                "Select": [
+                    {
+                        kind: {
+                            "Expression": {"SourceRef": {"Source": "s"}},
+                            "Property": field,
+                        },
+                        "Name": f"{table}.{field}",
+                    }
+                    for table, field, kind in fields + unprojected
+                ],
+            },
+        },
+    }
+    container = {"x": x, "y": 0, "config": json.dumps(config)}
+    if filters:
+        container["filters"] = json.dumps(filters)
+    return container
+
+
+def write_report(folder: str, name: str = "Rep") -> str:
+    """
+    Writes <name>.pbix with 2 pages of the same 3 visuals (each page repeats the
+    structure, only visual names and positions differ, the card logs a warning)
+    and a documentation.tsv
+
+    returns path of the .pbix
+    """
+    sections = []
+    for page in range(2):
+        visuals = [
+            visual_container(
+                f"table{page}",
+                "tableEx",
+                [("Sales", "Amount", "Column"), ("Sales", "Total Sales", "Measure")],
+                REGION_FILTER,
+                x=page,
+            ),
+            visual_container(
+                f"card{page}",
+                "card",
+                [("Sales", "Avg", "Measure")],
+                x=10 + page,
+                unprojected=[("Sales", "Region", "Column")],
+            ),
+            visual_container(
+                f"slicer{page}", "slicer", [("Sales", "Region", "Column")], x=20 + page
+            ),
+        ]
+        sections.append(
+            {
+                "name": f"section{page}",
+                "displayName": f"Page {page}",
+                "filters": "[]",
+                "visualContainers": visuals,
+            }
+        )
+    layout = {"config": "{}", "sections": sections}
+
+    pbix_path = os.path.join(folder, f"{name}.pbix")
+    with ZipFile(pbix_path, "w") as pbix:
+        pbix.writestr("Report/Layout", json.dumps(layout).encode("utf-16-le"))
+        pbix.writestr("DataModel", b"\0" * 16)
+    with open(os.path.join(folder, "documentation.tsv"), "w", encoding="utf-8") as tsv:
+        tsv.write("\t".join(TSV_HEADER) + "\n")
+        tsv.writelines("\t".join(row) + "\n" for row in TSV_ROWS)
+    return pbix_path
+
+
+@pytest.fixture(scope="session")
+def ixtractor():
+    """
+    PB-Ixtractor.py loaded as module, its file name is no valid module name
+    """
+    spec = importlib.util.spec_from_file_location(
+        "pb_ixtractor", os.path.join(REPO_FOLDER, "PB-Ixtractor.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[spec.name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def config(ixtractor):
+    return ixtractor.load_config(INPUT_FOLDER)
+
+
+@pytest.fixture
+def report_path(tmp_path):
+    return write_report(str(tmp_path))
+
+
+@pytest.fixture
+def documentation_result(ixtractor, report_path):
+    documenter = ixtractor.Documenter(
+        report_path,
+        output_folder=os.path.dirname(report_path),
+        input_folder=INPUT_FOLDER,
+        log_to_file=False,
+        parallel=False,
+    )
+    return documenter.analyze()
@@ -0,0 +1,115 @@
+import json
+
+import pytest
+
+
+@pytest.fixture
+def reports(tmp_path):
+    folder = tmp_path / "reports"
+    folder.mkdir()
+    for name in "ABCD":
+        (folder / f"{name}.pbix").write_bytes(name.encode())
+    return folder
+
+
+class Interrupted(Exception):
+    pass
+
+
+def fake_report_runs(ixtractor, monkeypatch, interrupt_at: str | None = None):
+    """
+    Replaces the report processes, returns the names of the reports run. From
+    interrupt_at on every report fails as if the batch had been killed
+    """
+    documented = []
+
+    def run_batch_retried(name, arguments, retries, retry_delay, timeout, log):
+        if interrupt_at is not None and name >= interrupt_at:
+            raise Interrupted(name)
+        documented.append(name)
+        return {"status": "Success", "report_uses": None}, 1
+
+    monkeypatch.setattr(ixtractor, "run_batch_retried", run_batch_retried)
+    return documented
+
+
+def test_interrupted_run_is_resumed(ixtractor, monkeypatch, reports, tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+
+    documented = fake_report_runs(ixtractor, monkeypatch, interrupt_at="C.pbix")
+    with pytest.raises(Interrupted):
+        ixtractor.run_batch(str(reports), ["json"], journal_path=journal_path)
+    assert documented == ["A.pbix", "B.pbix"]
+
+    # Killed while writing the record of C
+    with open(journal_path, "a", encoding="utf-8") as journal:
+        journal.write('{"report": "C')
+
+    documented = fake_report_runs(ixtractor, monkeypatch)
+    statuses = ixtractor.run_batch(
+        str(reports), ["json"], resume=True, journal_path=journal_path
+    )
+    assert documented == ["C.pbix", "D.pbix"]
+    assert statuses == dict.fromkeys("ABCD", "Success")
+
+    # Nothing is left after a finished run
+    documented = fake_report_runs(ixtractor, monkeypatch)
+    ixtractor.run_batch(str(reports), ["json"], resume=True, journal_path=journal_path)
+    assert documented == []
+
+
+def test_resume_reruns_changed_reports(ixtractor, monkeypatch, reports, tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+    fake_report_runs(ixtractor, monkeypatch)
+    ixtractor.run_batch(str(reports), ["json"], journal_path=journal_path)
+
+    (reports / "B.pbix").write_bytes(b"changed")
+    documented = fake_report_runs(ixtractor, monkeypatch)
+    ixtractor.run_batch(str(reports), ["json"], resume=True, journal_path=journal_path)
+    assert documented == ["B.pbix"]
+
+    # Other formats are another run over the folder
+    documented = fake_report_runs(ixtractor, monkeypatch)
+    ixtractor.run_batch(
+        str(reports), ["json", "xlsx"], resume=True, journal_path=journal_path
+    )
+    assert documented == ["A.pbix", "B.pbix", "C.pbix", "D.pbix"]
+
+
+def test_without_resume_everything_runs_and_is_appended(
+    ixtractor, monkeypatch, reports, tmp_path
+):
+    journal_path = tmp_path / "journal.jsonl"
+    fake_report_runs(ixtractor, monkeypatch)
+    ixtractor.run_batch(str(reports), ["json"], journal_path=str(journal_path))
+
+    documented = fake_report_runs(ixtractor, monkeypatch)
+    ixtractor.run_batch(str(reports), ["json"], journal_path=str(journal_path))
+    assert len(documented) == 4
+
+    records = [json.loads(line) for line in journal_path.read_text().splitlines()]
+    assert len(records) == 8
+    assert {record["status"] for record in records} == {"Success"}
+
+
+def test_finished_record(ixtractor, tmp_path):
+    journal_path = str(tmp_path / "journal.jsonl")
+    journal = ixtractor.BatchJournal(journal_path)
+    for report, status in [("A", "Success"), ("B", "Failed: timeout")]:
+        journal.write(
+            {
+                "report": report,
+                "input_hash": "h",
+                "formats": ["json"],
+                "catalog": None,
+                "status": status,
+            }
+        )
+
+    resumed = ixtractor.BatchJournal(journal_path, resume=True)
+    assert resumed.finished_record("A", "h", ["json"], None)["status"] == "Success"
+    assert resumed.finished_record("A", "other", ["json"], None) is None
+    assert resumed.finished_record("A", "h", ["json"], "catalog.db") is None
+    assert resumed.finished_record("B", "h", ["json"], None) is None
+
+    assert ixtractor.BatchJournal(journal_path).finished == {}
@@ -0,0 +1,49 @@
+def ingest(ixtractor, tmp_path, report_path, result):
+    catalog = ixtractor.ReportCatalog(str(tmp_path / "catalog.db"))
+    content_hash = ixtractor.file_content_hash(report_path)
+    assert catalog.ingest("Rep", report_path, content_hash, result)
+    return catalog
+
+
+def test_query_impact_follows_measure_dependencies(
+    ixtractor, tmp_path, report_path, documentation_result
+):
+    catalog = ingest(ixtractor, tmp_path, report_path, documentation_result)
+    try:
+        impact = catalog.query_impact("Sales[Amount]")
+    finally:
+        catalog.close()
+
+    # Avg uses Total Sales, which uses Sales[Amount]
+    assert impact == [
+        ("Rep", "Page 0", "card0", "Values", "Sales[Avg]", 2),
+        ("Rep", "Page 0", "table0", "Values", "Sales[Amount]", 0),
+        ("Rep", "Page 0", "table0", "Values", "Sales[Total Sales]", 1),
+        ("Rep", "Page 1", "card1", "Values", "Sales[Avg]", 2),
+        ("Rep", "Page 1", "table1", "Values", "Sales[Amount]", 0),
+        ("Rep", "Page 1", "table1", "Values", "Sales[Total Sales]", 1),
+    ]
+
+
+def test_query_impact_max_depth(ixtractor, tmp_path, report_path, documentation_result):
+    catalog = ingest(ixtractor, tmp_path, report_path, documentation_result)
+    try:
+        impact = catalog.query_impact("Sales[Amount]", max_depth=1)
+    finally:
+        catalog.close()
+
+    assert {row[4] for row in impact} == {"Sales[Amount]", "Sales[Total Sales]"}
+
+
+def test_ingest_same_content_once(
+    ixtractor, tmp_path, report_path, documentation_result
+):
+    catalog = ingest(ixtractor, tmp_path, report_path, documentation_result)
+    try:
+        content_hash = ixtractor.file_content_hash(report_path)
+        assert not catalog.ingest(
+            "Rep", report_path, content_hash, documentation_result
+        )
+        assert len(catalog.query_usage("Sales[Region]")) == 6
+    finally:
+        catalog.close()
@@ -0,0 +1,106 @@
+import pandas as pd
+
+SNIPPET = """CALCULATE(
+    SUMX(Sales, SUMX(Lines, Lines[Qty])),
+    FILTER(Sales, Sales[Region] = "FILTER(Sales)")
+) + IFERROR(1 / COUNTROWS(FILTER(Sales, Sales[Amount] > 0)), 0)
+    + COUNTROWS(FILTER(Sales, Sales[Amount] > 0)) // SUMX(Sales, 1)"""
+
+
+def test_known_findings(ixtractor):
+    findings = [
+        (rule, severity, SNIPPET[position:].split("(")[0])
+        for rule, severity, position, _ in ixtractor.lint_dax(SNIPPET)
+    ]
+
+    # Strings and comments are masked, FILTER( in the string and SUMX in the
+    # comment are no calls
+    assert findings == [
+        ("SUMX nested in SUMX", "Warning", "SUMX"),
+        (
+            "FILTER over a whole table inside CALCULATE, filter the columns instead",
+            "Warning",
+            "FILTER",
+        ),
+        (
+            "IFERROR forces row by row error handling, e.g. use DIVIDE",
+            "Warning",
+            "IFERROR",
+        ),
+        (
+            "COUNTROWS(FILTER(...)), use CALCULATE(COUNTROWS(...), filters)",
+            "Info",
+            "COUNTROWS",
+        ),
+        ("Expression repeated 2 times, store it in a VAR", "Info", "COUNTROWS"),
+        (
+            "COUNTROWS(FILTER(...)), use CALCULATE(COUNTROWS(...), filters)",
+            "Info",
+            "COUNTROWS",
+        ),
+    ]
+
+
+def test_filter_over_variable_or_as_expression(ixtractor):
+    assert ixtractor.lint_dax("VAR t = Sales RETURN CALCULATE(1, FILTER(t, 1))") == []
+    assert ixtractor.lint_dax("CALCULATE(FILTER(Sales, 1))") == []
+
+
+def test_unfinished_calls(ixtractor):
+    assert ixtractor.lint_dax("CALCULATE(FILTER(") == []
+    assert ixtractor.parse_dax_calls("CALCULATE(SUM(x), f") == [
+        ["CALCULATE", 0, 19, [(10, 16)], -1],
+        ["SUM", 10, 16, [(14, 15)], 0],
+    ]
+
+
+def model_objects(*definitions: str) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "Table": ["Sales"] * len(definitions),
+            "Name": [f"M{index}" for index in range(len(definitions))],
+            "Type": ["Measure"] * len(definitions),
+            "Definition": list(definitions),
+        }
+    )
+
+
+def test_model_findings_have_line_and_column(ixtractor):
+    findings = ixtractor.lint_model_dax(
+        model_objects("1 +\n  CROSSFILTER(A[x], B[y], BOTH)", "SUM(Sales[Amount])")
+    )
+
+    assert findings.values.tolist() == [
+        [
+            "Sales",
+            "M0",
+            "Measure",
+            "Bidirectional CROSSFILTER",
+            "Warning",
+            2,
+            3,
+            "CROSSFILTER(A[x], B[y], BOTH)",
+        ]
+    ]
+
+
+def test_broken_definition_is_an_error_finding(ixtractor, monkeypatch):
+    lint_dax = ixtractor.lint_dax
+
+    def failing_lint_dax(definition: str):
+        if "BROKEN" in definition:
+            raise ValueError("unexpected token")
+        return lint_dax(definition)
+
+    monkeypatch.setattr(ixtractor, "lint_dax", failing_lint_dax)
+    findings = ixtractor.lint_model_dax(model_objects("BROKEN(\n 1)", "IFERROR(1, 0)"))
+
+    assert findings[["Name", "Rule", "Severity"]].values.tolist() == [
+        ["M0", "Could not be checked: ValueError: unexpected token", "Error"],
+        [
+            "M1",
+            "IFERROR forces row by row error handling, e.g. use DIVIDE",
+            "Warning",
+        ],
+    ]
+    assert findings["Snippet"][0] == "BROKEN( 1)"
@@ -0,0 +1,99 @@
+import json
+
+MARGIN = (
+    "VAR total = SUMX(Sales, Sales[Qty] * Sales[Price])\n"
+    "VAR cost = SUMX(Sales, Sales[Qty] * Sales[Cost])\n"
+    "VAR margin = total - cost\n"
+    "RETURN DIVIDE(margin, total) * 100"
+    ' + CALCULATE(COUNTROWS(Sales), Sales[Region] = "North")'
+)
+
+# Other variable names, case, comments and whitespace
+MARGIN_COPY = (
+    "var T = sumx(Sales, Sales[Qty] * Sales[Price]) // total\n"
+    "VAR c = SUMX(Sales, Sales[Qty] * Sales[Cost]) VAR m = T - c\n"
+    "RETURN DIVIDE(m, T) * 100"
+    ' + CALCULATE(COUNTROWS(Sales), Sales[Region] = "North")'
+)
+
+
+def test_normalize_dax(ixtractor):
+    assert ixtractor.normalize_dax("var T = sumx(x) -- c\nRETURN T") == (
+        "VAR",
+        "VAR0",
+        "=",
+        "SUMX",
+        "(",
+        "X",
+        ")",
+        "RETURN",
+        "VAR0",
+    )
+    assert ixtractor.normalize_dax('"a"') != ixtractor.normalize_dax('"A"')
+
+
+def test_exact_duplicates(ixtractor):
+    finder = ixtractor.MeasureDuplicateFinder()
+    finder.add("a.bim", "Sales", "Margin", MARGIN)
+    finder.add("b.bim", "Sales", "Margin copy", MARGIN_COPY)
+    finder.add("a.bim", "Sales", "Amount", "SUM(Sales[Amount])")
+
+    assert finder.clusters() == [
+        [1, "Exact", 1.0, "a.bim", "Sales", "Margin"],
+        [1, "Exact", 1.0, "b.bim", "Sales", "Margin copy"],
+    ]
+
+
+def test_near_duplicates(ixtractor):
+    finder = ixtractor.MeasureDuplicateFinder()
+    finder.add("a.bim", "Sales", "Margin", MARGIN)
+    finder.add("a.bim", "Sales", "Margin %", MARGIN.replace("* 100", "* 1000"))
+    finder.add("a.bim", "Sales", "Customers", "DISTINCTCOUNT(Customer[Key])")
+
+    clusters = finder.clusters()
+    assert [row[:2] + row[3:] for row in clusters] == [
+        [1, "Near", "a.bim", "Sales", "Margin"],
+        [1, "Near", "a.bim", "Sales", "Margin %"],
+    ]
+    assert clusters[0][2] == 1.0
+    assert 0.8 <= clusters[1][2] < 1.0
+
+    # Signatures use a fixed seed, the clusters do not change between runs
+    assert finder.clusters() == clusters
+
+
+def test_dissimilar_measures_are_no_duplicates(ixtractor):
+    finder = ixtractor.MeasureDuplicateFinder(threshold=0.99)
+    finder.add("a.bim", "Sales", "Margin", MARGIN)
+    finder.add("a.bim", "Sales", "Margin %", MARGIN.replace("* 100", "* 1000"))
+
+    assert finder.clusters() == []
+
+
+def test_add_model(ixtractor, tmp_path):
+    bim_path = tmp_path / "Model.bim"
+    bim_path.write_text(
+        json.dumps(
+            {
+                "model": {
+                    "tables": [
+                        {
+                            "name": "Sales",
+                            "measures": [
+                                {"name": "Margin", "expression": MARGIN.split("\n")},
+                                {"name": "Margin copy", "expression": MARGIN_COPY},
+                            ],
+                        }
+                    ]
+                }
+            }
+        ),
+        encoding="utf-8",
+    )
+    finder = ixtractor.MeasureDuplicateFinder()
+    finder.add_model(str(bim_path))
+
+    assert [row[1:2] + row[3:] for row in finder.clusters()] == [
+        ["Exact", "Model.bim", "Sales", "Margin"],
+        ["Exact", "Model.bim", "Sales", "Margin copy"],
+    ]
@@ -0,0 +1,74 @@
+import pandas as pd
+
+
+def build(ixtractor):
+    model_fields = [
+        ("Sales", "Amount"),
+        ("Sales", "Region"),
+        ("Sales", "Unused"),
+        ("Sales", "Total Sales"),
+        ("Sales", "Avg"),
+    ]
+    model_objects = pd.DataFrame(
+        {
+            "Table": ["Sales", "Sales"],
+            "Name": ["Total Sales", "Avg"],
+            "Type": ["Measure", "Measure"],
+        },
+        index=[10, 11],
+    )
+    report_info = pd.DataFrame(
+        {
+            "Page": ["Page 0", "Page 0", "Page 1", "Page 1"],
+            "Visual ID": ["table0", "table0", "card1", "text1"],
+            "Table": ["Sales", "Sales", "Sales", ""],
+            "Name": ["Total Sales", "Region", "Old", ""],
+        }
+    )
+    report_filters = [
+        ["Page 1", "Page 1", "Page", "Sales", "Region", "=", "North"],
+        ["Page 1", "card1", "Visual", "", "", "", ""],
+    ]
+    dax_references = {
+        10: {"columns": [("Sales", "Amount")], "measures": []},
+        11: {"columns": [], "measures": ["[Total Sales]"]},
+    }
+    return ixtractor.UsageMatrix.build(
+        model_fields, model_objects, report_info, report_filters, dax_references
+    )
+
+
+def test_report_only_fields_are_added_after_model_fields(ixtractor):
+    usage = build(ixtractor)
+
+    assert usage.model_field_count == 5
+    assert usage.fields[5:] == [("Sales", "Old")]
+    assert usage.shape == (6, 5)
+    assert usage.is_measure.tolist() == [False, False, False, True, True, False]
+
+
+def test_field_counts(ixtractor):
+    usage = build(ixtractor)
+
+    assert usage.field_counts().tolist() == [1, 2, 0, 2, 0, 1]
+    assert usage.field_counts(report_only=True).tolist() == [0, 2, 0, 1, 0, 1]
+
+
+def test_unused_fields_skip_measures_and_report_fields(ixtractor):
+    usage = build(ixtractor)
+
+    # Avg is used nowhere but measures always count as used
+    assert usage.unused_fields() == [("Sales", "Unused")]
+
+
+def test_columns(ixtractor):
+    usage = build(ixtractor)
+
+    assert usage.columns == [
+        ("Page 0", "table0", "Visual"),
+        ("Page 1", "card1", "Visual"),
+        ("Page 1", "Page 1", "Page Filter"),
+        ("", "Sales[Total Sales]", "DAX"),
+        ("", "Sales[Avg]", "DAX"),
+    ]
+    assert usage.fields_per_page() == {"Page 0": 2, "Page 1": 2}
@@ -0,0 +1,52 @@
+import os
+
+
+def extract(ixtractor, config, report_path, memo: bool):
+    log = ixtractor.ReportLog()
+    extractor = ixtractor.ReportExtractor(
+        os.path.dirname(report_path), os.path.basename(report_path), log, config
+    )
+    if not memo:
+        # Every visual goes through extract_visual as for types without memo
+        def extract_visual_memo(page_name, ex_data, visual_type, config, sections):
+            if extractor.extract_visual(
+                page_name, ex_data, visual_type, config, sections
+            ):
+                extractor.extract_visual_filters(page_name, ex_data)
+
+        extractor.extract_visual_memo = extract_visual_memo
+    extractor.extract()
+    return extractor
+
+
+def without_time(records: list[dict]) -> list[dict]:
+    return [
+        {key: value for key, value in record.items() if key != "time"}
+        for record in records
+    ]
+
+
+def test_memo_matches_uncached_extraction(ixtractor, config, report_path):
+    cached = extract(ixtractor, config, report_path, memo=True)
+    uncached = extract(ixtractor, config, report_path, memo=False)
+
+    # Page 1 repeats the visuals of page 0
+    assert cached.memo_hits == 3
+    assert cached.memo_misses == 3
+    assert cached.result == uncached.result
+    assert cached.filters == uncached.filters
+
+    *records, statistics = without_time(cached.log.records)
+    assert statistics["message"] == "Visual memo: 3 hits, 3 misses"
+    assert statistics["severity"] == -1
+    assert [record["message"] for record in records] == ["Unknown data type"] * 2
+    assert records == without_time(uncached.log.records)
+
+
+def test_memo_replaces_page_and_visual_name(ixtractor, config, report_path):
+    cached = extract(ixtractor, config, report_path, memo=True)
+
+    pages = {(row[0], row[2]) for row in cached.result}
+    assert ("Page 1", "table1") in pages
+    assert ("Page 1", "card1") in pages
+    assert ("Page 0", "table1") not in pages